@@ -0,0 +1,9 @@
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    """Integer setting from the environment; `default` when unset or not a number."""
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
@@ -0,0 +1,100 @@
+import asyncio
+import atexit
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from .config import env_int
+
+
+class ExecutorBusy(RuntimeError):
+    """Raised when an executor's queue is full; endpoints answer 503."""
+
+
+class BoundedExecutor:
+    """
+    Size-limited thread pool for blocking work called from async endpoints.
+
+    At most `workers` jobs run at once and at most `max_queue` more wait;
+    beyond that `run()` raises ExecutorBusy instead of piling up requests.
+    Running/queued counts are exposed through `stats()` for /api/health.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._stats = {"queued": 0, "running": 0, "completed": 0, "failed": 0, "rejected": 0, "cancelled": 0}
+
+    def _call(self, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        with self._lock:
+            self._stats["queued"] -= 1
+            self._stats["running"] += 1
+        return fn(*args, **kwargs)
+
+    def _release(self, future: "Future[Any]") -> None:
+        # Done callback for every submitted job, whether it ran, failed or was cancelled while queued
+        with self._lock:
+            if getattr(future, "_slot_released", False):
+                return
+            future._slot_released = True
+            if future.cancelled():
+                self._stats["queued"] -= 1
+                self._stats["cancelled"] += 1
+            else:
+                self._stats["running"] -= 1
+                self._stats["failed" if future.exception() is not None else "completed"] += 1
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> "asyncio.Future[Any]":
+        """
+        Queue a blocking callable and return its future right away. Raises
+        ExecutorBusy immediately, e.g. before a streaming response has started.
+        Cancelling the returned future frees its slot if the job hasn't started.
+        """
+        with self._lock:
+            if self._stats["queued"] + self._stats["running"] >= self.workers + self.max_queue:
+                self._stats["rejected"] += 1
+                raise ExecutorBusy(f"{self.name} executor is busy, try again shortly")
+            self._stats["queued"] += 1
+        try:
+            future = self._pool.submit(self._call, fn, args, kwargs)
+        except RuntimeError:
+            # Pool shut down
+            with self._lock:
+                self._stats["queued"] -= 1
+            raise
+        future.add_done_callback(self._release)
+        return asyncio.wrap_future(future)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking callable on this executor without blocking the event loop."""
+        return await self.submit(fn, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, workers=self.workers, max_queue=self.max_queue)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Browser work (whole multi-pincode scrapes; each fans out over the driver pool)
+browser_executor = BoundedExecutor(
+    "browser",
+    workers=env_int("BLINKIT_BROWSER_JOBS", 2),
+    max_queue=env_int("BLINKIT_BROWSER_QUEUE", 8),
+)
+# Outbound API calls (Gemini, NewsAPI) - slow but cheap on memory
+api_executor = BoundedExecutor(
+    "api",
+    workers=env_int("BLINKIT_API_WORKERS", 8),
+    max_queue=env_int("BLINKIT_API_QUEUE", 32),
+)
+atexit.register(browser_executor.shutdown)
+atexit.register(api_executor.shutdown)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    return {"browser": browser_executor.stats(), "api": api_executor.stats()}
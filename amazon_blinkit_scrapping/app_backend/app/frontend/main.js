@@ -41,19 +41,17 @@ form.addEventListener('submit', async (e) => {
   lastParams = { query, pincodes, save_html };
 
   try {
-    const endpoint = ai_analysis ? '/api/analyze' : '/api/scrape';
-    
-    if (ai_analysis) {
-      loadingMessage.textContent = 'Scraping and analyzing with AI... Analyzing top 5 products (this may take 1-2 minutes).';
-    } else {
+    if (!ai_analysis) {
+      // Plain scrapes stream in: the table fills as each pincode finishes
       loadingMessage.textContent = 'Scraping Blinkit... This can take ~30–60 seconds per pincode.';
+      await streamScrape(lastParams);
+      return;
     }
 
-    const requestBody = ai_analysis 
-      ? { ...lastParams, top_n: 5, include_gap_analysis: true }
-      : lastParams;
+    loadingMessage.textContent = 'Scraping and analyzing with AI... Analyzing top 5 products (this may take 1-2 minutes).';
+    const requestBody = { ...lastParams, top_n: 5, include_gap_analysis: true };
 
-    const resp = await fetch(endpoint, {
+    const resp = await fetch('/api/analyze', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(requestBody),
@@ -65,16 +63,7 @@ form.addEventListener('submit', async (e) => {
 
     const data = await resp.json();
 
-    // Summary
-    summary.innerHTML = `
-      <div class="card">
-        <h2>Summary</h2>
-        <p><strong>Query:</strong> ${data.summary.query}</p>
-        <p><strong>Pincodes:</strong> ${data.summary.pincodes.join(', ')}</p>
-        <p><strong>Total products:</strong> ${data.summary.total_products}</p>
-        ${data.summary.analyzed_count ? `<p><strong>AI Analyzed:</strong> ${data.summary.analyzed_count}</p>` : ''}
-      </div>
-    `;
+    renderSummary(data.summary);
 
     // Gap Analysis
     if (ai_analysis && data.gap_analysis) {
@@ -93,30 +82,11 @@ form.addEventListener('submit', async (e) => {
       fetchNewsAndTrends(query);
     }
 
-    // Brand list
-    brandList.innerHTML = '';
-    data.brand_top10_counts.forEach(({ brand, count }) => {
-      const li = document.createElement('li');
-      li.textContent = `${brand}: ${count}`;
-      brandList.appendChild(li);
-    });
+    renderBrandList(data.brand_top10_counts);
 
     // Products table
     productsTableBody.innerHTML = '';
-    const products = data.analyzed_products || data.products;
-    products.forEach((p) => {
-      const tr = document.createElement('tr');
-      tr.innerHTML = `
-        <td>${p.pincode}</td>
-        <td>${p.rank ?? ''}</td>
-        <td>${p.brand ?? ''}</td>
-        <td>${p.name ?? ''}</td>
-        <td>${p.weight ?? ''}</td>
-        <td>${p.price != null ? `₹${p.price}` : (p.price_text || '')}</td>
-        <td>${p.price_per_100g != null ? `₹${p.price_per_100g}` : ''}</td>
-      `;
-      productsTableBody.appendChild(tr);
-    });
+    appendProducts(data.analyzed_products || data.products);
 
     hide(loading);
     show(results);
@@ -152,6 +122,100 @@ downloadBtn?.addEventListener('click', async () => {
   }
 });
 
+function renderSummary(s, progress) {
+  summary.innerHTML = `
+    <div class="card">
+      <h2>Summary</h2>
+      <p><strong>Query:</strong> ${s.query}</p>
+      <p><strong>Pincodes:</strong> ${s.pincodes.join(', ')}</p>
+      <p><strong>Total products:</strong> ${s.total_products}</p>
+      ${s.analyzed_count ? `<p><strong>AI Analyzed:</strong> ${s.analyzed_count}</p>` : ''}
+      ${progress ? `<p><em>${progress}</em></p>` : ''}
+    </div>
+  `;
+}
+
+function renderBrandList(counts) {
+  brandList.innerHTML = '';
+  counts.forEach(({ brand, count }) => {
+    const li = document.createElement('li');
+    li.textContent = `${brand}: ${count}`;
+    brandList.appendChild(li);
+  });
+}
+
+function appendProducts(products) {
+  const rows = document.createDocumentFragment();
+  products.forEach((p) => {
+    const tr = document.createElement('tr');
+    tr.innerHTML = `
+      <td>${p.pincode}</td>
+      <td>${p.rank ?? ''}</td>
+      <td>${p.brand ?? ''}</td>
+      <td>${p.name ?? ''}</td>
+      <td>${p.weight ?? ''}</td>
+      <td>${p.price != null ? `₹${p.price}` : (p.price_text || '')}</td>
+      <td>${p.price_per_100g != null ? `₹${p.price_per_100g}` : ''}</td>
+    `;
+    rows.appendChild(tr);
+  });
+  productsTableBody.appendChild(rows);
+}
+
+// Reads /api/scrape/stream (newline-delimited JSON) and renders each pincode as it arrives
+async function streamScrape(params) {
+  const resp = await fetch('/api/scrape/stream', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(params),
+  });
+  if (!resp.ok) {
+    throw new Error(`Request failed: ${resp.status}`);
+  }
+
+  productsTableBody.innerHTML = '';
+  brandList.innerHTML = '';
+  let totalProducts = 0;
+
+  const handle = (msg) => {
+    if (msg.type === 'pincode') {
+      totalProducts += msg.products.length;
+      appendProducts(msg.products);
+      renderBrandList(msg.brand_top10_counts);
+      renderSummary(
+        { query: params.query, pincodes: params.pincodes, total_products: totalProducts },
+        `${msg.completed} of ${msg.total_pincodes} pincodes done, still scraping...`,
+      );
+      loadingMessage.textContent = `Scraped ${msg.completed} of ${msg.total_pincodes} pincodes...`;
+      show(results);
+    } else if (msg.type === 'done') {
+      renderSummary(msg.summary);
+      renderBrandList(msg.brand_top10_counts);
+    } else if (msg.type === 'error') {
+      throw new Error(msg.detail);
+    }
+  };
+
+  const reader = resp.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = '';
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffered += decoder.decode(value, { stream: true });
+    let newline;
+    while ((newline = buffered.indexOf('\n')) >= 0) {
+      const line = buffered.slice(0, newline).trim();
+      buffered = buffered.slice(newline + 1);
+      if (line) handle(JSON.parse(line));
+    }
+  }
+  if (buffered.trim()) handle(JSON.parse(buffered));
+
+  hide(loading);
+  show(results);
+}
+
 function renderGapAnalysis(gap) {
   let html = `
     <div class="gap-section">
@@ -1,24 +1,37 @@
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Tuple, Optional
+from typing import AsyncIterator, Iterator, List, Dict, Any, Tuple, Optional
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+import asyncio
+import json
 import os
+import threading
+import weakref
 from dotenv import load_dotenv
 
 # Load environment variables from the project root
 env_path = Path(__file__).parent.parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
-from .scraper.blinkit_scraper import scrape_for_pincode_query
+from .responses import CompressionMiddleware, FastJSONResponse, response_stats, select_fields
+from .executors import ExecutorBusy, api_executor, browser_executor, executor_stats
+from .scraper.card_cache import card_cache_stats
+from .scraper.driver_pool import max_browser_workers
+from .scraper.html_archive import archive_stats
+from .scraper.result_cache import cached_scrape_pincode, recent_scrape_stats, result_cache_stats
+from .single_flight import single_flight_stats
+from .utils.export_formats import EXPORT_FORMATS, get_encoder
 from .utils.gemini_helper import analyze_top_products, generate_gap_analysis
 from .utils.news_helper import get_trending_news, get_market_trends
 
 # Get Gemini API key
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-app = FastAPI(title="Blinkit Scraper UI API", version="0.1.0")
+app = FastAPI(title="Blinkit Scraper UI API", version="0.1.0", default_response_class=FastJSONResponse)
 
 # Allow local dev UIs
 app.add_middleware(
@@ -28,6 +41,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"]
 )
+# gzip (or brotli, if installed) for JSON results; streaming responses pass through
+app.add_middleware(CompressionMiddleware)
 
 
 class ScrapeRequest(BaseModel):
@@ -35,6 +50,8 @@ class ScrapeRequest(BaseModel):
     query: str = Field(..., description="Product type or search query, e.g., 'protein bar' or 'snacks'")
     save_html: bool = Field(False, description="Whether to persist raw HTML pages to disk")
     max_scrolls: int = Field(40, description="Safety limit for scroll attempts")
+    concurrency: Optional[int] = Field(None, ge=1, description="Max pincodes scraped in parallel (capped by pool size and free memory)")
+    refresh: bool = Field(False, description="Ignore cached results from the last hour and scrape again")
 
 
 class AnalysisRequest(BaseModel):
@@ -42,95 +59,271 @@ class AnalysisRequest(BaseModel):
     query: str = Field(..., description="Product type or search query, e.g., 'protein bar' or 'snacks'")
     save_html: bool = Field(False, description="Whether to persist raw HTML pages to disk")
     max_scrolls: int = Field(40, description="Safety limit for scroll attempts")
+    concurrency: Optional[int] = Field(None, ge=1, description="Max pincodes scraped in parallel (capped by pool size and free memory)")
+    refresh: bool = Field(False, description="Ignore cached results from the last hour and scrape again")
     top_n: int = Field(5, description="Number of top products to analyze")
     include_gap_analysis: bool = Field(True, description="Whether to include gap analysis and product recommendations")
 
 
+@app.exception_handler(ExecutorBusy)
+async def executor_busy(_request: Request, exc: ExecutorBusy) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "30"})
+
+
 @app.get("/api/health")
 async def health() -> Dict[str, Any]:
-    return {"status": "ok"}
+    # Never touches the executors' work, so it answers even during long scrapes
+    return {
+        "status": "ok",
+        "executors": executor_stats(),
+        "card_cache": card_cache_stats(),
+        "result_cache": result_cache_stats(),
+        "recent_scrapes": recent_scrape_stats(),
+        "html_archive": archive_stats(),
+        "coalesced": single_flight_stats(),
+        "responses": response_stats(),
+    }
 
 
-def _run_scrape(req: ScrapeRequest) -> Tuple[List[Dict[str, Any]], List[str], str, List[Dict[str, Any]]]:
-    all_products: List[Dict[str, Any]] = []
-    brand_top10_counter: Dict[str, int] = {}
+def _scrape_pincode(req: ScrapeRequest, pincode: str) -> List[Dict[str, Any]]:
+    # Served from the result cache when the same search ran recently
+    return cached_scrape_pincode(
+        pincode=pincode,
+        query=req.query,
+        save_html=req.save_html,
+        max_scrolls=req.max_scrolls,
+        refresh=req.refresh,
+    )
 
+
+def _iter_scrape(req: ScrapeRequest, ordered: bool = True) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    (pincode, ranked products) for each pincode as soon as each is ready:
+    in request order, or in completion order with ordered=False.
+    """
     # Normalize pincodes
     pincodes = [p.strip() for p in req.pincodes if p and p.strip()]
 
-    for pincode in pincodes:
-        products, _html = scrape_for_pincode_query(
-            pincode=pincode,
-            query=req.query,
-            save_html=req.save_html,
-            max_scrolls=req.max_scrolls,
-        )
+    def ranked(pincode: str, products: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
         # Mark ranks and pincode
         for idx, item in enumerate(products):
             item["rank"] = idx + 1
             item["pincode"] = pincode
+        return pincode, products
+
+    # Spread pincodes over a bounded set of browsers
+    workers = max_browser_workers(len(pincodes), req.concurrency) if pincodes else 1
+    if workers > 1:
+        print(f"🚀 Scraping {len(pincodes)} pincodes with {workers} concurrent browsers")
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrape")
+        futures = {executor.submit(_scrape_pincode, req, p): p for p in pincodes}
+        try:
+            # Request order (dicts keep insertion order) or completion order
+            for future in (futures if ordered else as_completed(futures)):
+                yield ranked(futures[future], future.result())
+        finally:
+            # Closed early (client gone) or a pincode failed: don't start the remaining scrapes
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+    else:
+        for pincode in pincodes:
+            yield ranked(pincode, _scrape_pincode(req, pincode))
+
+
+def _count_top10_brands(products: List[Dict[str, Any]], counter: Dict[str, int]) -> None:
+    # Count brand appearances in top 10 for this pincode
+    for item in products[:10]:
+        brand = item.get("brand") or "Unknown"
+        counter[brand] = counter.get(brand, 0) + 1
+
+
+def _brand_counts(counter: Dict[str, int]) -> List[Dict[str, Any]]:
+    # Prepare brand counts as list sorted desc
+    return [
+        {"brand": b, "count": c} for b, c in sorted(counter.items(), key=lambda x: x[1], reverse=True)
+    ]
+
+
+def _run_scrape(req: ScrapeRequest) -> Tuple[List[Dict[str, Any]], List[str], str, List[Dict[str, Any]]]:
+    all_products: List[Dict[str, Any]] = []
+    pincodes: List[str] = []
+    brand_top10_counter: Dict[str, int] = {}
+
+    for pincode, products in _iter_scrape(req):
+        pincodes.append(pincode)
         all_products.extend(products)
+        _count_top10_brands(products, brand_top10_counter)
 
-        # Count brand appearances in top 10 for this pincode
-        for item in products[:10]:
-            brand = item.get("brand") or "Unknown"
-            brand_top10_counter[brand] = brand_top10_counter.get(brand, 0) + 1
+    return all_products, pincodes, req.query, _brand_counts(brand_top10_counter)
 
-    # Prepare brand counts as list sorted desc
-    brand_top10_counts = [
-        {"brand": b, "count": c} for b, c in sorted(brand_top10_counter.items(), key=lambda x: x[1], reverse=True)
-    ]
 
-    return all_products, pincodes, req.query, brand_top10_counts
+def _stream_scrape(req: ScrapeRequest, ordered: bool = True) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Run _iter_scrape on the browser executor and hand each pincode's result
+    to the event loop as it is ready. Raises ExecutorBusy right away (before
+    a streaming response starts); scrape errors surface from the iterator.
+    Close the iterator (aclose) when done so an abandoned scrape stops early;
+    an iterator that is dropped without ever being read stops it as well.
+    """
+    loop = asyncio.get_running_loop()
+    # Small bounded queue: a slow client pauses the scrape instead of buffering every pincode
+    batches: "asyncio.Queue[Optional[Tuple[str, List[Dict[str, Any]]]]]" = asyncio.Queue(maxsize=2)
+    stop = threading.Event()
+
+    def put(item: Optional[Tuple[str, List[Dict[str, Any]]]]) -> bool:
+        # Wait for queue space, but give up as soon as the consumer is gone
+        pending = asyncio.run_coroutine_threadsafe(batches.put(item), loop)
+        while True:
+            try:
+                pending.result(timeout=0.5)
+                return True
+            except FuturesTimeout:
+                if stop.is_set() or loop.is_closed():
+                    pending.cancel()
+                    return False
+
+    def produce() -> None:
+        items = _iter_scrape(req, ordered=ordered)
+        try:
+            for item in items:
+                if stop.is_set() or not put(item):
+                    return
+        finally:
+            # Cancels pincodes not started yet when we stop early
+            items.close()
+            if not stop.is_set():
+                put(None)
+
+    scrape_done = browser_executor.submit(produce)
+
+    async def results() -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+        try:
+            while True:
+                item = await batches.get()
+                if item is None:
+                    break
+                yield item
+            await scrape_done
+        finally:
+            # Client went away (or we failed): let the producer exit, and free
+            # its executor slot right away if it never got to run
+            stop.set()
+            scrape_done.cancel()
+            while not batches.empty():
+                batches.get_nowait()
+
+    iterator = results()
+    # aclose() on an iterator that never started skips the finally above
+    weakref.finalize(iterator, stop.set)
+    return iterator
 
 
 @app.post("/api/scrape")
-async def scrape(req: ScrapeRequest) -> Dict[str, Any]:
-    all_products, pincodes, query, brand_top10_counts = _run_scrape(req)
+async def scrape(req: ScrapeRequest, fields: Optional[str] = None) -> FastJSONResponse:
+    """`fields=pincode,rank,name,price` keeps only those keys of each product."""
+    all_products, pincodes, query, brand_top10_counts = await browser_executor.run(_run_scrape, req)
 
-    return {
+    # Returned as a response object so FastAPI doesn't re-encode every product first
+    return FastJSONResponse({
         "summary": {
             "pincodes": pincodes,
             "query": query,
             "total_products": len(all_products)
         },
         "brand_top10_counts": brand_top10_counts,
-        "products": all_products,
-    }
+        "products": select_fields(all_products, fields),
+    })
 
 
-@app.post("/api/export-csv")
-async def export_csv(req: ScrapeRequest) -> Response:
-    all_products, pincodes, query, _brand_counts = _run_scrape(req)
+@app.post("/api/scrape/stream")
+async def scrape_stream(req: ScrapeRequest, request: Request) -> StreamingResponse:
+    """
+    /api/scrape, delivered incrementally: one `pincode` message per pincode as
+    soon as it finishes (its ranked products plus the running brand counts),
+    then a `done` message with the summary, or an `error` message.
+    Newline-delimited JSON by default; Server-Sent Events with
+    `Accept: text/event-stream`.
+    """
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    pincodes = [p.strip() for p in req.pincodes if p and p.strip()]
+    results = _stream_scrape(req, ordered=False)
+
+    def message(payload: Dict[str, Any]) -> bytes:
+        data = json.dumps(payload, ensure_ascii=False)
+        if sse:
+            return f"event: {payload['type']}\ndata: {data}\n\n".encode("utf-8")
+        return f"{data}\n".encode("utf-8")
+
+    async def stream() -> AsyncIterator[bytes]:
+        brand_top10_counter: Dict[str, int] = {}
+        completed = 0
+        total_products = 0
+        try:
+            async for pincode, products in results:
+                completed += 1
+                total_products += len(products)
+                _count_top10_brands(products, brand_top10_counter)
+                yield message({
+                    "type": "pincode",
+                    "pincode": pincode,
+                    "completed": completed,
+                    "total_pincodes": len(pincodes),
+                    "products": products,
+                    "brand_top10_counts": _brand_counts(brand_top10_counter),
+                })
+            yield message({
+                "type": "done",
+                "summary": {"pincodes": pincodes, "query": req.query, "total_products": total_products},
+                "brand_top10_counts": _brand_counts(brand_top10_counter),
+            })
+        except Exception as e:
+            print(f"❌ Streaming scrape failed: {e}")
+            yield message({"type": "error", "detail": str(e), "completed": completed})
+        finally:
+            await results.aclose()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    # Build CSV content
-    import csv
-    import io
 
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    header = [
-        "pincode", "rank", "brand", "name", "weight", "price", "price_text", "grams", "price_per_100g"
-    ]
-    writer.writerow(header)
-    for p in all_products:
-        writer.writerow([
-            p.get("pincode", ""),
-            p.get("rank", ""),
-            p.get("brand", ""),
-            p.get("name", ""),
-            p.get("weight", ""),
-            p.get("price", ""),
-            p.get("price_text", ""),
-            p.get("grams", ""),
-            p.get("price_per_100g", ""),
-        ])
-
-    csv_bytes = buf.getvalue()
-    filename = f"blinkit_products_{'_'.join(pincodes)}_{query.replace(' ', '_')}.csv"
-    return Response(
-        content=csv_bytes,
-        media_type="text/csv",
+@app.post("/api/export-csv")
+async def export_csv(req: ScrapeRequest, format: str = "csv") -> StreamingResponse:
+    """
+    Stream the scraped products as they are ready, one pincode at a time.
+    `format`: csv (default), parquet (one row group per pincode) or arrow
+    (Arrow IPC stream); the columnar formats keep numeric types and need pyarrow.
+    """
+    encoder = get_encoder(format)
+    if encoder is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format '{format}'. Use one of: {', '.join(EXPORT_FORMATS)} (parquet/arrow need pyarrow)")
+
+    # Raises ExecutorBusy (503) here, before any bytes are sent
+    results = _stream_scrape(req)
+
+    async def stream() -> AsyncIterator[bytes]:
+        try:
+            async for _pincode, products in results:
+                chunk = encoder.write(products)
+                if chunk:
+                    yield chunk
+            yield encoder.close()
+        except Exception as e:
+            # Headers are already sent: re-raise so the server aborts the chunked
+            # response instead of ending it cleanly with a truncated file
+            print(f"❌ Export failed mid-stream: {e}")
+            raise
+        finally:
+            await results.aclose()
+
+    pincodes = [p.strip() for p in req.pincodes if p and p.strip()]
+    filename = f"blinkit_products_{'_'.join(pincodes)}_{req.query.replace(' ', '_')}.{encoder.extension}"
+    return StreamingResponse(
+        stream(),
+        media_type=encoder.media_type,
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
         }
@@ -138,30 +331,33 @@ async def export_csv(req: ScrapeRequest) -> Response:
 
 
 @app.post("/api/analyze")
-async def analyze_products(req: AnalysisRequest) -> Dict[str, Any]:
+async def analyze_products(req: AnalysisRequest, fields: Optional[str] = None) -> Dict[str, Any]:
     """
     Scrape products and provide AI-powered analysis including:
     - Product descriptions
     - Nutrition analysis
     - Pros and cons
     - Gap analysis and product launch recommendations
+    `fields=` keeps only those keys of each analyzed product.
     """
     # First, scrape the products
     scrape_req = ScrapeRequest(
         pincodes=req.pincodes,
         query=req.query,
         save_html=req.save_html,
-        max_scrolls=req.max_scrolls
+        max_scrolls=req.max_scrolls,
+        concurrency=req.concurrency,
+        refresh=req.refresh,
     )
-    all_products, pincodes, query, brand_top10_counts = _run_scrape(scrape_req)
+    all_products, pincodes, query, brand_top10_counts = await browser_executor.run(_run_scrape, scrape_req)
     
     # Analyze top N products with Gemini
-    analyzed_products = analyze_top_products(all_products, top_n=req.top_n)
+    analyzed_products = await api_executor.run(analyze_top_products, all_products, top_n=req.top_n)
     
     # Generate gap analysis if requested
     gap_analysis = None
     if req.include_gap_analysis:
-        gap_analysis = generate_gap_analysis(analyzed_products, query)
+        gap_analysis = await api_executor.run(generate_gap_analysis, analyzed_products, query)
     
     return {
         "summary": {
@@ -171,7 +367,7 @@ async def analyze_products(req: AnalysisRequest) -> Dict[str, Any]:
             "analyzed_count": len(analyzed_products)
         },
         "brand_top10_counts": brand_top10_counts,
-        "analyzed_products": analyzed_products,
+        "analyzed_products": select_fields(analyzed_products, fields),
         "gap_analysis": gap_analysis
     }
 
@@ -183,8 +379,8 @@ async def quick_analysis(products: List[Dict[str, Any]], query: str) -> Dict[str
     Useful for analyzing existing data
     """
     top_n = min(10, len(products))
-    analyzed_products = analyze_top_products(products, top_n=top_n)
-    gap_analysis = generate_gap_analysis(analyzed_products, query)
+    analyzed_products = await api_executor.run(analyze_top_products, products, top_n=top_n)
+    gap_analysis = await api_executor.run(generate_gap_analysis, analyzed_products, query)
     
     return {
         "analyzed_products": analyzed_products,
@@ -202,7 +398,7 @@ async def get_news(query: str, days: int = 7, max_results: int = 10) -> Dict[str
         days: Number of days to look back (default: 7)
         max_results: Maximum articles to return (default: 10)
     """
-    news_data = get_trending_news(query, days_back=days, max_results=max_results)
+    news_data = await api_executor.run(get_trending_news, query, days_back=days, max_results=max_results)
     return news_data
 
 
@@ -216,7 +412,7 @@ async def get_trends(category: str) -> Dict[str, Any]:
     """
     # Enhance category for better search results
     search_category = f"{category} food" if category not in ["food", "beverage"] else category
-    trends_data = get_market_trends(search_category)
+    trends_data = await api_executor.run(get_market_trends, search_category)
     return trends_data
 
 
@@ -0,0 +1,155 @@
+import gzip
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:
+    import orjson  # Optional: several times faster than json.dumps on large reports
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import brotli  # Optional: smaller than gzip on JSON; offered only when installed
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Any] = {
+    "responses": 0, "payload_bytes": 0, "serialize_ms": 0.0,
+    "compressed": 0, "compressed_bytes": 0, "uncompressed_bytes": 0,
+}
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when installed (stdlib json otherwise).
+    Each response reports its serialization time and size in the
+    Server-Timing and X-Payload-Bytes headers; totals are in response_stats().
+    """
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        if orjson is not None:
+            body = orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            body = json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=str).encode("utf-8")
+        self.serialize_ms = (time.perf_counter() - started) * 1000
+        return body
+
+    def __init__(self, content: Any, *args: Any, **kwargs: Any) -> None:
+        super().__init__(content, *args, **kwargs)
+        self.headers["Server-Timing"] = f"serialize;dur={self.serialize_ms:.2f}"
+        self.headers["X-Payload-Bytes"] = str(len(self.body))
+        with _stats_lock:
+            _stats["responses"] += 1
+            _stats["payload_bytes"] += len(self.body)
+            _stats["serialize_ms"] += self.serialize_ms
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best of br/gzip the client accepts (q-values honoured, br preferred on ties)."""
+    explicit: Dict[str, float] = {}
+    star: Optional[float] = None
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name, params = name.strip().lower(), params.strip()
+        try:
+            q = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            q = 0.0
+        if name == "*":
+            star = q
+        elif name:
+            explicit[name] = q
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    scores = {enc: explicit.get(enc, star if star is not None else 0.0) for enc in offered}
+    best = max(offered, key=lambda enc: scores[enc])  # first wins ties
+    return best if scores[best] > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    gzip/brotli for complete responses, negotiated from Accept-Encoding.
+    Streaming responses (SSE, NDJSON, exports: no Content-Length) pass
+    through untouched and unbuffered, so they still arrive incrementally.
+    """
+
+    def __init__(self, app: Any, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Dict[str, Any]] = None
+
+        async def send_compressed(message: Dict[str, Any]) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-length" not in headers or headers.get("content-type", "").startswith("text/event-stream"):
+                    await send(message)  # streaming: headers go out now, body as it comes
+                    return
+                start_message = message  # held until we know whether the body is complete
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if message.get("more_body") or "content-encoding" in headers or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+            compressed = self._compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            with _stats_lock:
+                _stats["compressed"] += 1
+                _stats["uncompressed_bytes"] += len(body)
+                _stats["compressed_bytes"] += len(compressed)
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def response_stats() -> Dict[str, Any]:
+    """Totals since startup, for the health endpoints."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["serialize_ms"] = round(stats["serialize_ms"], 2)
+    stats["json_encoder"] = "orjson" if orjson is not None else "json"
+    stats["encodings"] = ["br", "gzip"] if brotli is not None else ["gzip"]
+    stats["compression_ratio"] = (
+        round(stats["compressed_bytes"] / stats["uncompressed_bytes"], 4) if stats["uncompressed_bytes"] else None
+    )
+    return stats
+
+
+def select_fields(rows: List[Any], fields: Optional[str]) -> List[Any]:
+    """Keep only the comma-separated `fields` of each dict row (every field when `fields` is empty)."""
+    wanted = [f.strip() for f in (fields or "").split(",") if f.strip()]
+    if not wanted:
+        return rows
+    return [{k: row[k] for k in wanted if k in row} if isinstance(row, dict) else row for row in rows]
@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .blinkit_scraper import _products_from_payloads, scrape_for_pincode_query
+from .location_session import load_location_session
+
+
+# Point BLINKIT_API_BASE at blinkit_replay_server.py to test against recorded responses
+API_BASE = os.getenv("BLINKIT_API_BASE", "https://blinkit.com")
+SEARCH_PATH = os.getenv("BLINKIT_SEARCH_PATH", "/v1/layout/search")
+PAGE_SIZE = 24
+MAX_PAGES = 20
+REQUEST_TIMEOUT = 10
+
+_CHALLENGE_MARKERS = ("captcha", "cf-chl", "challenge-platform", "access denied")
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _http_session() -> requests.Session:
+    """Shared keep-alive session so repeated searches reuse TCP/TLS connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=1)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session.headers.update({
+                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36",
+                "Accept": "application/json",
+                "Accept-Language": "en-IN",
+                "app_client": "consumer_web",
+            })
+        return _session
+
+
+def _location_for(pincode: str) -> Tuple[Optional[Dict[str, str]], Dict[str, str]]:
+    """
+    Location headers and cookies for a pincode, taken from the browser session
+    saved after a Selenium scrape verified the pincode. Coordinates alone are
+    not enough: nothing in the API response confirms which store answered.
+    """
+    session = load_location_session(pincode)
+    if not session:
+        return None, {}
+    cookies = {c["name"]: c.get("value", "") for c in session.get("cookies", [])}
+    lat, lon = cookies.get("gr_1_lat"), cookies.get("gr_1_lon")
+    if not (lat and lon):
+        return None, cookies
+    return {"lat": lat, "lon": lon}, cookies
+
+
+def _is_challenge(resp: requests.Response) -> bool:
+    if resp.status_code in (401, 403, 429, 503):
+        return True
+    if "json" not in resp.headers.get("Content-Type", ""):
+        return True
+    head = resp.text[:2000].lower()
+    return any(marker in head for marker in _CHALLENGE_MARKERS)
+
+
+def _next_url(payload: Dict[str, Any]) -> Optional[str]:
+    response = payload.get("response") if isinstance(payload, dict) else None
+    pagination = response.get("pagination") if isinstance(response, dict) else None
+    if isinstance(pagination, dict) and pagination.get("next_url"):
+        return pagination["next_url"]
+    if isinstance(payload, dict) and payload.get("next_url"):
+        return payload["next_url"]
+    return None
+
+
+def scrape_for_pincode_query_http(pincode: str, query: str, max_products: Optional[int] = None, stats: Optional[Dict[str, Any]] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Fetch search results straight from Blinkit's search API, following
+    server-side pagination. Returns products in the same shape as
+    scrape_for_pincode_query, or None if the location is unknown or the API
+    answered with a challenge/error (the caller should then use Selenium).
+    """
+    headers, cookies = _location_for(pincode)
+    if headers is None:
+        print(f"ℹ️ No verified location session for pincode {pincode}, HTTP engine needs a browser bootstrap first")
+        return None
+
+    http = _http_session()
+    started = time.time()
+    products: List[Dict[str, Any]] = []
+    seen_ids: set = set()
+    search_url = API_BASE + SEARCH_PATH
+    search_params = {"q": query, "search_type": "type_to_search", "limit": PAGE_SIZE}
+    url: Optional[str] = search_url
+    params: Optional[Dict[str, Any]] = dict(search_params, offset=0)
+    pages = 0
+
+    while url and pages < MAX_PAGES:
+        try:
+            resp = http.post(url, params=params, headers=headers, cookies=cookies, json={}, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            print(f"⚠️ HTTP engine request failed: {e}")
+            return None
+        if _is_challenge(resp):
+            print(f"⚠️ HTTP engine got a challenge/error response (status {resp.status_code})")
+            return None
+        try:
+            payload = resp.json()
+        except ValueError:
+            return None
+        pages += 1
+
+        # By product id: pack-size variants share a name and can share a price
+        page_products = _products_from_payloads([payload], seen_ids=seen_ids)
+        if not page_products:
+            break
+        products.extend(page_products)
+        if max_products and len(products) >= max_products:
+            break
+
+        next_url = _next_url(payload)
+        if next_url:
+            url = next_url if next_url.startswith("http") else API_BASE + next_url
+            params = None
+        else:
+            # No server cursor: back to the search endpoint with the original query
+            url = search_url
+            params = dict(search_params, offset=pages * PAGE_SIZE)
+
+    elapsed = time.time() - started
+    print(f"⚡ HTTP engine: {len(products)} products in {pages} pages ({elapsed * 1000:.0f} ms)")
+    if stats is not None:
+        stats["http"] = {"pages": pages, "seconds": round(elapsed, 3)}
+    return products
+
+
+def scrape_pincode(pincode: str, query: str, save_html: bool = False, max_scrolls: int = 20, headless: bool = True, max_products: Optional[int] = None, stats: Optional[Dict[str, Any]] = None, engine: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Scrape one pincode with the configured engine (BLINKIT_ENGINE):
+      "selenium" - always use the browser (default)
+      "http"     - try the search API first, for pincodes with a verified
+                   location session; fall back to Selenium on a missing
+                   session, a challenge or an empty result
+    A Selenium run also saves the location session the HTTP engine reuses.
+    """
+    engine = (engine or os.getenv("BLINKIT_ENGINE", "selenium")).lower()
+    # Raw HTML is only available from the browser
+    if engine == "http" and not save_html and headless:
+        products = scrape_for_pincode_query_http(pincode, query, max_products=max_products, stats=stats)
+        if products:
+            if stats is not None:
+                stats["engine"] = "http"
+            return products, None
+        print(f"↩️ Falling back to Selenium for pincode {pincode}")
+
+    if stats is not None:
+        stats["engine"] = "selenium"
+    return scrape_for_pincode_query(
+        pincode=pincode,
+        query=query,
+        save_html=save_html,
+        max_scrolls=max_scrolls,
+        headless=headless,
+        max_products=max_products,
+        stats=stats,
+    )
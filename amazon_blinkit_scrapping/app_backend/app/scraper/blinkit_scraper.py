@@ -1,28 +1,67 @@
 import time
 import os
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple, Union
 from urllib.parse import quote_plus
 
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from ..utils.weights import parse_price_to_float, parse_weight_to_grams, price_per_100g, extract_brand
+from .card_cache import MISS, CardParseCache, card_cache_enabled, card_key, get_card_cache, scan_card_markup
+from .driver_pool import get_driver_pool, pool_enabled
+from .html_archive import archive_enabled, get_html_archive
+from .html_parsers import extract_card_fields, resolve_parser
+from .html_stream import iter_card_fields, iter_page_chunks
+from .network_capture import (
+    capture_search_payloads,
+    enable_resource_blocking,
+    extract_products_from_payloads,
+    read_network_events,
+    record_payloads,
+    summarize_traffic,
+)
+from .location_session import (
+    apply_location_session,
+    invalidate_location_session,
+    load_location_session,
+    save_location_session,
+    session_cache_enabled,
+)
 
 
 SEARCH_URL_TPL = "https://blinkit.com/s/?q={query}"
 
+# Approximate coordinates for known pincodes (used for geolocation override)
+PINCODE_COORDS = {
+    "110001": {"latitude": 28.6139, "longitude": 77.2090, "accuracy": 100},  # Delhi
+    "400050": {"latitude": 19.0760, "longitude": 72.8777, "accuracy": 100},  # Mumbai
+    "560001": {"latitude": 12.9716, "longitude": 77.5946, "accuracy": 100},  # Bangalore
+    "380015": {"latitude": 23.0225, "longitude": 72.5714, "accuracy": 100},  # Ahmedabad
+}
+
+
+def lean_profile_enabled() -> bool:
+    # BLINKIT_LEAN=0 loads images/fonts/trackers again, e.g. for visual debugging
+    return os.getenv("BLINKIT_LEAN", "1").lower() not in ("0", "false")
+
+
+def stream_parse_enabled() -> bool:
+    # BLINKIT_STREAM_PARSE=1 parses the rendered page in chunks instead of as one string + tree
+    return os.getenv("BLINKIT_STREAM_PARSE", "0").lower() in ("1", "true")
+
 
 def _init_driver(headless: bool = True) -> webdriver.Chrome:
     chrome_options = Options()
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
+    # Network events in the performance log let us read the search API JSON
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
     
     # Allow overriding headless via env var BLINKIT_HEADLESS=0/false
     headless_env = os.getenv("BLINKIT_HEADLESS", "1").lower()
@@ -51,7 +90,8 @@ def _init_driver(headless: bool = True) -> webdriver.Chrome:
         service = Service()
         driver = webdriver.Chrome(service=service, options=chrome_options)
         driver.set_window_size(1400, 1000)
-        print(f"✅ Chrome driver initialized successfully (headless={headless_flag})")
+        lean = lean_profile_enabled() and enable_resource_blocking(driver)
+        print(f"✅ Chrome driver initialized successfully (headless={headless_flag}, lean={lean})")
         return driver
     except Exception as e:
         print(f"❌ Failed to initialize Chrome driver: {e}")
@@ -59,364 +99,677 @@ def _init_driver(headless: bool = True) -> webdriver.Chrome:
         raise
 
 
-def _verify_pincode(driver: webdriver.Chrome, expected_pincode: str) -> bool:
+# Checks every place Blinkit may reflect the pincode in one round trip:
+# visible page elements, localStorage, sessionStorage and (non-HttpOnly) cookies.
+_VERIFY_PINCODE_JS = """
+var pin = arguments[0];
+var verdict = {verified: false, source: null, element: null, local_storage: null,
+               session_storage: null, cookies: [], page_text: {}};
+var xpath = "//*[contains(text(), '" + pin + "')] | //input[@value='" + pin + "']";
+var found = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+for (var i = 0; i < found.snapshotLength; i++) {
+    var el = found.snapshotItem(i);
+    if (el.getClientRects().length) { verdict.element = el.tagName.toLowerCase(); break; }
+}
+try {
+    verdict.local_storage = localStorage.getItem('pincode') || localStorage.getItem('delivery_pincode');
+    verdict.session_storage = sessionStorage.getItem('pincode') || sessionStorage.getItem('delivery_pincode');
+} catch (e) {}
+document.cookie.split(';').forEach(function(pair) {
+    var idx = pair.indexOf('='), name = pair.slice(0, idx).trim(), value = pair.slice(idx + 1).trim();
+    if (/pincode|location/i.test(name)) verdict.cookies.push({name: name, value: value});
+});
+var text = document.body ? document.body.innerText : '';
+verdict.page_text = {
+    pincode: text.indexOf(pin) !== -1,
+    delivery: /delivery/i.test(text),
+    location: /location/i.test(text)
+};
+if (verdict.element) verdict.source = 'page element';
+else if (verdict.local_storage === pin) verdict.source = 'localStorage';
+else if (verdict.session_storage === pin) verdict.source = 'sessionStorage';
+else if (verdict.cookies.some(function(c) { return c.value.indexOf(pin) !== -1; })) verdict.source = 'cookie';
+verdict.verified = verdict.source !== null;
+return verdict;
+"""
+
+
+def _verify_pincode(driver: webdriver.Chrome, expected_pincode: str, verdicts: Optional[Dict[str, Dict[str, Any]]] = None) -> bool:
     """
-    Verify if the displayed pincode matches the expected one
+    Verify if the displayed pincode matches the expected one.
+    The full verdict is stored in `verdicts[expected_pincode]` so later steps
+    of the same scrape can reuse it instead of checking again.
     """
     try:
-        verification_methods = []
-        
-        # Look for pincode display in various locations
-        patterns = [
-            f"//*[contains(text(), '{expected_pincode}')]",
-            f"//span[contains(text(), '{expected_pincode}')]",
-            f"//div[contains(text(), '{expected_pincode}')]",
-            f"//button[contains(text(), '{expected_pincode}')]",
-            f"//input[@value='{expected_pincode}']",
-        ]
-        
-        for pattern in patterns:
-            try:
-                element = driver.find_element(By.XPATH, pattern)
-                if element.is_displayed():
-                    verification_methods.append(f"Found in page element: {element.tag_name}")
-                    print(f"   ✓ Found pincode {expected_pincode} displayed on page ({element.tag_name})")
-                    return True
-            except:
-                continue
-        
-        # Check localStorage
-        stored_pincode = driver.execute_script("return localStorage.getItem('pincode') || localStorage.getItem('delivery_pincode');")
-        if stored_pincode == expected_pincode:
-            verification_methods.append("Found in localStorage")
-            print(f"   ✓ Pincode {expected_pincode} found in localStorage")
-            return True
-        elif stored_pincode:
-            print(f"   ⚠️ localStorage has different pincode: {stored_pincode}")
-        
-        # Check sessionStorage
-        session_pincode = driver.execute_script("return sessionStorage.getItem('pincode') || sessionStorage.getItem('delivery_pincode');")
-        if session_pincode == expected_pincode:
-            verification_methods.append("Found in sessionStorage")
-            print(f"   ✓ Pincode {expected_pincode} found in sessionStorage")
-            return True
-        elif session_pincode:
-            print(f"   ⚠️ sessionStorage has different pincode: {session_pincode}")
-        
-        # Check cookies
-        try:
-            cookies = driver.get_cookies()
-            for cookie in cookies:
-                if 'pincode' in cookie.get('name', '').lower() or 'location' in cookie.get('name', '').lower():
-                    print(f"   🍪 Cookie found: {cookie.get('name')} = {cookie.get('value')}")
-                    if expected_pincode in str(cookie.get('value', '')):
-                        return True
-        except:
-            pass
-            
-        print(f"   ✗ Could not verify pincode {expected_pincode} anywhere")
-        return False
+        verdict = driver.execute_script(_VERIFY_PINCODE_JS, expected_pincode) or {}
     except Exception as e:
         print(f"   ⚠️ Verification error: {e}")
+        verdict = {"verified": False, "source": None, "error": str(e)}
+    if verdicts is not None:
+        verdicts[expected_pincode] = verdict
+
+    if verdict.get("verified"):
+        detail = f" ({verdict['element']})" if verdict.get("source") == "page element" else ""
+        print(f"   ✓ Pincode {expected_pincode} found in {verdict['source']}{detail}")
+        return True
+
+    for key, label in (("local_storage", "localStorage"), ("session_storage", "sessionStorage")):
+        if verdict.get(key):
+            print(f"   ⚠️ {label} has different pincode: {verdict[key]}")
+    for cookie in verdict.get("cookies") or []:
+        print(f"   🍪 Cookie found: {cookie.get('name')} = {cookie.get('value')}")
+    if "error" not in verdict:
+        print(f"   ✗ Could not verify pincode {expected_pincode} anywhere")
+    return False
+
+
+# Every pincode/location input we know about, as one XPath union query
+_LOCATION_INPUT_XPATH = " | ".join([
+    "//input[contains(translate(@placeholder, 'PINCODE', 'pincode'), 'pincode')]",
+    "//input[contains(translate(@placeholder, 'PIN', 'pin'), 'pin')]",
+    "//input[contains(translate(@placeholder, 'AREA', 'area'), 'area')]",
+    "//input[contains(translate(@placeholder, 'LOCATION', 'location'), 'location')]",
+    "//input[contains(translate(@placeholder, 'DELIVERY', 'delivery'), 'delivery')]",
+    "//input[@type='text' and @name='pincode']",
+    "//input[@type='text' and contains(@id, 'pincode')]",
+    "//input[@type='text' and contains(@id, 'location')]",
+    "//input[@type='number' and contains(@placeholder, 'code')]",
+])
+
+# Buttons that open the location modal
+_LOCATION_BUTTON_XPATH = " | ".join(
+    f"//button[contains(text(), '{text}')]"
+    for text in ["Detect", "Location", "Delivery", "Select", "Change", "Set"]
+)
+
+# Return the first visible element matching an XPath in one round trip
+_FIRST_VISIBLE_JS = """
+var result = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+for (var i = 0; i < result.snapshotLength; i++) {
+    var el = result.snapshotItem(i);
+    if (el.getClientRects().length && getComputedStyle(el).visibility !== 'hidden') return el;
+}
+return null;
+"""
+
+# Last-resort: any visible text input whose placeholder looks location-related
+_ANY_LOCATION_INPUT_JS = """
+var inputs = document.querySelectorAll("input[type='text']");
+for (var i = 0; i < inputs.length; i++) {
+    var el = inputs[i], ph = (el.getAttribute('placeholder') || '').toLowerCase();
+    if (!el.getClientRects().length) continue;
+    if (['pin', 'code', 'location', 'area', 'delivery'].some(function(w) { return ph.indexOf(w) !== -1; })) return el;
+}
+return null;
+"""
+
+LOCATION_BUDGET = float(os.getenv("BLINKIT_LOCATION_BUDGET", "20"))  # seconds for the whole location step
+
+
+def _first_visible(driver: webdriver.Chrome, xpath: str):
+    try:
+        return driver.execute_script(_FIRST_VISIBLE_JS, xpath)
+    except Exception:
+        return None
+
+
+def _wait_for_location_ui(driver: webdriver.Chrome, timeout: float) -> bool:
+    """Wait until a location input or button is visible instead of sleeping."""
+    try:
+        WebDriverWait(driver, max(0.1, timeout), poll_frequency=0.2).until(
+            lambda d: _first_visible(d, f"{_LOCATION_INPUT_XPATH} | {_LOCATION_BUTTON_XPATH}")
+        )
+        return True
+    except Exception:
         return False
 
 
-def _set_location(driver: webdriver.Chrome, pincode: str, timeout: int = 20) -> bool:
+def _enter_pincode(driver: webdriver.Chrome, pin_input, pincode: str, timeout: float) -> None:
+    pin_input.clear()
+    pin_input.send_keys(pincode)
+    pin_input.send_keys(Keys.ENTER)
+    # The modal closes (input goes away) once Blinkit accepts the location
+    try:
+        WebDriverWait(driver, max(0.1, timeout), poll_frequency=0.2).until(EC.invisibility_of_element(pin_input))
+    except Exception:
+        pass
+
+
+def _set_location(driver: webdriver.Chrome, pincode: str, timeout: float = LOCATION_BUDGET, stats: Optional[Dict[str, Any]] = None) -> bool:
     """
     Best-effort automation to set location/pincode without manual input.
     Returns True if location was successfully set, False otherwise.
+
+    All strategies share one time budget (`timeout` seconds). Which strategy
+    worked and how long each attempt took is appended to `stats["location"]`.
     """
-    wait = WebDriverWait(driver, timeout)
-    
-    print(f"   🔍 Looking for pincode input field...")
-    
-    # Strategy 1: Look for visible input fields with common patterns
-    input_patterns = [
-        "//input[contains(translate(@placeholder, 'PINCODE', 'pincode'), 'pincode')]",
-        "//input[contains(translate(@placeholder, 'PIN', 'pin'), 'pin')]",
-        "//input[contains(translate(@placeholder, 'AREA', 'area'), 'area')]",
-        "//input[contains(translate(@placeholder, 'LOCATION', 'location'), 'location')]",
-        "//input[contains(translate(@placeholder, 'DELIVERY', 'delivery'), 'delivery')]",
-        "//input[@type='text' and @name='pincode']",
-        "//input[@type='text' and contains(@id, 'pincode')]",
-        "//input[@type='text' and contains(@id, 'location')]",
-        "//input[@type='number' and contains(@placeholder, 'code')]",
-    ]
-    
-    for pattern in input_patterns:
+    started = time.monotonic()
+    deadline = started + timeout
+    attempts: List[Dict[str, Any]] = []
+
+    def remaining() -> float:
+        return deadline - time.monotonic()
+
+    def try_input() -> bool:
+        pin_input = _first_visible(driver, _LOCATION_INPUT_XPATH)
+        if not pin_input:
+            return False
+        print(f"   ✓ Found pincode input field")
+        _enter_pincode(driver, pin_input, pincode, min(3, remaining()))
+        return True
+
+    def try_modal() -> bool:
+        btn = _first_visible(driver, _LOCATION_BUTTON_XPATH)
+        if not btn:
+            return False
+        print(f"   ✓ Found location button: {btn.text.strip()[:30]}")
+        btn.click()
         try:
-            pin_input = driver.find_element(By.XPATH, pattern)
-            if pin_input.is_displayed():
-                print(f"   ✓ Found input field with pattern: {pattern[:50]}...")
-                pin_input.clear()
-                pin_input.send_keys(pincode)
-                time.sleep(0.3)
-                pin_input.send_keys(Keys.ENTER)
-                time.sleep(2)  # Wait for location to apply
-                print(f"   ✅ Pincode {pincode} entered successfully")
-                return True
-        except Exception as e:
-            continue
-    
-    # Strategy 2: Try clicking location-related buttons first
-    print(f"   🔍 Looking for location button...")
-    button_texts = ["Detect", "Location", "Delivery", "Select", "Change", "Set"]
-    for btn_text in button_texts:
+            pin_input = WebDriverWait(driver, max(0.1, min(5, remaining())), poll_frequency=0.2).until(
+                lambda d: _first_visible(d, _LOCATION_INPUT_XPATH)
+            )
+        except Exception:
+            return False
+        print(f"   ✓ Modal opened, entering pincode...")
+        _enter_pincode(driver, pin_input, pincode, min(3, remaining()))
+        return True
+
+    def try_any_input() -> bool:
+        inp = driver.execute_script(_ANY_LOCATION_INPUT_JS)
+        if not inp:
+            return False
+        print(f"   ✓ Found matching input: {inp.get_attribute('placeholder')}")
+        _enter_pincode(driver, inp, pincode, min(3, remaining()))
+        return True
+
+    print(f"   🔍 Looking for pincode input field...")
+    succeeded = None
+    for name, strategy in (("input", try_input), ("modal", try_modal), ("any_input", try_any_input)):
+        if remaining() <= 0:
+            print(f"   ⏱️ Location budget of {timeout:.0f}s used up")
+            break
+        t0 = time.monotonic()
         try:
-            # Try exact match
-            btn = driver.find_element(By.XPATH, f"//button[contains(text(), '{btn_text}')]")
-            if btn.is_displayed():
-                print(f"   ✓ Found button: {btn_text}")
-                btn.click()
-                time.sleep(1.5)
-                
-                # Now try to find input after modal opens
-                for pattern in input_patterns:
-                    try:
-                        pin_input = WebDriverWait(driver, 5).until(
-                            EC.presence_of_element_located((By.XPATH, pattern))
-                        )
-                        if pin_input.is_displayed():
-                            print(f"   ✓ Modal opened, entering pincode...")
-                            pin_input.clear()
-                            pin_input.send_keys(pincode)
-                            time.sleep(0.3)
-                            pin_input.send_keys(Keys.ENTER)
-                            time.sleep(2)
-                            print(f"   ✅ Pincode {pincode} entered via modal")
-                            return True
-                    except Exception:
-                        continue
+            ok = strategy()
         except Exception:
-            continue
-    
-    # Strategy 3: Try any visible text input as last resort
-    print(f"   🔍 Trying any visible text input...")
-    try:
-        inputs = driver.find_elements(By.XPATH, "//input[@type='text']")
-        for inp in inputs:
-            if inp.is_displayed():
-                placeholder = inp.get_attribute("placeholder") or ""
-                if any(word in placeholder.lower() for word in ["pin", "code", "location", "area", "delivery"]):
-                    print(f"   ✓ Found matching input: {placeholder}")
-                    inp.clear()
-                    inp.send_keys(pincode)
-                    time.sleep(0.3)
-                    inp.send_keys(Keys.ENTER)
-                    time.sleep(2)
-                    print(f"   ✅ Pincode {pincode} entered successfully")
-                    return True
-    except Exception:
-        pass
-    
-    print(f"   ❌ Could not find pincode input field")
+            ok = False
+        attempts.append({"strategy": name, "ok": ok, "seconds": round(time.monotonic() - t0, 2)})
+        if ok:
+            succeeded = name
+            break
+
+    elapsed = time.monotonic() - started
+    if stats is not None:
+        stats.setdefault("location", []).append({
+            "strategy": succeeded,
+            "seconds": round(elapsed, 2),
+            "attempts": attempts,
+        })
+
+    if succeeded:
+        print(f"   ✅ Pincode {pincode} entered via {succeeded} ({elapsed:.1f}s)")
+        return True
+    print(f"   ❌ Could not find pincode input field ({elapsed:.1f}s)")
     return False
 
 
-def _scroll_to_bottom(driver: webdriver.Chrome, max_scrolls: int = 20) -> int:
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    attempts = 0
+# Product cards in the search grid; also used to decide when a scroll settled
+CARD_SELECTOR = 'div[id][role="button"][tabindex="0"]'
+
+# Scroll, then resolve as soon as the card count changes and the grid has been
+# quiet for a moment, or after `timeoutMs` if nothing new shows up.
+_SCROLL_AND_WAIT_JS = """
+var selector = arguments[0], before = arguments[1], timeoutMs = arguments[2], quietMs = arguments[3];
+var done = arguments[arguments.length - 1];
+var start = performance.now(), finished = false, quietTimer = null, timer = null, observer = null;
+var count = function() { return document.querySelectorAll(selector).length; };
+var finish = function() {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(timer); clearTimeout(quietTimer);
+    done({count: count(), height: document.body.scrollHeight, waited_ms: performance.now() - start});
+};
+observer = new MutationObserver(function() {
+    if (count() !== before) { clearTimeout(quietTimer); quietTimer = setTimeout(finish, quietMs); }
+});
+observer.observe(document.body, {childList: true, subtree: true});
+timer = setTimeout(finish, timeoutMs);
+window.scrollTo(0, document.body.scrollHeight);
+"""
+
+SCROLL_MIN_TIMEOUT = 0.75   # seconds to wait for new cards after a scroll
+SCROLL_MAX_TIMEOUT = 4.0
+SCROLL_QUIET_MS = 200       # grid must be stable this long after new cards appear
+SCROLL_STAGNANT_STEPS = 2   # stop after this many scrolls without new cards
+
+
+def _scroll_to_bottom(driver: webdriver.Chrome, max_scrolls: int = 20, target_count: Optional[int] = None, stats: Optional[Dict[str, Any]] = None, on_step: Optional[Callable[[], None]] = None) -> int:
+    """
+    Scroll the result grid until it stops growing, `target_count` cards are
+    loaded, or `max_scrolls` is reached. Each step waits on a MutationObserver
+    instead of a fixed sleep; the timeout adapts to how quickly the last batch
+    of cards arrived. Scroll statistics are written to `stats["scroll"]`.
+    `on_step` is called before the first scroll and after every step.
+    """
+    started = time.time()
+    driver.set_script_timeout(SCROLL_MAX_TIMEOUT + 5)
+    count = driver.execute_script("return document.querySelectorAll(arguments[0]).length", CARD_SELECTOR)
+    height = driver.execute_script("return document.body.scrollHeight")
+    timeout = SCROLL_MAX_TIMEOUT / 2
+    cards_per_step: List[int] = []
     stagnant = 0
-    while attempts < max_scrolls:
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2.5)  # Increased from 1.5s for more reliable loading
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
+    steps = 0
+    stop_reason = "max_scrolls"
+
+    while steps < max_scrolls:
+        if on_step:
+            on_step()
+        if target_count and count >= target_count:
+            stop_reason = "target_count"
+            break
+        result = driver.execute_async_script(
+            _SCROLL_AND_WAIT_JS, CARD_SELECTOR, count, int(timeout * 1000), SCROLL_QUIET_MS
+        )
+        steps += 1
+        new_count, new_height = result["count"], result["height"]
+        cards_per_step.append(new_count - count)
+
+        if new_count > count or new_height > height:
+            stagnant = 0
+            # Next wait: about twice what this batch needed, within bounds
+            waited = result["waited_ms"] / 1000.0
+            timeout = min(SCROLL_MAX_TIMEOUT, max(SCROLL_MIN_TIMEOUT, waited * 2))
+        else:
             stagnant += 1
-            if stagnant >= 3:  # Increased from 2 for better accuracy
+            if stagnant >= SCROLL_STAGNANT_STEPS:
+                stop_reason = "settled"
                 break
-        else:
-            stagnant = 0
-        last_height = new_height
-        attempts += 1
-    return attempts
+            # Give a slow network one longer chance before giving up
+            timeout = min(SCROLL_MAX_TIMEOUT, timeout * 1.5)
+        count, height = new_count, new_height
+
+    if on_step and steps:
+        on_step()
+
+    elapsed = time.time() - started
+    scroll_stats = {
+        "steps": steps,
+        "seconds": round(elapsed, 2),
+        "cards": count,
+        "cards_per_step": cards_per_step,
+        "stop_reason": stop_reason,
+    }
+    if stats is not None:
+        stats["scroll"] = scroll_stats
+    print(f"📜 Scrolled {steps} steps in {elapsed:.1f}s, {count} cards loaded ({stop_reason})")
+    return steps
+
+
+def _slug(text: str) -> str:
+    return text.strip().lower().replace(" ", "_")
+
+
+def _make_product(name: str, weight: str, price_text: str) -> Optional[Dict[str, Any]]:
+    """Normalize raw card fields into a product dict, or None if it isn't a real product."""
+    price = parse_price_to_float(price_text)
+    grams = parse_weight_to_grams(weight)
+    p100 = price_per_100g(price, grams)
+    brand = extract_brand(name)
+
+    # Filter out invalid products (search headers, empty products, etc.)
+    if (name and len(name) > 5 and 
+        not name.lower().startswith('showing') and
+        not name.lower().startswith('results for') and
+        price is not None and price > 0):
+        return {
+            "name": name or "N/A",
+            "brand": brand,
+            "weight": weight or "N/A",
+            "price": price,
+            "price_text": price_text,
+            "grams": grams,
+            "price_per_100g": p100
+        }
+    return None
+
 
+def _products_from_payloads(payloads: List[Any], seen_ids: Optional[set] = None) -> List[Dict[str, Any]]:
+    """
+    Build products from decoded Blinkit search API payloads. Product ids
+    already in `seen_ids` are skipped and new ones are added, so pages
+    fetched one at a time can be de-duplicated across the whole search.
+    """
+    products: List[Dict[str, Any]] = []
+    for raw in extract_products_from_payloads(payloads):
+        if seen_ids is not None:
+            if raw["product_id"] in seen_ids:
+                continue
+            seen_ids.add(raw["product_id"])
+        product = _make_product(raw["name"], raw["weight"], raw["price_text"])
+        if product:
+            products.append(product)
+    return products
 
-def _extract_first(regex, text: str) -> Optional[str]:
-    import re
-    m = re.search(regex, text)
-    return m.group(0) if m else None
 
+# Collects name/weight/price for every card not yet collected and marks them,
+# so repeated calls after each scroll step only return the new cards.
+_EXTRACT_CARDS_JS = """
+var cards = document.querySelectorAll(arguments[0] + ':not([data-scraped])');
+var out = [];
+var textOf = function(card, selector) {
+    var el = card.querySelector(selector);
+    return el ? el.textContent.trim() : '';
+};
+for (var i = 0; i < cards.length; i++) {
+    var card = cards[i];
+    card.setAttribute('data-scraped', '1');
+    var name = textOf(card, 'div.tw-text-300.tw-font-semibold.tw-line-clamp-2');
+    var weight = textOf(card, 'div.tw-text-200.tw-font-medium.tw-line-clamp-1');
+    var price = textOf(card, 'div.tw-flex.tw-items-center.tw-justify-between > div > div.tw-text-200.tw-font-semibold');
+    var text = '';
+    if (!name || name.length < 3 || !weight || weight.length < 2 || !price) {
+        text = card.innerText || card.textContent || '';
+    }
+    if (!name || name.length < 3) {
+        var lines = text.split('\\n').map(function(s) { return s.trim(); }).filter(Boolean);
+        lines.sort(function(a, b) { return b.length - a.length; });
+        name = lines.length ? lines[0].slice(0, 120) : '';
+    }
+    if (!weight || weight.length < 2) {
+        var w = text.replace(/\\s+/g, ' ').match(/\\b\\d+(?:\\.\\d+)?\\s*(?:x\\s*)?\\d*(?:\\.\\d+)?\\s*(?:g|kg)\\b/);
+        weight = w ? w[0] : '';
+    }
+    if (!price) {
+        var p = text.match(/₹\\s*\\d[\\d,]*(?:\\.\\d+)?/);
+        price = p ? p[0] : '';
+    }
+    out.push({id: card.id || '', name: name, weight: weight, price_text: price});
+}
+return out;
+"""
+
+
+def _extract_cards_in_browser(driver: webdriver.Chrome, collected: List[Dict[str, str]]) -> None:
+    """Append fields of newly loaded cards to `collected` with one script call."""
+    try:
+        collected.extend(driver.execute_script(_EXTRACT_CARDS_JS, CARD_SELECTOR) or [])
+    except Exception as e:
+        print(f"⚠️ In-browser card extraction failed: {e}")
 
-def _parse_products(html: str) -> List[Dict[str, Any]]:
-    soup = BeautifulSoup(html, 'html.parser')
 
+def _products_from_card_fields(card_fields: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Build products from in-browser card fields, keeping the first card per id."""
+    seen = set()
     products: List[Dict[str, Any]] = []
+    for fields in card_fields:
+        card_id = fields.get("id")
+        if card_id and card_id in seen:
+            continue
+        product = _make_product(fields.get("name", ""), fields.get("weight", ""), fields.get("price_text", ""))
+        if product:
+            if card_id:
+                seen.add(card_id)
+            products.append(product)
+    return products
+
 
-    # Try multiple selectors for product cards
-    selectors = [
-        'div[id][role="button"][tabindex="0"]',
-        'div[data-testid*="product"]',
-        'div[data-test*="product"]',
-        'a[href*="/product/"]',
-    ]
+def _parse_products_cached(html: str, parser: Optional[str], cache: CardParseCache) -> Optional[List[Dict[str, Any]]]:
+    """
+    Card-level cached parse: cards are cut out of the raw HTML and looked up
+    by content hash; only unseen cards are parsed (as small fragments).
+    Returns None if the page has to go through the full parser.
+    """
+    cards = scan_card_markup(html)
+    if cards is None:
+        return None
+    products: List[Dict[str, Any]] = []
+    parsed: Dict[str, Optional[Dict[str, Any]]] = {}
     seen = set()
-    cards: List[Any] = []
-    for sel in selectors:
-        for el in soup.select(sel):
-            if id(el) not in seen:
-                cards.append(el)
-                seen.add(id(el))
-
-    # Fallback: broader card guess by presence of price symbol
-    if not cards:
-        for el in soup.find_all(['div', 'a']):
-            txt = el.get_text(" ", strip=True)
-            if '₹' in txt and len(txt) < 400:
-                cards.append(el)
-
-    for card in cards:
-        try:
-            name_el = card.select_one("div.tw-text-300.tw-font-semibold.tw-line-clamp-2")
-            weight_el = card.select_one("div.tw-text-200.tw-font-medium.tw-line-clamp-1")
-            price_el = card.select_one("div.tw-flex.tw-items-center.tw-justify-between > div > div.tw-text-200.tw-font-semibold")
-
-            name = name_el.text.strip() if name_el else ""
-            weight = weight_el.text.strip() if weight_el else ""
-            price_text = price_el.text.strip() if price_el else ""
-
-            # Fallbacks using regex on the card text
-            if not name or len(name) < 3:
-                lines = [s.strip() for s in card.get_text("\n", strip=True).split("\n") if s.strip()]
-                if lines:
-                    name = sorted(lines, key=lambda s: len(s), reverse=True)[0][:120]
-
-            if not weight or len(weight) < 2:
-                full_text = card.get_text(" ", strip=True)
-                weight = _extract_first(r"\b\d+(?:\.\d+)?\s*(?:x\s*)?\d*(?:\.\d+)?\s*(?:g|kg)\b", full_text) or ""
-
-            if not price_text:
-                price_text = _extract_first(r"₹\s*\d[\d,]*(?:\.\d+)?", card.get_text(" ", strip=True)) or ""
-
-            price = parse_price_to_float(price_text)
-            grams = parse_weight_to_grams(weight)
-            p100 = price_per_100g(price, grams)
-            brand = extract_brand(name)
-
-            # Filter out invalid products (search headers, empty products, etc.)
-            if (name and len(name) > 5 and 
-                not name.lower().startswith('showing') and
-                not name.lower().startswith('results for') and
-                price is not None and price > 0):
-                products.append({
-                    "name": name or "N/A",
-                    "brand": brand,
-                    "weight": weight or "N/A",
-                    "price": price,
-                    "price_text": price_text,
-                    "grams": grams,
-                    "price_per_100g": p100
-                })
-        except Exception:
-            continue
+    # Backends may disagree on a card, so each one has its own entries
+    backend = resolve_parser(parser)
+    for card_id, markup in cards:
+        if card_id:
+            if card_id in seen:
+                continue
+            seen.add(card_id)
+        key = card_key(markup, backend)
+        if key in parsed:
+            # Same card markup twice on one page, not stored yet
+            product = dict(parsed[key]) if parsed[key] is not None else None
+        else:
+            product = cache.get(key)
+        if product is MISS:
+            fields = extract_card_fields(markup, parser=parser, selectors=[CARD_SELECTOR], fallback=False)
+            product = _make_product(fields[0]["name"], fields[0]["weight"], fields[0]["price_text"]) if fields else None
+            parsed[key] = product
+        if product:
+            products.append(product)
+    # Newly parsed cards are stored once per page (one SQLite commit)
+    cache.put_many(list(parsed.items()))
+    return products
+
 
+def _parse_products(html: str, parser: Optional[str] = None,
+                    cache: Union[CardParseCache, bool, None] = None) -> List[Dict[str, Any]]:
+    """
+    Parse product cards out of a Blinkit results page. `parser` selects the
+    HTML backend ("html.parser", "lxml", "selectolax"; default from
+    BLINKIT_HTML_PARSER), see html_parsers.py. Parsed cards are memoized by
+    content hash in `cache` (default: the shared card cache, BLINKIT_CARD_CACHE;
+    False parses the whole page without any cache).
+    """
+    # selectolax parses a whole page faster than the cache can scan it, so it skips the shared cache
+    if cache is None and card_cache_enabled() and resolve_parser(parser) != "selectolax":
+        cache = get_card_cache()
+    if isinstance(cache, CardParseCache):
+        cached = _parse_products_cached(html, parser, cache)
+        if cached is not None:
+            return cached
+
+    products: List[Dict[str, Any]] = []
+    for fields in extract_card_fields(html, parser=parser):
+        product = _make_product(fields["name"], fields["weight"], fields["price_text"])
+        if product:
+            products.append(product)
     return products
 
 
-def scrape_for_pincode_query(pincode: str, query: str, save_html: bool = False, max_scrolls: int = 20, headless: bool = True) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+def iter_products(chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming _parse_products: yield products as each card is read from the
+    HTML chunks, keeping memory proportional to one card (see html_stream.py).
+    """
+    for fields in iter_card_fields(chunks):
+        product = _make_product(fields["name"], fields["weight"], fields["price_text"])
+        if product:
+            yield product
+
+
+def _run_location_routine(driver: webdriver.Chrome, url: str, pincode: str, headless: bool, stats: Optional[Dict[str, Any]] = None, verdicts: Optional[Dict[str, Dict[str, Any]]] = None) -> bool:
+    """
+    Full location setup: open the page, set the pincode (twice if needed),
+    reload and verify. Returns whether the pincode could be verified.
+    Both _set_location attempts share the BLINKIT_LOCATION_BUDGET time budget.
+    """
+    deadline = time.monotonic() + LOCATION_BUDGET
+    driver.get(url)
+    
+    if not headless:
+        # Manual location mode - give user time to set location
+        print(f"\n⏳ Waiting 15 seconds for you to manually set location to {pincode}...")
+        print(f"   Click on the location/delivery area on the Blinkit page")
+        print(f"   Change it to pincode: {pincode}")
+        print(f"   Scraping will continue automatically...\n")
+        time.sleep(15)
+    else:
+        _wait_for_location_ui(driver, 3)
+
+    # Try to set location and verify it worked
+    print(f"📍 Attempting to set location to pincode: {pincode}")
+    location_set = _set_location(driver, pincode, timeout=deadline - time.monotonic(), stats=stats)
+    
+    if location_set:
+        print(f"✅ Location set to pincode {pincode}")
+    else:
+        print(f"⚠️ Warning: Could not automatically set location for pincode {pincode}.")
+        print(f"   Trying alternative method...")
+        
+        # Alternative: Try to navigate to a URL with location parameter
+        try:
+            # Some sites accept pincode as URL parameter
+            driver.execute_script(f"localStorage.setItem('pincode', '{pincode}');")
+            driver.execute_script(f"localStorage.setItem('delivery_pincode', '{pincode}');")
+        except Exception as e:
+            print(f"   localStorage attempt failed: {e}")
+    
+    # Force a fresh page load after setting location to ensure results match the pincode
+    print(f"🔄 Reloading page to apply pincode {pincode}...")
+    driver.get(url)
+    
+    # Try setting location one more time after reload
+    if not location_set and deadline - time.monotonic() > 0:
+        _wait_for_location_ui(driver, min(2, deadline - time.monotonic()))
+        location_set = _set_location(driver, pincode, timeout=deadline - time.monotonic(), stats=stats)
+        if location_set:
+            print(f"   ✅ Location set successfully on second attempt")
+    
+    # Verify the pincode is actually applied
+    pincode_verified = _verify_pincode(driver, pincode, verdicts)
+    if not pincode_verified:
+        print(f"")
+        print(f"⚠️⚠️⚠️ WARNING: Could not verify pincode {pincode} is active! ⚠️⚠️⚠️")
+        print(f"Products shown may be from default location (380015 or similar)")
+        print(f"")
+        print(f"💡 SOLUTION: Blinkit requires manual location selection in browser.")
+        print(f"   Products scraped will be from whatever location Blinkit defaults to.")
+        print(f"   For accurate location-based scraping:")
+        print(f"   1. Open Blinkit in a browser manually")
+        print(f"   2. Set your delivery location to {pincode}")
+        print(f"   3. Note: Automated pincode change has limitations")
+        print(f"")
+    else:
+        print(f"✅ Pincode {pincode} verified and active")
+    
+    return pincode_verified
+
+
+def scrape_for_pincode_query(pincode: str, query: str, save_html: bool = False, max_scrolls: int = 20, headless: bool = True, max_products: Optional[int] = None, stats: Optional[Dict[str, Any]] = None, extract_mode: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Scrape Blinkit search results for one pincode.
+
+    `max_products` lets scrolling stop early once enough cards are loaded.
+    `extract_mode` (or BLINKIT_EXTRACT_MODE) picks how products are read:
+    "network" decodes the search API JSON the page fetched, "script" collects
+    card fields in the page after each scroll step, "dom" parses the rendered
+    HTML. The first two fall back to DOM parsing if they find nothing; with
+    BLINKIT_STREAM_PARSE=1 the DOM parse reads the page in chunks first.
+    If a `stats` dict is passed it is filled with per-scrape metrics
+    (e.g. `stats["scroll"]`).
+    """
     driver = None
+    # Only headless drivers are pooled; manual (visible) sessions stay one-off
+    pool = get_driver_pool(lambda: _init_driver(headless=True)) if headless and pool_enabled() else None
+    failed = False
     try:
-        driver = _init_driver(headless=headless)
+        driver = pool.acquire() if pool else _init_driver(headless=headless)
         url = SEARCH_URL_TPL.format(query=quote_plus(query))
         print(f"🌐 Opening Blinkit with query: {query}")
         
         # Try to set geolocation based on pincode (approximate)
         # This won't work for all pincodes but might help
-        pincode_coords = {
-            "110001": {"latitude": 28.6139, "longitude": 77.2090, "accuracy": 100},  # Delhi
-            "400050": {"latitude": 19.0760, "longitude": 72.8777, "accuracy": 100},  # Mumbai
-            "560001": {"latitude": 12.9716, "longitude": 77.5946, "accuracy": 100},  # Bangalore
-            "380015": {"latitude": 23.0225, "longitude": 72.5714, "accuracy": 100},  # Ahmedabad
-        }
-        
-        if pincode in pincode_coords:
-            coords = pincode_coords[pincode]
+        if pincode in PINCODE_COORDS:
+            coords = PINCODE_COORDS[pincode]
             print(f"📍 Setting geolocation to {coords['latitude']}, {coords['longitude']}")
             try:
                 driver.execute_cdp_cmd("Emulation.setGeolocationOverride", coords)
             except Exception as e:
                 print(f"⚠️ Could not set geolocation: {e}")
         
-        driver.get(url)
-        
-        if not headless:
-            # Manual location mode - give user time to set location
-            print(f"\n⏳ Waiting 15 seconds for you to manually set location to {pincode}...")
-            print(f"   Click on the location/delivery area on the Blinkit page")
-            print(f"   Change it to pincode: {pincode}")
-            print(f"   Scraping will continue automatically...\n")
-            time.sleep(15)
-        else:
-            time.sleep(3)  # Increased initial wait
+        pincode_verified = False
+        verdicts: Dict[str, Dict[str, Any]] = {}  # memoized _verify_pincode results for this scrape
+        session = load_location_session(pincode) if session_cache_enabled() else None
+        if session:
+            print(f"⚡ Reusing saved location session for pincode {pincode}")
+            if apply_location_session(driver, session, url):
+                time.sleep(1.5)
+                pincode_verified = _verify_pincode(driver, pincode, verdicts)
+            if pincode_verified:
+                print(f"✅ Pincode {pincode} verified from saved session")
+            else:
+                print(f"⚠️ Saved session did not verify, running full location routine")
+                invalidate_location_session(pincode)
 
-        # Try to set location and verify it worked
-        print(f"📍 Attempting to set location to pincode: {pincode}")
-        location_set = _set_location(driver, pincode)
-        
-        if location_set:
-            print(f"✅ Location set to pincode {pincode}")
-        else:
-            print(f"⚠️ Warning: Could not automatically set location for pincode {pincode}.")
-            print(f"   Trying alternative method...")
-            
-            # Alternative: Try to navigate to a URL with location parameter
-            try:
-                # Some sites accept pincode as URL parameter
-                driver.execute_script(f"localStorage.setItem('pincode', '{pincode}');")
-                driver.execute_script(f"localStorage.setItem('delivery_pincode', '{pincode}');")
-                time.sleep(1)
-            except Exception as e:
-                print(f"   localStorage attempt failed: {e}")
-        
-        # Force a fresh page load after setting location to ensure results match the pincode
-        print(f"🔄 Reloading page to apply pincode {pincode}...")
-        driver.get(url)
-        time.sleep(2)
-        
-        # Try setting location one more time after reload
-        if not location_set:
-            location_set = _set_location(driver, pincode)
-            if location_set:
-                print(f"   ✅ Location set successfully on second attempt")
-        
-        # Verify the pincode is actually applied
-        pincode_verified = _verify_pincode(driver, pincode)
         if not pincode_verified:
-            print(f"")
-            print(f"⚠️⚠️⚠️ WARNING: Could not verify pincode {pincode} is active! ⚠️⚠️⚠️")
-            print(f"Products shown may be from default location (380015 or similar)")
-            print(f"")
-            print(f"💡 SOLUTION: Blinkit requires manual location selection in browser.")
-            print(f"   Products scraped will be from whatever location Blinkit defaults to.")
-            print(f"   For accurate location-based scraping:")
-            print(f"   1. Open Blinkit in a browser manually")
-            print(f"   2. Set your delivery location to {pincode}")
-            print(f"   3. Note: Automated pincode change has limitations")
-            print(f"")
-        else:
-            print(f"✅ Pincode {pincode} verified and active")
+            pincode_verified = _run_location_routine(driver, url, pincode, headless, stats=stats, verdicts=verdicts)
+            if pincode_verified and session_cache_enabled():
+                save_location_session(driver, pincode)
         
         time.sleep(2)
 
-        _scroll_to_bottom(driver, max_scrolls=max_scrolls)
-        html = driver.page_source
-
-        products = _parse_products(html)
+        mode = (extract_mode or os.getenv("BLINKIT_EXTRACT_MODE", "network")).lower()
+        # Script mode reads card fields in the page after every scroll step
+        card_fields: List[Dict[str, str]] = []
+        on_step = (lambda: _extract_cards_in_browser(driver, card_fields)) if mode == "script" else None
+        _scroll_to_bottom(driver, max_scrolls=max_scrolls, target_count=max_products, stats=stats, on_step=on_step)
+
+        events = read_network_events(driver)
+        traffic = summarize_traffic(events)
+        print(f"📶 {traffic['requests']} requests, {traffic['transferred_bytes'] / 1024:.0f} KB transferred, "
+              f"{traffic['blocked_requests']} blocked (~{traffic['estimated_bytes_saved'] / 1024:.0f} KB saved)")
+        if stats is not None:
+            stats["traffic"] = traffic
+
+        products: List[Dict[str, Any]] = []
+        html: Optional[str] = None
+        if mode == "script":
+            products = _products_from_card_fields(card_fields)
+            if products:
+                print(f"🧩 Collected {len(products)} products in-browser from {len(card_fields)} cards")
+            else:
+                print(f"⚠️ In-browser extraction found no products, falling back to DOM parsing")
+        elif mode == "network":
+            payloads = capture_search_payloads(driver, events)
+            if os.getenv("BLINKIT_RECORD_DIR"):
+                record_payloads(payloads, os.path.join(os.environ["BLINKIT_RECORD_DIR"], _slug(query)))
+            products = _products_from_payloads(payloads)
+            if products:
+                print(f"🛰️ Read {len(products)} products from Blinkit's search API responses")
+            else:
+                print(f"⚠️ No search API payloads captured, falling back to DOM parsing")
+        if not products and stream_parse_enabled() and not save_html:
+            mode = "stream"
+            products = list(iter_products(iter_page_chunks(driver)))
+        if not products:
+            mode = "dom"
+            html = driver.page_source
+            products = _parse_products(html)
+        if stats is not None:
+            stats["extract_mode"] = mode
 
         # Save HTML if requested or no products (for debugging)
-        out_dir = os.path.join("html_pages", f"blinkit_{pincode}")
-        os.makedirs(out_dir, exist_ok=True)
-        html_filename = f"{query.replace(' ', '_')}_{pincode}.html"
         if save_html or not products:
-            try:
-                with open(os.path.join(out_dir, html_filename), "w", encoding="utf-8") as f:
-                    f.write(html)
-                print(f"💾 Saved HTML to {out_dir}/{html_filename}")
-            except Exception as e:
-                print(f"❌ Failed to save HTML: {e}")
-        
-        # Detailed verification and product logging
-        pincode_is_verified = _verify_pincode(driver, pincode)
+            if html is None:
+                html = driver.page_source
+            if archive_enabled():
+                # Compressed, de-duplicated and versioned; written off the request path
+                get_html_archive().submit(html, pincode, query)
+            else:
+                out_dir = os.path.join("html_pages", f"blinkit_{pincode}")
+                html_filename = f"{query.replace(' ', '_')}_{pincode}.html"
+                try:
+                    os.makedirs(out_dir, exist_ok=True)
+                    with open(os.path.join(out_dir, html_filename), "w", encoding="utf-8") as f:
+                        f.write(html)
+                    print(f"💾 Saved HTML to {out_dir}/{html_filename}")
+                except Exception as e:
+                    print(f"❌ Failed to save HTML: {e}")
+
+        # Detailed verification and product logging (reuses the verdict from the location step)
+        verdict = verdicts.get(pincode, {})
+        pincode_is_verified = bool(verdict.get("verified"))
+        if stats is not None:
+            stats["pincode_verdict"] = verdict
         print(f"\n{'='*70}")
         print(f"📊 SCRAPING RESULTS SUMMARY")
         print(f"{'='*70}")
@@ -443,32 +796,32 @@ def scrape_for_pincode_query(pincode: str, query: str, save_html: bool = False,
         else:
             print(f"\n⚠️ WARNING: No products found!")
         
-        # Check page content for location indicators
-        try:
-            page_text = driver.find_element(By.TAG_NAME, "body").text
-            location_indicators = []
-            if pincode in page_text:
-                location_indicators.append(f"✓ Pincode {pincode} found in page text")
-            if "delivery" in page_text.lower():
-                location_indicators.append("✓ 'Delivery' text found on page")
-            if "location" in page_text.lower():
-                location_indicators.append("✓ 'Location' text found on page")
-            
-            if location_indicators:
-                print(f"\n🔍 PAGE CONTENT ANALYSIS:")
-                for indicator in location_indicators:
-                    print(f"  {indicator}")
-        except:
-            pass
+        # Page content indicators were collected by the verification script
+        page_text = verdict.get("page_text") or {}
+        location_indicators = []
+        if page_text.get("pincode"):
+            location_indicators.append(f"✓ Pincode {pincode} found in page text")
+        if page_text.get("delivery"):
+            location_indicators.append("✓ 'Delivery' text found on page")
+        if page_text.get("location"):
+            location_indicators.append("✓ 'Location' text found on page")
+        
+        if location_indicators:
+            print(f"\n🔍 PAGE CONTENT ANALYSIS:")
+            for indicator in location_indicators:
+                print(f"  {indicator}")
         
         print(f"{'='*70}\n")
         
         return products, html if save_html else None
     except Exception as e:
         print(f"❌ Error during scraping: {e}")
+        failed = True
         return [], None
     finally:
-        if driver:
+        if driver and pool:
+            pool.release(driver, discard=failed)
+        elif driver:
             try:
                 driver.quit()
             except Exception:
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import env_int
+
+
+# Tags the card scanner needs: every <div ...> / </div>, plus comments and
+# script/style bodies so markup-looking text inside them is skipped.
+_TAG_RE = re.compile(
+    r"<!--.*?-->|<(?:script|style)\b.*?</(?:script|style)\s*>|(</div\s*>)|<div\b([^>]*)>",
+    re.IGNORECASE | re.DOTALL,
+)
+_CLOSE, _OPEN = 1, 2
+_ATTR_RE = re.compile(r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+_DATA_TEST_PRODUCT_RE = re.compile(r"""data-test(?:id)?\s*=\s*["'][^"']*product""")
+
+# Returned by CardParseCache.get for unknown keys (None is a cached non-product)
+MISS = object()
+
+# Salted into every card key. Bump it whenever the card selectors, field
+# extraction or the product dict (_make_product) change, so entries parsed
+# by older code - including those in a persistent SQLite tier - are never served.
+CARD_CACHE_VERSION = 1
+
+
+def _attrs(raw: str) -> Dict[str, str]:
+    attrs: Dict[str, str] = {}
+    for m in _ATTR_RE.finditer(raw):
+        name = m.group(1).lower()
+        if name not in attrs:
+            attrs[name] = next((v for v in m.group(2, 3, 4) if v is not None), "")
+    return attrs
+
+
+def _has_other_card_markup(html: str) -> bool:
+    """Would the other CARD_SELECTORS (data-test*/product links) match? Then the full parser is needed."""
+    if "data-test" in html and _DATA_TEST_PRODUCT_RE.search(html):
+        return True
+    # a[href*="/product/"]: check the attribute each occurrence sits in (image URLs contain it too)
+    pos = html.find("/product/")
+    while pos != -1:
+        quote = max(html.rfind('"', 0, pos), html.rfind("'", 0, pos))
+        if html[max(0, quote - 8):quote].replace(" ", "").endswith("href="):
+            return True
+        pos = html.find("/product/", pos + 1)
+    return False
+
+
+def _is_button_card(attrs: Dict[str, str]) -> bool:
+    # div[id][role="button"][tabindex="0"] (CARD_SELECTORS[0])
+    return "id" in attrs and attrs.get("role") == "button" and attrs.get("tabindex") == "0"
+
+
+def scan_card_markup(html: str) -> Optional[List[Tuple[str, str]]]:
+    """
+    (id, raw markup) of each top-level Blinkit product card, cut straight out
+    of the page source without building a tree. Returns None when the page
+    needs the full parser instead (other card markup present, or no cards).
+    """
+    if _has_other_card_markup(html):
+        return None
+    cards: List[Tuple[str, str]] = []
+    depth = 0
+    card_start = card_depth = None
+    card_id = ""
+    for m in _TAG_RE.finditer(html):
+        kind = m.lastindex  # None for comments and script/style blocks
+        if kind == _CLOSE:
+            depth = max(0, depth - 1)
+            if card_start is not None and depth == card_depth:
+                cards.append((card_id, html[card_start:m.end()]))
+                card_start = None
+        elif kind == _OPEN:
+            # Cheap substring check before parsing attributes
+            if card_start is None and "button" in m.group(_OPEN):
+                attrs = _attrs(m.group(_OPEN))
+                if _is_button_card(attrs):
+                    card_start, card_depth, card_id = m.start(), depth, attrs["id"]
+            depth += 1
+    return cards or None
+
+
+def card_key(markup: str, parser: str = "") -> str:
+    """Content hash of a card's markup, salted with the cache version and the HTML backend that parses it."""
+    digest = hashlib.blake2b(f"v{CARD_CACHE_VERSION}:{parser}:".encode("ascii"), digest_size=16)
+    digest.update(markup.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class CardParseCache:
+    """
+    Content-addressed cache of parsed cards: hash of the card's markup ->
+    normalized product dict (or None for cards that aren't products).
+
+    A bounded in-memory LRU, optionally backed by a SQLite file so parsed
+    cards survive restarts and are shared between processes.
+    """
+
+    def __init__(self, max_entries: int = 5000, db_path: Optional[str] = None):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        self.db_path = db_path
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS cards (key TEXT PRIMARY KEY, product TEXT)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Card cache database unavailable ({e}), using memory only")
+                self._db = None
+
+    def get(self, key: str) -> Any:
+        """Cached product (a copy), None for a cached non-product, or MISS."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                value = self._entries[key]
+                return dict(value) if value is not None else None
+            row = None
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT product FROM cards WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error:
+                    row = None
+            if row is None:
+                self._stats["misses"] += 1
+                return MISS
+            self._stats["disk_hits"] += 1
+            value = json.loads(row[0])
+            self._remember(key, value)
+            return dict(value) if value is not None else None
+
+    def put(self, key: str, product: Optional[Dict[str, Any]]) -> None:
+        self.put_many([(key, product)])
+
+    def put_many(self, items: List[Tuple[str, Optional[Dict[str, Any]]]]) -> None:
+        """Store several parsed cards (e.g. one page's new cards) with a single SQLite commit."""
+        if not items:
+            return
+        with self._lock:
+            rows = []
+            for key, product in items:
+                value = dict(product) if product is not None else None
+                self._remember(key, value)
+                rows.append((key, json.dumps(value)))
+            if self._db is not None:
+                try:
+                    with self._db:  # one transaction, committed once
+                        self._db.executemany("INSERT OR REPLACE INTO cards (key, product) VALUES (?, ?)", rows)
+                except sqlite3.Error as e:
+                    print(f"⚠️ Could not write card cache entries: {e}")
+
+    def _remember(self, key: str, value: Optional[Dict[str, Any]]) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            hits = self._stats["hits"] + self._stats["disk_hits"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                disk=bool(self._db),
+                hit_rate=round(hits / lookups, 4) if lookups else None,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for k in self._stats:
+                self._stats[k] = 0
+
+
+_cache: Optional[CardParseCache] = None
+_cache_lock = threading.Lock()
+
+
+def card_cache_enabled() -> bool:
+    return os.getenv("BLINKIT_CARD_CACHE", "1").lower() not in ("0", "false")
+
+
+def get_card_cache() -> CardParseCache:
+    """Process-wide cache (BLINKIT_CARD_CACHE_SIZE entries, optional BLINKIT_CARD_CACHE_DB file)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CardParseCache(
+                max_entries=env_int("BLINKIT_CARD_CACHE_SIZE", 5000),
+                db_path=os.getenv("BLINKIT_CARD_CACHE_DB") or None,
+            )
+        return _cache
+
+
+def card_cache_stats() -> Optional[Dict[str, Any]]:
+    return _cache.stats() if _cache is not None else None
+
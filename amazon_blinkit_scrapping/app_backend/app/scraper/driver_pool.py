@@ -0,0 +1,305 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from selenium import webdriver
+
+from ..config import env_int
+
+try:
+    import psutil  # In requirements.txt: real RSS of the Chrome process tree
+except ImportError:  # pragma: no cover - without it only the JS heap is measured
+    psutil = None
+    print("⚠️ psutil not installed: BLINKIT_DRIVER_MAX_MB only applies to the page's JS heap")
+
+
+BLINKIT_ORIGIN = "https://blinkit.com"
+
+
+class _PooledDriver:
+    """Bookkeeping for one Chrome instance owned by the pool."""
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """
+    Bounded pool of warm Chrome drivers.
+
+    Drivers are health-checked before they are handed out, have their
+    cookies/storage/geolocation reset when returned, and are recycled after
+    `max_uses` jobs or once the browser grows past `max_memory_mb`.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], webdriver.Chrome],
+        size: int = 2,
+        max_uses: int = 20,
+        max_memory_mb: int = 800,
+    ):
+        self._factory = factory
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.max_memory_mb = max_memory_mb
+        self._idle: List[_PooledDriver] = []
+        self._leased: Dict[int, _PooledDriver] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {"created": 0, "reused": 0, "recycled": 0, "failed_health_checks": 0}
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    def acquire(self, timeout: Optional[float] = None) -> webdriver.Chrome:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            entry = placeholder = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    if self._idle:
+                        # Lease it now; the health check (a browser round trip) runs outside the lock
+                        entry = self._idle.pop()
+                        self._leased[id(entry.driver)] = entry
+                        break
+                    if len(self._leased) < self.size:
+                        # Reserve the slot, then launch Chrome outside the lock
+                        placeholder = object()
+                        self._leased[id(placeholder)] = None  # type: ignore[assignment]
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a free Chrome driver")
+                    self._cond.wait(remaining)
+
+            if entry is None:
+                break
+            if self._is_healthy(entry):
+                with self._cond:
+                    entry.uses += 1
+                    self._stats["reused"] += 1
+                return entry.driver
+            with self._cond:
+                self._leased.pop(id(entry.driver), None)
+                self._stats["failed_health_checks"] += 1
+                self._cond.notify()
+            self._quit(entry)
+
+        try:
+            driver = self._factory()
+        except Exception:
+            with self._cond:
+                self._leased.pop(id(placeholder), None)
+                self._cond.notify()
+            raise
+
+        entry = _PooledDriver(driver)
+        entry.uses = 1
+        with self._cond:
+            self._leased.pop(id(placeholder), None)
+            self._leased[id(driver)] = entry
+            self._stats["created"] += 1
+        return driver
+
+    def release(self, driver: webdriver.Chrome, discard: bool = False) -> None:
+        with self._cond:
+            entry = self._leased.pop(id(driver), None)
+        if entry is None:
+            # Not ours (or already released) - just make sure it goes away
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return
+
+        reason = None
+        if discard or self._closed:
+            reason = "discarded"
+        elif entry.uses >= self.max_uses:
+            reason = f"reached {entry.uses} uses"
+        else:
+            mem = self._memory_mb(entry.driver)
+            if mem is not None and mem > self.max_memory_mb:
+                reason = f"using {mem:.0f}MB"
+            elif not self._reset(entry.driver):
+                reason = "reset failed"
+
+        with self._cond:
+            if reason:
+                self._stats["recycled"] += 1
+            else:
+                self._idle.append(entry)
+            self._cond.notify()
+        if reason:
+            print(f"♻️ Recycling Chrome driver ({reason})")
+            self._quit(entry)
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None) -> Iterator[webdriver.Chrome]:
+        drv = self.acquire(timeout=timeout)
+        failed = False
+        try:
+            yield drv
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(drv, discard=failed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                **self._stats,
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for entry in idle:
+            self._quit(entry)
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _quit(entry: _PooledDriver) -> None:
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_healthy(entry: _PooledDriver) -> bool:
+        try:
+            driver = entry.driver
+            handles = driver.window_handles
+            if not handles:
+                return False
+            # Close stray tabs/popups left behind by the previous job
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver: webdriver.Chrome) -> bool:
+        try:
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                "origin": BLINKIT_ORIGIN,
+                "storageTypes": "cookies,local_storage,session_storage,indexeddb,service_workers,cache_storage",
+            })
+            driver.delete_all_cookies()
+            driver.execute_cdp_cmd("Emulation.clearGeolocationOverride", {})
+            driver.get("about:blank")
+            # Drop network events from the previous job so they aren't re-read
+            driver.get_log("performance")
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not reset pooled driver: {e}")
+            return False
+
+    @staticmethod
+    def _memory_mb(driver: webdriver.Chrome) -> Optional[float]:
+        # RSS of chromedriver plus every Chrome process it started (browser, renderers, GPU)
+        if psutil is not None:
+            try:
+                proc = psutil.Process(driver.service.process.pid)
+                rss = proc.memory_info().rss
+                for child in proc.children(recursive=True):
+                    try:
+                        rss += child.memory_info().rss
+                    except psutil.Error:
+                        continue
+                return rss / (1024 * 1024)
+            except Exception:
+                pass
+        # Fallback: JS heap of the current page as reported by CDP - far below
+        # Chrome's real footprint, so the memory limit rarely triggers
+        try:
+            metrics = driver.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", [])
+            for metric in metrics:
+                if metric.get("name") == "JSHeapTotalSize":
+                    return metric.get("value", 0) / (1024 * 1024)
+        except Exception:
+            pass
+        return None
+
+
+def _available_memory_mb() -> Optional[float]:
+    if psutil is not None:
+        return psutil.virtual_memory().available / (1024 * 1024)
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def max_browser_workers(jobs: int, requested: Optional[int] = None) -> int:
+    """
+    How many browsers to run side by side for `jobs` scrapes.
+
+    Starts from `requested` (or BLINKIT_SCRAPE_CONCURRENCY, defaulting to the
+    pool size) and is capped by the pool size and by how many browsers of
+    BLINKIT_BROWSER_MB each fit in currently available memory.
+    """
+    pool_size = env_int("BLINKIT_POOL_SIZE", 2)
+    workers = requested or env_int("BLINKIT_SCRAPE_CONCURRENCY", pool_size)
+    if pool_enabled():
+        workers = min(workers, pool_size)
+
+    available = _available_memory_mb()
+    if available is not None:
+        per_browser = max(1, env_int("BLINKIT_BROWSER_MB", 350))
+        workers = min(workers, int(available // per_browser))
+
+    return max(1, min(workers, jobs))
+
+
+_pool: Optional[DriverPool] = None
+_pool_lock = threading.Lock()
+
+
+def pool_enabled() -> bool:
+    return os.getenv("BLINKIT_DRIVER_POOL", "1").lower() not in ("0", "false")
+
+
+def get_driver_pool(factory: Callable[[], webdriver.Chrome]) -> DriverPool:
+    """
+    Return the process-wide driver pool, creating it on first use.
+
+    Tunables (env vars):
+      BLINKIT_POOL_SIZE        max concurrent Chrome instances (default 2)
+      BLINKIT_DRIVER_MAX_USES  jobs before a driver is recycled (default 20)
+      BLINKIT_DRIVER_MAX_MB    memory ceiling before recycling (default 800)
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool(
+                factory,
+                size=env_int("BLINKIT_POOL_SIZE", 2),
+                max_uses=env_int("BLINKIT_DRIVER_MAX_USES", 20),
+                max_memory_mb=env_int("BLINKIT_DRIVER_MAX_MB", 800),
+            )
+            atexit.register(_pool.close)
+        return _pool
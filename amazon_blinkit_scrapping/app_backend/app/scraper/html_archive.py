@@ -0,0 +1,234 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config import env_int
+
+try:
+    import zstandard  # Optional: ~3x faster and smaller than gzip on page HTML
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+
+# Content-addressed store for raw result pages:
+#   <ARCHIVE_DIR>/objects/ab/abcdef....html.zst (or .html.gz)  - each distinct page once
+#   <ARCHIVE_DIR>/index.jsonl                                  - one line per saved version
+ARCHIVE_DIR = os.getenv("BLINKIT_ARCHIVE_DIR", "html_archive")
+INDEX_NAME = "index.jsonl"
+
+
+def archive_enabled() -> bool:
+    # BLINKIT_HTML_ARCHIVE=0 writes plain html_pages/blinkit_<pincode>/<query>_<pincode>.html files instead
+    return os.getenv("BLINKIT_HTML_ARCHIVE", "1").lower() not in ("0", "false")
+
+
+def _codec() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def _compress(data: bytes) -> tuple:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data), "zstd"
+    return gzip.compress(data, compresslevel=6), "gzip"
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Archive object is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class HtmlArchive:
+    """
+    Compressed, de-duplicated page archive with a version index.
+
+    Identical pages are stored once (keyed by SHA-256); every save still adds
+    a timestamped index entry, so past snapshots of a pincode/query can be
+    listed and fetched. `submit()` hands the work to a background writer
+    thread so compression and disk I/O stay off the scrape's critical path;
+    at most `max_queue` pages wait for it, a submit blocks for up to
+    `submit_timeout` seconds beyond that and is then dropped.
+    """
+
+    def __init__(self, root: str = ARCHIVE_DIR, max_queue: int = 32, submit_timeout: float = 5.0):
+        self.root = root
+        self.submit_timeout = submit_timeout
+        self._lock = threading.Lock()  # guards the index only; compression and object writes run outside it
+        self._index: Optional[List[Dict[str, Any]]] = None
+        self._by_digest: Dict[str, Dict[str, Any]] = {}  # sha256 -> first entry (object location)
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=max(1, max_queue))
+        self._writer: Optional[threading.Thread] = None
+        self._stats = {"archived": 0, "duplicates": 0, "dropped": 0, "failed": 0}
+
+    # -- paths / index -------------------------------------------------- #
+    def _object_path(self, digest: str, codec: str) -> str:
+        ext = "zst" if codec == "zstd" else "gz"
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.html.{ext}")
+
+    def _load_index(self) -> List[Dict[str, Any]]:
+        if self._index is None:
+            entries = []
+            try:
+                with open(os.path.join(self.root, INDEX_NAME), "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entries.append(json.loads(line))
+                        except ValueError:
+                            continue  # torn last line from a crash
+            except OSError:
+                pass
+            self._index = entries
+            for entry in entries:
+                self._by_digest.setdefault(entry["sha256"], entry)
+        return self._index
+
+    # -- writes --------------------------------------------------------- #
+    def _write_object(self, data: bytes, digest: str) -> tuple:
+        """Compress and store a page unless its object already exists: (path, codec, stored bytes, duplicate)."""
+        path = self._object_path(digest, _codec())
+        if os.path.exists(path):
+            return path, _codec(), os.path.getsize(path), True
+        blob, codec = _compress(data)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        try:
+            # Atomic create: fails if another writer stored the same page meanwhile
+            os.link(tmp, path)
+            duplicate = False
+        except FileExistsError:
+            duplicate = True
+        except OSError:
+            # No hard links on this filesystem
+            duplicate = os.path.exists(path)
+            if not duplicate:
+                os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return path, codec, os.path.getsize(path), duplicate
+
+    def put(self, html: str, pincode: str, query: str, saved_at: Optional[float] = None) -> Dict[str, Any]:
+        """Store a page synchronously and return its index entry."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self._load_index()
+            existing = self._by_digest.get(digest)
+        existing_path = os.path.join(self.root, existing["object"]) if existing else None
+        if existing_path and os.path.exists(existing_path):
+            path, codec, stored, duplicate = existing_path, existing["codec"], existing["stored_bytes"], True
+        else:
+            path, codec, stored, duplicate = self._write_object(data, digest)
+        entry = {
+            "sha256": digest,
+            "pincode": pincode,
+            "query": query,
+            "saved_at": saved_at or time.time(),
+            "bytes": len(data),
+            "stored_bytes": stored,
+            "codec": codec,
+            "object": os.path.relpath(path, self.root),
+            "duplicate": duplicate,
+        }
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, INDEX_NAME), "a", encoding="utf-8") as f:
+                f.write(line)
+            self._index.append(entry)
+            self._by_digest.setdefault(digest, entry)
+            self._stats["duplicates" if duplicate else "archived"] += 1
+        return entry
+
+    def submit(self, html: str, pincode: str, query: str) -> None:
+        """Queue a page for the background writer (timestamped now)."""
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._drain, name="html-archive-writer", daemon=True)
+                self._writer.start()
+        try:
+            # Brief backpressure if the disk can't keep up, then drop rather than stall the scrape
+            self._queue.put((html, pincode, query, time.time()), timeout=self.submit_timeout)
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+            print(f"⚠️ HTML archive queue full, dropped page for {query} @ {pincode}")
+
+    def _drain(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                html, pincode, query, saved_at = job
+                entry = self.put(html, pincode, query, saved_at=saved_at)
+                note = "duplicate of an earlier snapshot" if entry["duplicate"] else f"{entry['bytes'] / 1024:.0f} KB -> {entry['stored_bytes'] / 1024:.0f} KB {entry['codec']}"
+                print(f"🗄️ Archived HTML for {query} @ {pincode} ({note})")
+            except Exception as e:
+                with self._lock:
+                    self._stats["failed"] += 1
+                print(f"❌ Failed to archive HTML: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Wait until every queued page is written."""
+        self._queue.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, queued=self._queue.qsize(), max_queue=self._queue.maxsize)
+
+    # -- reads ---------------------------------------------------------- #
+    def versions(self, pincode: Optional[str] = None, query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Index entries, newest first, optionally filtered by pincode/query."""
+        with self._lock:
+            entries = list(self._load_index())
+        entries = [e for e in entries
+                   if (pincode is None or e["pincode"] == pincode) and (query is None or e["query"] == query)]
+        return sorted(entries, key=lambda e: e["saved_at"], reverse=True)
+
+    def get(self, digest: str) -> Optional[str]:
+        with self._lock:
+            self._load_index()
+            entry = self._by_digest.get(digest)
+        if entry is None:
+            return None
+        with open(os.path.join(self.root, entry["object"]), "rb") as f:
+            return _decompress(f.read(), entry["codec"]).decode("utf-8")
+
+    def latest(self, pincode: str, query: str) -> Optional[str]:
+        found = self.versions(pincode, query)
+        return self.get(found[0]["sha256"]) if found else None
+
+
+_archive: Optional[HtmlArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_html_archive() -> HtmlArchive:
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = HtmlArchive(max_queue=env_int("BLINKIT_ARCHIVE_QUEUE", 32))
+            # Don't lose queued pages when the process exits
+            atexit.register(_archive.flush)
+        return _archive
+
+
+def archive_stats() -> Optional[Dict[str, Any]]:
+    return _archive.stats() if _archive is not None else None
+
+
+def read_archived_object(path: str, codec: str) -> str:
+    """Decompress one object file (used by offline tools such as reparse_archive.py)."""
+    with open(path, "rb") as f:
+        return _decompress(f.read(), codec).decode("utf-8")
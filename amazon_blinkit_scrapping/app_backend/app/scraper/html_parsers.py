@@ -0,0 +1,292 @@
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+try:
+    import lxml  # noqa: F401  (BeautifulSoup's fast C tree builder)
+except ImportError:  # pragma: no cover - optional backend
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # pragma: no cover - optional backend
+    LexborHTMLParser = None
+
+
+# Selectable HTML parser backends for product-card extraction.
+#   "html.parser" - BeautifulSoup + stdlib parser (default, no extra deps)
+#   "lxml"        - BeautifulSoup + lxml tree builder (pip install lxml)
+#   "selectolax"  - lexbor engine, no BeautifulSoup tree (pip install selectolax)
+PARSER_BACKENDS = ("html.parser", "lxml", "selectolax")
+
+CARD_SELECTORS = [
+    'div[id][role="button"][tabindex="0"]',
+    'div[data-testid*="product"]',
+    'div[data-test*="product"]',
+    'a[href*="/product/"]',
+]
+NAME_SELECTOR = "div.tw-text-300.tw-font-semibold.tw-line-clamp-2"
+WEIGHT_SELECTOR = "div.tw-text-200.tw-font-medium.tw-line-clamp-1"
+PRICE_SELECTOR = "div.tw-flex.tw-items-center.tw-justify-between > div > div.tw-text-200.tw-font-semibold"
+
+# Fallback card guess: a div/a whose text mentions a price and is short enough
+# to be one card. Up to two prices covers offer price + struck-out MRP.
+FALLBACK_MAX_TEXT = 400
+FALLBACK_MAX_PRICES = 2
+
+WEIGHT_RE = re.compile(r"\b\d+(?:\.\d+)?\s*(?:x\s*)?\d*(?:\.\d+)?\s*(?:g|kg)\b")
+PRICE_RE = re.compile(r"₹\s*\d[\d,]*(?:\.\d+)?")
+
+_warned: set = set()
+
+
+def resolve_parser(parser: Optional[str] = None) -> str:
+    """Pick the backend (argument, else BLINKIT_HTML_PARSER); fall back to html.parser if unavailable."""
+    name = (parser or os.getenv("BLINKIT_HTML_PARSER", "html.parser")).lower()
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend '{name}', expected one of {PARSER_BACKENDS}")
+    missing = (name == "lxml" and lxml is None) or (name == "selectolax" and LexborHTMLParser is None)
+    if missing:
+        if name not in _warned:
+            print(f"⚠️ HTML parser backend '{name}' is not installed, using html.parser")
+            _warned.add(name)
+        return "html.parser"
+    return name
+
+
+def _first_match(regex: re.Pattern, text: str) -> str:
+    m = regex.search(text)
+    return m.group(0) if m else ""
+
+
+def fill_missing_fields(fields: Dict[str, Any], strings: List[str]) -> None:
+    """Regex/longest-line fallbacks on the card text when selectors missed."""
+    if not fields["name"] or len(fields["name"]) < 3:
+        lines = [line.strip() for s in strings for line in s.split("\n") if line.strip()]
+        if lines:
+            fields["name"] = max(lines, key=len)[:120]
+    full_text = " ".join(strings)
+    if not fields["weight"] or len(fields["weight"]) < 2:
+        fields["weight"] = _first_match(WEIGHT_RE, full_text)
+    if not fields["price_text"]:
+        fields["price_text"] = _first_match(PRICE_RE, full_text)
+
+
+def needs_text_fallback(fields: Dict[str, Any]) -> bool:
+    """Did the selectors miss a field, so the card text fallback (fill_missing_fields) is needed?"""
+    return (not fields["name"] or len(fields["name"]) < 3
+            or not fields["weight"] or len(fields["weight"]) < 2
+            or not fields["price_text"])
+
+
+# --------------------------------------------------------------------------- #
+# BeautifulSoup backends (html.parser / lxml)
+# --------------------------------------------------------------------------- #
+def _bs4_fallback_cards(soup: BeautifulSoup) -> Iterator[Tag]:
+    """
+    Outermost div/a elements that look like a single priced card, found in
+    linear time: one bottom-up pass sums text length and price count per
+    element, one top-down pass picks cards without descending into them.
+    """
+    # find_all() is document (pre-)order, so reversed every child comes before its parent
+    elements = soup.find_all(True)
+    agg: Dict[int, List[int]] = {}  # id(el) -> [text length, string count, price count]
+    for el in reversed(elements):
+        total = [0, 0, 0]
+        for child in el.children:
+            if isinstance(child, Tag):
+                sub = agg[id(child)]
+                total[0] += sub[0]
+                total[1] += sub[1]
+                total[2] += sub[2]
+            elif type(child) in (NavigableString, CData):
+                text = child.strip()
+                if text:
+                    total[0] += len(text)
+                    total[1] += 1
+                    total[2] += text.count('₹')
+        agg[id(el)] = total
+
+    def is_card(el: Tag) -> bool:
+        length, count, prices = agg[id(el)]
+        joined_len = length + max(0, count - 1)  # length of get_text(" ", strip=True)
+        return el.name in ('div', 'a') and 0 < prices <= FALLBACK_MAX_PRICES and joined_len < FALLBACK_MAX_TEXT
+
+    stack = [c for c in reversed(list(soup.children)) if isinstance(c, Tag)]
+    while stack:
+        el = stack.pop()
+        if agg[id(el)][2] == 0:
+            continue  # no price anywhere below
+        if is_card(el):
+            yield el
+            continue
+        stack.extend(c for c in reversed(list(el.children)) if isinstance(c, Tag))
+
+
+def _bs4_cards(html: str, features: str, selectors: Sequence[str], fallback: bool) -> Iterator[Any]:
+    soup = BeautifulSoup(html, features)
+    taken = set()      # id() of cards already yielded
+    identities = set()  # element id / product URL of cards already yielded
+    found = False
+    for sel in selectors:
+        for el in soup.select(sel):
+            if id(el) in taken:
+                continue
+            # Skip matches nested inside a card we already have (e.g. a product link inside the card div)
+            if any(id(parent) in taken for parent in el.parents):
+                continue
+            identity = el.get("id") or el.get("href")
+            if identity:
+                if identity in identities:
+                    continue
+                identities.add(identity)
+            taken.add(id(el))
+            found = True
+            yield el
+
+    # Fallback: broader card guess by presence of price symbol
+    if fallback and not found:
+        yield from _bs4_fallback_cards(soup)
+
+
+def _bs4_fields(card: Any, fill_missing: bool) -> Dict[str, Any]:
+    name_el = card.select_one(NAME_SELECTOR)
+    weight_el = card.select_one(WEIGHT_SELECTOR)
+    price_el = card.select_one(PRICE_SELECTOR)
+    fields = {
+        "id": card.get("id") or card.get("href") or "",
+        "name": name_el.text.strip() if name_el else "",
+        "weight": weight_el.text.strip() if weight_el else "",
+        "price_text": price_el.text.strip() if price_el else "",
+    }
+    if fill_missing and needs_text_fallback(fields):
+        fill_missing_fields(fields, list(card.stripped_strings))
+    return fields
+
+
+# --------------------------------------------------------------------------- #
+# selectolax backend
+# --------------------------------------------------------------------------- #
+def _lexbor_strings(node: Any) -> List[str]:
+    # Same semantics as BeautifulSoup's stripped_strings
+    return [s for s in node.text(deep=True, separator="\x00", strip=True).split("\x00") if s]
+
+
+def _lexbor_fallback_cards(tree: Any) -> Iterator[Any]:
+    """selectolax version of _bs4_fallback_cards (same linear two-pass walk)."""
+    nodes = list(tree.root.traverse(include_text=True))
+    agg: Dict[int, List[int]] = {}
+    for node in reversed(nodes):
+        if node.tag == '-text':
+            text = (node.text_content or '').strip()
+            if not text:
+                continue
+            sub = [len(text), 1, text.count('₹')]
+        elif node.tag.startswith('-'):
+            continue
+        else:
+            sub = agg.setdefault(node.mem_id, [0, 0, 0])
+        parent = node.parent
+        if parent is not None:
+            total = agg.setdefault(parent.mem_id, [0, 0, 0])
+            total[0] += sub[0]
+            total[1] += sub[1]
+            total[2] += sub[2]
+
+    def is_card(node: Any) -> bool:
+        length, count, prices = agg.get(node.mem_id, (0, 0, 0))
+        joined_len = length + max(0, count - 1)
+        return node.tag in ('div', 'a') and 0 < prices <= FALLBACK_MAX_PRICES and joined_len < FALLBACK_MAX_TEXT
+
+    stack = [tree.root]
+    while stack:
+        node = stack.pop()
+        if agg.get(node.mem_id, (0, 0, 0))[2] == 0:
+            continue
+        if is_card(node):
+            yield node
+            continue
+        stack.extend(reversed([c for c in node.iter(include_text=False) if not c.tag.startswith('-')]))
+
+
+def _lexbor_cards(html: str, selectors: Sequence[str], fallback: bool) -> Iterator[Any]:
+    tree = LexborHTMLParser(html)
+    taken = set()
+    identities = set()
+    found = False
+    for sel in selectors:
+        for el in tree.css(sel):
+            if el.mem_id in taken:
+                continue
+            parent, nested = el.parent, False
+            while parent is not None:
+                if parent.mem_id in taken:
+                    nested = True
+                    break
+                parent = parent.parent
+            if nested:
+                continue
+            attrs = el.attributes
+            identity = attrs.get("id") or attrs.get("href")
+            if identity:
+                if identity in identities:
+                    continue
+                identities.add(identity)
+            taken.add(el.mem_id)
+            found = True
+            yield el
+
+    if fallback and not found:
+        yield from _lexbor_fallback_cards(tree)
+
+
+def _lexbor_fields(card: Any, fill_missing: bool) -> Dict[str, Any]:
+    name_el = card.css_first(NAME_SELECTOR)
+    weight_el = card.css_first(WEIGHT_SELECTOR)
+    price_el = card.css_first(PRICE_SELECTOR)
+    attrs = card.attributes
+    fields = {
+        "id": attrs.get("id") or attrs.get("href") or "",
+        "name": name_el.text().strip() if name_el else "",
+        "weight": weight_el.text().strip() if weight_el else "",
+        "price_text": price_el.text().strip() if price_el else "",
+    }
+    if fill_missing and needs_text_fallback(fields):
+        fill_missing_fields(fields, _lexbor_strings(card))
+    return fields
+
+
+def extract_card_fields(
+    html: str,
+    parser: Optional[str] = None,
+    selectors: Sequence[str] = CARD_SELECTORS,
+    fallback: bool = True,
+    fill_missing: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Raw fields (id, name, weight, price_text) for each product card in a
+    Blinkit results page, using the selected parser backend.
+
+    Cards are de-duplicated by element id or product URL, and matches nested
+    inside an earlier card are skipped. `fallback` enables the broad "any
+    div/a with a ₹ price" card guess when no selector matches; `fill_missing`
+    fills fields the Tailwind selectors missed from the card's text (read
+    once per card).
+    """
+    backend = resolve_parser(parser)
+    if backend == "selectolax":
+        cards = _lexbor_cards(html, selectors, fallback)
+        to_fields = _lexbor_fields
+    else:
+        cards = _bs4_cards(html, backend, selectors, fallback)
+        to_fields = _bs4_fields
+
+    out = []
+    for card in cards:
+        try:
+            out.append(to_fields(card, fill_missing))
+        except Exception:
+            continue
+    return out
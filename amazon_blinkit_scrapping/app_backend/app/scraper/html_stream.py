@@ -0,0 +1,217 @@
+import base64
+import codecs
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from selenium import webdriver
+
+from .html_parsers import fill_missing_fields, needs_text_fallback
+
+
+# Chunk size (bytes of UTF-8) for reading page HTML out of the browser / from disk
+STREAM_CHUNK_BYTES = 256 * 1024
+
+# Elements that never get an end tag
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+
+# Serialize the page once inside the browser as UTF-8 and hand it out in
+# base64 byte slices, so Python never holds more than one chunk of it.
+# (Slicing the JS string instead can split a surrogate pair, e.g. an emoji.)
+_STASH_PAGE_JS = (
+    "window.__scraperHtml = new TextEncoder().encode(document.documentElement.outerHTML);"
+    " return window.__scraperHtml.length;"
+)
+_PAGE_SLICE_JS = """
+var bytes = window.__scraperHtml.subarray(arguments[0], arguments[0] + arguments[1]);
+var parts = [];
+for (var i = 0; i < bytes.length; i += 0x8000) {
+    parts.push(String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000)));
+}
+return btoa(parts.join(''));
+"""
+_DROP_PAGE_JS = "delete window.__scraperHtml;"
+
+
+def _is_card(tag: str, attrs: Dict[str, str]) -> bool:
+    """Streaming equivalent of html_parsers.CARD_SELECTORS."""
+    if tag == "div":
+        if "id" in attrs and attrs.get("role") == "button" and attrs.get("tabindex") == "0":
+            return True
+        return "product" in attrs.get("data-testid", "") or "product" in attrs.get("data-test", "")
+    return tag == "a" and "/product/" in attrs.get("href", "")
+
+
+def _has_classes(classes: frozenset, *wanted: str) -> bool:
+    return all(c in classes for c in wanted)
+
+
+class _CardStreamParser(HTMLParser):
+    """
+    Incremental parser that keeps only the card currently being read.
+
+    Outside a card it tracks nothing; inside it keeps the open-element stack
+    of that card, its text strings and the text of the name/weight/price
+    elements (first match each, like select_one). Finished cards are queued
+    in `ready` as raw field dicts.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.ready: List[Dict[str, Any]] = []
+        self._seen_ids = set()
+        self._stack: List[Tuple[str, frozenset, Optional[str]]] = []  # (tag, classes, capturing field)
+        self._card: Optional[Dict[str, Any]] = None
+        self._strings: List[str] = []
+        self._pending = ""  # text split across chunks/charrefs, flushed at the next tag
+        self._captures: Dict[str, List[str]] = {}
+
+    # -- text ------------------------------------------------------------- #
+    def handle_data(self, data: str) -> None:
+        if self._card is not None:
+            self._pending += data
+
+    def _flush_text(self) -> None:
+        if not self._pending:
+            return
+        text, self._pending = self._pending, ""
+        stripped = text.strip()
+        if stripped:
+            self._strings.append(stripped)
+        for field in {f for _, _, f in self._stack if f}:
+            self._captures[field].append(text)
+
+    # -- tags ------------------------------------------------------------- #
+    def handle_starttag(self, tag: str, attrs_list: List[Tuple[str, Optional[str]]]) -> None:
+        self._flush_text()
+        attrs = {k: (v or "") for k, v in attrs_list}
+        if self._card is None:
+            if not _is_card(tag, attrs):
+                return
+            identity = attrs.get("id") or attrs.get("href")
+            if identity and identity in self._seen_ids:
+                # Duplicate card: still walk it so its end tag closes it, but don't emit
+                self._card = {"id": identity, "duplicate": True}
+            else:
+                if identity:
+                    self._seen_ids.add(identity)
+                self._card = {"id": identity or "", "duplicate": False}
+            self._strings = []
+            self._captures = {}
+            self._stack = []
+        if tag in _VOID_TAGS:
+            return
+        classes = frozenset(attrs.get("class", "").split())
+        field = self._field_for(tag, classes)
+        if field:
+            self._captures[field] = []
+        self._stack.append((tag, classes, field))
+
+    def handle_startendtag(self, tag: str, attrs_list: List[Tuple[str, Optional[str]]]) -> None:
+        # <img/>, <div/> etc. carry no text and never hold a card field, so they open nothing
+        self._flush_text()
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush_text()
+        if self._card is None:
+            return
+        # Pop to the matching open element (tolerates unclosed <p>/<li> etc.)
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                del self._stack[i:]
+                break
+        if not self._stack:
+            self._finish_card()
+
+    def _field_for(self, tag: str, classes: frozenset) -> Optional[str]:
+        if tag != "div":
+            return None
+        if "name" not in self._captures and _has_classes(classes, "tw-text-300", "tw-font-semibold", "tw-line-clamp-2"):
+            return "name"
+        if "weight" not in self._captures and _has_classes(classes, "tw-text-200", "tw-font-medium", "tw-line-clamp-1"):
+            return "weight"
+        # div.tw-flex.tw-items-center.tw-justify-between > div > div.tw-text-200.tw-font-semibold
+        if ("price_text" not in self._captures
+                and _has_classes(classes, "tw-text-200", "tw-font-semibold")
+                and len(self._stack) >= 2
+                and self._stack[-1][0] == "div"
+                and self._stack[-2][0] == "div"
+                and _has_classes(self._stack[-2][1], "tw-flex", "tw-items-center", "tw-justify-between")):
+            return "price_text"
+        return None
+
+    def _finish_card(self) -> None:
+        card, self._card = self._card, None
+        self._stack = []
+        if card["duplicate"]:
+            return
+        fields = {
+            "id": card["id"],
+            "name": "".join(self._captures.get("name", [])).strip(),
+            "weight": "".join(self._captures.get("weight", [])).strip(),
+            "price_text": "".join(self._captures.get("price_text", [])).strip(),
+        }
+        if needs_text_fallback(fields):
+            fill_missing_fields(fields, self._strings)
+        self.ready.append(fields)
+        self._strings = []
+        self._captures = {}
+
+
+def iter_card_fields(chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream raw card fields (id, name, weight, price_text) out of HTML fed in
+    chunks, yielding each card as soon as its end tag is read. Memory stays
+    proportional to one card; the broad "any element with ₹" fallback of
+    extract_card_fields is not available here since it needs the whole tree.
+    """
+    parser = _CardStreamParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        while parser.ready:
+            yield parser.ready.pop(0)
+    parser.close()
+    while parser.ready:
+        yield parser.ready.pop(0)
+
+
+def iter_decoded(byte_chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[str]:
+    """Decode byte chunks to text; a character split across two chunks is decoded whole."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in byte_chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_file_chunks(path: str, chunk_bytes: int = STREAM_CHUNK_BYTES) -> Iterator[str]:
+    def read() -> Iterator[bytes]:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_bytes)
+                if not chunk:
+                    return
+                yield chunk
+
+    yield from iter_decoded(read())
+
+
+def iter_page_chunks(driver: webdriver.Chrome, chunk_bytes: int = STREAM_CHUNK_BYTES) -> Iterator[str]:
+    """Read the rendered page HTML out of the browser one slice at a time."""
+    def read() -> Iterator[bytes]:
+        total = driver.execute_script(_STASH_PAGE_JS) or 0
+        try:
+            for start in range(0, total, chunk_bytes):
+                yield base64.b64decode(driver.execute_script(_PAGE_SLICE_JS, start, chunk_bytes) or "")
+        finally:
+            try:
+                driver.execute_script(_DROP_PAGE_JS)
+            except Exception:
+                pass
+
+    yield from iter_decoded(read())
@@ -0,0 +1,141 @@
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from selenium import webdriver
+
+
+# Cookies + localStorage captured after a pincode was verified, one JSON file
+# per pincode. Reusing them lets a scrape skip the whole _set_location dance.
+SESSION_DIR = os.getenv("BLINKIT_SESSION_DIR", ".blinkit_sessions")
+
+
+def session_cache_enabled() -> bool:
+    return os.getenv("BLINKIT_SESSION_CACHE", "1").lower() not in ("0", "false")
+
+
+def _ttl_seconds() -> float:
+    try:
+        return float(os.getenv("BLINKIT_SESSION_TTL_HOURS", "12")) * 3600
+    except ValueError:
+        return 12 * 3600
+
+
+def _session_path(pincode: str) -> str:
+    safe = re.sub(r"[^0-9A-Za-z_-]", "_", pincode)
+    return os.path.join(SESSION_DIR, f"{safe}.json")
+
+
+def load_location_session(pincode: str) -> Optional[Dict[str, Any]]:
+    """Return the saved session for a pincode, or None if missing/expired."""
+    path = _session_path(pincode)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    age = time.time() - float(session.get("saved_at", 0))
+    if age > _ttl_seconds():
+        print(f"⌛ Saved location session for {pincode} expired ({age / 3600:.1f}h old)")
+        invalidate_location_session(pincode)
+        return None
+    return session
+
+
+def save_location_session(driver: webdriver.Chrome, pincode: str) -> bool:
+    """Capture cookies and localStorage from a driver whose pincode is verified."""
+    try:
+        cookies = driver.get_cookies()
+        local_storage = driver.execute_script(
+            "var out = {};"
+            "for (var i = 0; i < localStorage.length; i++) {"
+            "  var k = localStorage.key(i); out[k] = localStorage.getItem(k);"
+            "}"
+            "return out;"
+        ) or {}
+    except Exception as e:
+        print(f"⚠️ Could not capture location session: {e}")
+        return False
+
+    session = {
+        "pincode": pincode,
+        "saved_at": time.time(),
+        "cookies": cookies,
+        "local_storage": local_storage,
+    }
+    try:
+        os.makedirs(SESSION_DIR, exist_ok=True)
+        path = _session_path(pincode)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(session, f)
+        os.replace(tmp_path, path)
+        print(f"💾 Saved location session for pincode {pincode}")
+        return True
+    except OSError as e:
+        print(f"⚠️ Could not save location session: {e}")
+        return False
+
+
+def invalidate_location_session(pincode: str) -> None:
+    try:
+        os.remove(_session_path(pincode))
+    except OSError:
+        pass
+
+
+def _to_cdp_cookies(cookies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    out = []
+    for c in cookies:
+        cookie = {
+            "name": c["name"],
+            "value": c.get("value", ""),
+            "domain": c.get("domain", ".blinkit.com"),
+            "path": c.get("path", "/"),
+            "secure": c.get("secure", False),
+            "httpOnly": c.get("httpOnly", False),
+        }
+        if c.get("expiry"):
+            cookie["expires"] = c["expiry"]
+        if c.get("sameSite") in ("Strict", "Lax", "None"):
+            cookie["sameSite"] = c["sameSite"]
+        out.append(cookie)
+    return out
+
+
+def apply_location_session(driver: webdriver.Chrome, session: Dict[str, Any], url: str) -> bool:
+    """
+    Inject saved cookies and localStorage, then open `url` directly.
+    Uses CDP so no extra page load is needed to get onto the Blinkit origin.
+    """
+    script_id = None
+    try:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": _to_cdp_cookies(session.get("cookies", []))})
+
+        local_storage = session.get("local_storage") or {}
+        if local_storage:
+            # Seed localStorage before Blinkit's own scripts run on the page
+            source = (
+                "(function(items){"
+                "  if (location.hostname.indexOf('blinkit.com') === -1) return;"
+                "  for (var k in items) { try { localStorage.setItem(k, items[k]); } catch (e) {} }"
+                f"}})({json.dumps(local_storage)});"
+            )
+            script_id = driver.execute_cdp_cmd(
+                "Page.addScriptToEvaluateOnNewDocument", {"source": source}
+            ).get("identifier")
+
+        driver.get(url)
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not apply saved location session: {e}")
+        return False
+    finally:
+        if script_id:
+            try:
+                driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+            except Exception:
+                pass
@@ -0,0 +1,224 @@
+import base64
+import json
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+from selenium import webdriver
+
+
+# Blinkit's web app loads the search grid from JSON endpoints such as
+# /v1/layout/search or /v6/search/products; override if they move.
+SEARCH_API_PATTERN = re.compile(
+    os.getenv("BLINKIT_SEARCH_API_PATTERN", r"/v\d+/(?:layout/)?search|/v\d+/listing")
+)
+
+# Resources the scraper never needs: images, fonts, media and analytics/ads.
+# Blocked through CDP Network.setBlockedURLs when the lean profile is on.
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*cdn.grofers.com/cdn-cgi/image*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*facebook.com/tr*", "*clevertap*", "*hotjar*",
+    "*branch.io*", "*appsflyer*", "*amplitude.com*", "*mixpanel*",
+]
+
+# Typical transfer size per blocked resource type, used to estimate savings
+# (a blocked request never reports its real size).
+_TYPICAL_BYTES = {
+    "Image": 30_000,
+    "Font": 40_000,
+    "Media": 500_000,
+    "Script": 60_000,
+    "XHR": 5_000,
+    "Fetch": 5_000,
+}
+_DEFAULT_TYPICAL_BYTES = 10_000
+
+_NAME_KEYS = ("product_name", "name", "display_name", "title")
+_WEIGHT_KEYS = ("unit", "variant", "quantity", "weight", "pack_size")
+_PRICE_KEYS = ("price", "normal_price", "offer_price", "selling_price", "final_price", "mrp")
+_ID_KEYS = ("product_id", "prid", "id")
+
+
+def read_network_events(driver: webdriver.Chrome) -> List[Dict[str, Any]]:
+    """
+    Drain Chrome's performance log and return the Network.* CDP events.
+    Requires the driver to be started with performance logging enabled.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception as e:
+        print(f"⚠️ Performance log unavailable: {e}")
+        return []
+
+    events = []
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        if message.get("method", "").startswith("Network."):
+            events.append(message)
+    return events
+
+
+def enable_resource_blocking(driver: webdriver.Chrome) -> bool:
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not enable resource blocking: {e}")
+        return False
+
+
+def summarize_traffic(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Request counts and bytes transferred/saved for one scrape."""
+    requests = 0
+    transferred = 0
+    blocked = 0
+    blocked_by_type: Dict[str, int] = {}
+    saved = 0
+    for ev in events:
+        method = ev.get("method")
+        params = ev.get("params", {})
+        if method == "Network.requestWillBeSent":
+            requests += 1
+        elif method == "Network.loadingFinished":
+            transferred += int(params.get("encodedDataLength") or 0)
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked += 1
+            rtype = params.get("type", "Other")
+            blocked_by_type[rtype] = blocked_by_type.get(rtype, 0) + 1
+            saved += _TYPICAL_BYTES.get(rtype, _DEFAULT_TYPICAL_BYTES)
+    return {
+        "requests": requests,
+        "transferred_bytes": transferred,
+        "blocked_requests": blocked,
+        "blocked_by_type": blocked_by_type,
+        "estimated_bytes_saved": saved,
+    }
+
+
+def capture_search_payloads(driver: webdriver.Chrome, events: List[Dict[str, Any]]) -> List[Any]:
+    """Fetch and decode the JSON bodies of finished search API responses."""
+    finished = {
+        ev["params"]["requestId"]
+        for ev in events
+        if ev.get("method") == "Network.loadingFinished"
+    }
+    payloads = []
+    for ev in events:
+        if ev.get("method") != "Network.responseReceived":
+            continue
+        params = ev.get("params", {})
+        response = params.get("response", {})
+        request_id = params.get("requestId")
+        if request_id not in finished:
+            continue
+        if "json" not in response.get("mimeType", "") or not SEARCH_API_PATTERN.search(response.get("url", "")):
+            continue
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            text = body.get("body", "")
+            if body.get("base64Encoded"):
+                text = base64.b64decode(text).decode("utf-8", errors="replace")
+            payloads.append(json.loads(text))
+        except Exception:
+            # Body may already be evicted from Chrome's buffer; skip it
+            continue
+    return payloads
+
+
+def record_payloads(payloads: List[Any], directory: str) -> None:
+    """
+    Save payloads as numbered page files (000.json, 001.json, ...) so they can
+    be replayed later by blinkit_replay_server.py.
+    """
+    try:
+        os.makedirs(directory, exist_ok=True)
+        for i, payload in enumerate(payloads):
+            with open(os.path.join(directory, f"{i:03d}.json"), "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+        print(f"💾 Recorded {len(payloads)} search API responses to {directory}")
+    except OSError as e:
+        print(f"⚠️ Could not record search API responses: {e}")
+
+
+def _text(value: Any) -> Optional[str]:
+    """Blinkit wraps most display strings as {"text": "..."}."""
+    if isinstance(value, dict):
+        value = value.get("text")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return None
+
+
+def _first_text(node: Dict[str, Any], keys) -> Optional[str]:
+    for key in keys:
+        if key in node:
+            text = _text(node[key])
+            if text:
+                return text
+    return None
+
+
+def _product_id(node: Dict[str, Any]) -> Optional[str]:
+    identity = node.get("identity")
+    if isinstance(identity, dict) and identity.get("id") is not None:
+        return str(identity["id"])
+    for key in _ID_KEYS:
+        if node.get(key) is not None and not isinstance(node[key], (dict, list)):
+            return str(node[key])
+    return None
+
+
+def _as_product(node: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    name = _first_text(node, _NAME_KEYS)
+    price = _first_text(node, _PRICE_KEYS)
+    product_id = _product_id(node)
+    if not (name and price and product_id):
+        return None
+    if "₹" not in price:
+        price = f"₹{price}"
+    return {
+        "product_id": product_id,
+        "name": name,
+        "weight": _first_text(node, _WEIGHT_KEYS) or "",
+        "price_text": price,
+    }
+
+
+def _walk(node: Any) -> Iterator[Dict[str, str]]:
+    if isinstance(node, dict):
+        product = _as_product(node)
+        if product:
+            # Don't descend: nested cart_item/tracking copies are the same product
+            yield product
+            return
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk(value)
+
+
+def extract_products_from_payloads(payloads: List[Any]) -> List[Dict[str, str]]:
+    """
+    Pull product records (product_id, name, weight, price_text) out of search
+    API payloads, in grid order, de-duplicated by product id.
+    """
+    seen = set()
+    products = []
+    for payload in payloads:
+        for product in _walk(payload):
+            if product["product_id"] in seen:
+                continue
+            seen.add(product["product_id"])
+            products.append(product)
+    return products
@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..single_flight import SingleFlight
+from .blinkit_http import scrape_pincode
+from ..config import env_int
+
+# Identical cache misses arriving together share one browser session
+_scrape_flight = SingleFlight("scrape")
+
+
+def cache_key(query: str, pincode: str, max_scrolls: int) -> Tuple[str, str, int]:
+    """Normalized key: "Protein  Bar" and "protein bar" share one entry."""
+    return (" ".join(query.lower().split()), pincode.strip(), int(max_scrolls))
+
+
+class ScrapeResultCache:
+    """
+    Recent scrape results per (query, pincode, max_scrolls), so repeated
+    searches and CSV exports of what the user just saw don't start new
+    browser sessions. Entries expire after `ttl_seconds`; beyond
+    `max_entries` the least recently used is evicted.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        # key -> (stored_at, max_products the scrape was bounded by or None if unbounded, products)
+        self._entries: "OrderedDict[Tuple[str, str, int], Tuple[float, Optional[int], List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "refreshes": 0}
+
+    def get(self, key: Tuple[str, str, int], max_products: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """Copies of the cached products, or None if missing, expired or too short for `max_products`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            stored_at, limit, products = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            # A scrape bounded by max_products (however many it found) may have
+            # stopped scrolling early: it only answers requests up to that bound
+            if limit is not None and (max_products is None or max_products > limit):
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return [dict(p) for p in products]
+
+    def put(self, key: Tuple[str, str, int], products: List[Dict[str, Any]], max_products: Optional[int] = None) -> None:
+        """Store a scrape result; pass the `max_products` it was run with (None if unbounded)."""
+        with self._lock:
+            self._entries[key] = (time.time(), max_products, [dict(p) for p in products])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, key: Tuple[str, str, int]) -> None:
+        """Drop an entry ahead of a forced refresh."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._stats["refreshes"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                ttl_seconds=self.ttl_seconds,
+                hit_rate=round(self._stats["hits"] / lookups, 4) if lookups else None,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: Optional[ScrapeResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def result_cache_enabled() -> bool:
+    # BLINKIT_RESULT_CACHE_TTL=0 turns the cache off
+    return env_int("BLINKIT_RESULT_CACHE_TTL", 3600) > 0
+
+
+def get_result_cache() -> ScrapeResultCache:
+    """Process-wide cache (BLINKIT_RESULT_CACHE_SIZE entries kept BLINKIT_RESULT_CACHE_TTL seconds)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ScrapeResultCache(
+                max_entries=env_int("BLINKIT_RESULT_CACHE_SIZE", 256),
+                ttl_seconds=env_int("BLINKIT_RESULT_CACHE_TTL", 3600),
+            )
+        return _cache
+
+
+def result_cache_stats() -> Optional[Dict[str, Any]]:
+    return _cache.stats() if _cache is not None else None
+
+
+# Metrics of the last few real scrapes (engine, location attempts, pincode
+# verdict, scroll steps, extract mode, traffic), newest last, for /api/health
+_recent_scrapes: "deque[Dict[str, Any]]" = deque(maxlen=20)
+_recent_lock = threading.Lock()
+
+
+def _record_scrape_stats(pincode: str, query: str, stats: Dict[str, Any]) -> None:
+    attempts = [f"{a['strategy'] or 'none'} {a['seconds']}s" for a in stats.get("location", [])]
+    verdict = stats.get("pincode_verdict") or {}
+    scroll = stats.get("scroll") or {}
+    print(f"📈 '{query}' @ {pincode}: engine={stats.get('engine')}, extract={stats.get('extract_mode')}, "
+          f"location=[{', '.join(attempts)}], verified={verdict.get('verified')}, "
+          f"cards per scroll step={scroll.get('cards_per_step', [])} ({scroll.get('stop_reason')})")
+    with _recent_lock:
+        _recent_scrapes.append(dict(stats, pincode=pincode, query=query, finished_at=time.time()))
+
+
+def recent_scrape_stats() -> List[Dict[str, Any]]:
+    with _recent_lock:
+        return list(_recent_scrapes)
+
+
+def cached_scrape_pincode(pincode: str, query: str, max_scrolls: int = 20, refresh: bool = False, save_html: bool = False, headless: bool = True, max_products: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    scrape_pincode() through the result cache. `refresh=True` skips the lookup
+    and replaces the entry; `save_html=True` and non-headless (manual location)
+    runs always scrape, since they are wanted for their side effects.
+    Concurrent identical misses are coalesced into one scrape. Each real
+    scrape's metrics are logged and kept for recent_scrape_stats().
+    """
+    def scrape() -> List[Dict[str, Any]]:
+        stats: Dict[str, Any] = {}
+        products, _html = scrape_pincode(
+            pincode=pincode,
+            query=query,
+            save_html=save_html,
+            max_scrolls=max_scrolls,
+            headless=headless,
+            max_products=max_products,
+            stats=stats,
+        )
+        _record_scrape_stats(pincode, query, stats)
+        return products
+
+    if not (result_cache_enabled() and not save_html and headless):
+        return scrape()
+
+    cache = get_result_cache()
+    key = cache_key(query, pincode, max_scrolls)
+    if refresh:
+        cache.invalidate(key)
+    else:
+        products = cache.get(key, max_products)
+        if products is not None:
+            print(f"⚡ Using cached results for '{query}' @ {pincode} ({len(products)} products)")
+            return products
+
+    def scrape_and_store(_progress) -> List[Dict[str, Any]]:
+        products = scrape()
+        # Empty results are usually a blocked/failed scrape: don't pin them for an hour
+        if products:
+            cache.put(key, products, max_products)
+        return products
+
+    products = _scrape_flight.do((key, max_products), scrape_and_store)
+    # Callers annotate rows (rank, pincode), and coalesced callers share one list
+    return [dict(p) for p in products]
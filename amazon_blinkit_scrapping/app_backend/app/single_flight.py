@@ -0,0 +1,92 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.future: Future = Future()
+        self.listeners: List[Callable[..., None]] = []
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: the first caller for a key runs the
+    work, callers arriving while it is in flight wait for and share its result
+    (or its exception). Nothing is remembered once the call finishes - that is
+    the result cache's job.
+
+    `fn(progress)` receives a callback that forwards to every attached
+    caller's `listener`, so coalesced callers still see progress events from
+    the moment they join. Coalesced callers get the same result object; copy
+    it before mutating.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "coalesced": 0, "failed": 0}
+        with _registry_lock:
+            _registry[name] = self
+
+    def do(self, key: Hashable, fn: Callable[[Callable[..., None]], Any], listener: Optional[Callable[..., None]] = None) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats["leaders"] += 1
+            else:
+                flight.waiters += 1
+                self._stats["coalesced"] += 1
+            if listener:
+                flight.listeners.append(listener)
+
+        if not leader:
+            print(f"🔗 Joined in-flight {self.name} for {key!r} ({flight.waiters} waiting)")
+            return flight.future.result()
+
+        def broadcast(*args: Any, **kwargs: Any) -> None:
+            with self._lock:
+                listeners = list(flight.listeners)
+            for notify in listeners:
+                try:
+                    notify(*args, **kwargs)
+                except Exception as e:
+                    print(f"⚠️ {self.name} progress listener failed: {e}")
+
+        try:
+            result = fn(broadcast)
+        except BaseException as e:
+            with self._lock:
+                self._stats["failed"] += 1
+                del self._flights[key]
+            flight.future.set_exception(e)
+            raise
+        with self._lock:
+            del self._flights[key]
+        flight.future.set_result(result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = self._stats["leaders"] + self._stats["coalesced"]
+            return dict(
+                self._stats,
+                in_flight=len(self._flights),
+                waiting=sum(f.waiters for f in self._flights.values()),
+                coalesced_rate=round(self._stats["coalesced"] / calls, 4) if calls else None,
+            )
+
+
+_registry: Dict[str, SingleFlight] = {}
+_registry_lock = threading.Lock()
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters of every SingleFlight created in this process, by name (for the health endpoints)."""
+    with _registry_lock:
+        flights = list(_registry.values())
+    return {flight.name: flight.stats() for flight in flights}
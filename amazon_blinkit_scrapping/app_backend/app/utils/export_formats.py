@@ -0,0 +1,142 @@
+import csv
+import io
+from typing import Any, Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is optional for CSV-only installs
+    pa = None
+    pq = None
+
+
+# Export columns, in order, with their Arrow types (CSV uses the same order)
+EXPORT_COLUMNS = [
+    ("pincode", "string"),
+    ("rank", "int32"),
+    ("brand", "string"),
+    ("name", "string"),
+    ("weight", "string"),
+    ("price", "float64"),
+    ("price_text", "string"),
+    ("grams", "float64"),
+    ("price_per_100g", "float64"),
+]
+
+
+def _arrow_schema() -> "pa.Schema":
+    return pa.schema([(name, getattr(pa, kind)()) for name, kind in EXPORT_COLUMNS])
+
+
+def _record_batch(rows: List[Dict[str, Any]], schema: "pa.Schema") -> "pa.RecordBatch":
+    columns = []
+    for field in schema:
+        values = [row.get(field.name) for row in rows]
+        if pa.types.is_floating(field.type) or pa.types.is_integer(field.type):
+            # Scraped numbers can be "" or text when parsing failed: export them as nulls
+            values = [v if isinstance(v, (int, float)) and not isinstance(v, bool) else None for v in values]
+        else:
+            values = [None if v is None else str(v) for v in values]
+        columns.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class CsvEncoder:
+    """Incremental CSV: `write(rows)` returns the encoded bytes for those rows."""
+
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self) -> None:
+        self._header_done = False
+
+    def write(self, rows: List[Dict[str, Any]]) -> bytes:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        if not self._header_done:
+            writer.writerow([name for name, _ in EXPORT_COLUMNS])
+            self._header_done = True
+        for row in rows:
+            writer.writerow([row.get(name, "") for name, _ in EXPORT_COLUMNS])
+        return buf.getvalue().encode("utf-8")
+
+    def close(self) -> bytes:
+        return b"" if self._header_done else self.write([])
+
+
+class ParquetEncoder:
+    """One Parquet row group per `write()`; the footer is emitted by `close()`."""
+
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self) -> None:
+        self._schema = _arrow_schema()
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression="zstd")
+
+    def write(self, rows: List[Dict[str, Any]]) -> bytes:
+        if rows:
+            self._writer.write_batch(_record_batch(rows, self._schema))
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+class ArrowStreamEncoder:
+    """Arrow IPC stream format: one record batch per `write()`."""
+
+    media_type = "application/vnd.apache.arrow.stream"
+    extension = "arrows"
+
+    def __init__(self) -> None:
+        self._schema = _arrow_schema()
+        self._sink = _ChunkSink()
+        self._writer = pa.ipc.new_stream(self._sink, self._schema)
+
+    def write(self, rows: List[Dict[str, Any]]) -> bytes:
+        if rows:
+            self._writer.write_batch(_record_batch(rows, self._schema))
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+EXPORT_FORMATS = {"csv": CsvEncoder, "parquet": ParquetEncoder, "arrow": ArrowStreamEncoder}
+
+
+def get_encoder(fmt: str) -> Optional[Any]:
+    """New encoder for `fmt`, or None if the format is unknown or needs pyarrow and it is missing."""
+    encoder_cls = EXPORT_FORMATS.get(fmt.lower())
+    if encoder_cls is None or (encoder_cls is not CsvEncoder and pa is None):
+        return None
+    return encoder_cls()
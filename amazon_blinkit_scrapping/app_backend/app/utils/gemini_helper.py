@@ -1,6 +1,6 @@
 import os
 import google.generativeai as genai
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 import json
 import time
 
@@ -176,9 +176,10 @@ def analyze_product_description(product: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
-def analyze_top_products(products: List[Dict[str, Any]], top_n: int = 10) -> List[Dict[str, Any]]:
+def analyze_top_products(products: List[Dict[str, Any]], top_n: int = 10, on_product: Optional[Callable[[int, int, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
     """
-    Analyze top N products with Gemini AI
+    Analyze top N products with Gemini AI.
+    `on_product(index, total, analyzed_product)` is called after each product.
     """
     top_products = products[:top_n]
     analyzed_products = []
@@ -193,6 +194,8 @@ def analyze_top_products(products: List[Dict[str, Any]], top_n: int = 10) -> Lis
             **product,
             "analysis": analysis
         })
+        if on_product:
+            on_product(idx, len(top_products), analyzed_products[-1])
         # Add longer delay to avoid rate limiting (free tier limit)
         if idx < len(top_products):
             print(f"Waiting 6 seconds before next request to avoid rate limits...")
@@ -1,12 +1,48 @@
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Tuple
 
+if TYPE_CHECKING:
+    # Only the batch helpers need these; importing them here would put pandas
+    # on the scraper's import path (blinkit_scraper uses the per-string parsers)
+    import numpy as np
+    import pandas as pd
 
+
+PRICE_RE = re.compile(r"[\d,.]+")
+PACK_GRAMS_RE = re.compile(r"(\d+)\s*[xX]\s*(\d+(?:\.\d+)?)\s*g")
+GRAMS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*g")
+KG_RE = re.compile(r"(\d+(?:\.\d+)?)\s*kg")
+
+# Quantity with an optional "N x" multiplier, e.g. "500 g", "2 x 1 kg", "1.5 L", "6 pcs"
+QUANTITY_RE = re.compile(
+    r"(?:(\d+)\s*[x×]\s*)?(\d+(?:\.\d+)?)\s*"
+    r"(kg|kgs|kilograms?|g|gm|gms|grams?|ml|millilit(?:re|er)s?|l|ltr|litres?|liters?|pcs?|pieces?|units?)\b"
+)
+PACK_OF_RE = re.compile(r"pack\s+of\s+(\d+)")
+
+# Unit spelling -> (base unit, factor to base)
+_UNITS = {
+    "kg": ("g", 1000.0), "kgs": ("g", 1000.0), "kilogram": ("g", 1000.0), "kilograms": ("g", 1000.0),
+    "g": ("g", 1.0), "gm": ("g", 1.0), "gms": ("g", 1.0), "gram": ("g", 1.0), "grams": ("g", 1.0),
+    "ml": ("ml", 1.0), "millilitre": ("ml", 1.0), "millilitres": ("ml", 1.0),
+    "milliliter": ("ml", 1.0), "milliliters": ("ml", 1.0),
+    "l": ("ml", 1000.0), "ltr": ("ml", 1000.0), "litre": ("ml", 1000.0), "litres": ("ml", 1000.0),
+    "liter": ("ml", 1000.0), "liters": ("ml", 1000.0),
+    "pc": ("pcs", 1.0), "pcs": ("pcs", 1.0), "piece": ("pcs", 1.0), "pieces": ("pcs", 1.0),
+    "unit": ("pcs", 1.0), "units": ("pcs", 1.0),
+}
+
+# Size of the string -> parsed value memo; weight/price strings repeat heavily across pincodes
+PARSE_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_price_to_float(price_text: str) -> Optional[float]:
     if not price_text:
         return None
     # Keep digits, comma, dot; take first number
-    m = re.search(r"[\d,.]+", price_text)
+    m = PRICE_RE.search(price_text)
     if not m:
         return None
     raw = m.group(0).replace(",", "")
@@ -16,6 +52,7 @@ def parse_price_to_float(price_text: str) -> Optional[float]:
         return None
 
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_weight_to_grams(weight_text: str) -> Optional[float]:
     """
     Handles patterns like:
@@ -28,33 +65,134 @@ def parse_weight_to_grams(weight_text: str) -> Optional[float]:
     s = weight_text.lower().replace("grams", "g").replace("kilograms", "kg").strip()
 
     # Pack pattern: e.g., 2 x 50 g or 2x50g
-    pack = re.search(r"(\d+)\s*[xX]\s*(\d+(?:\.\d+)?)\s*g", s)
+    pack = PACK_GRAMS_RE.search(s)
     if pack:
         n = int(pack.group(1))
         grams = float(pack.group(2))
         return n * grams
 
     # Single grams
-    g = re.search(r"(\d+(?:\.\d+)?)\s*g", s)
+    g = GRAMS_RE.search(s)
     if g:
         return float(g.group(1))
 
     # Kilograms
-    kg = re.search(r"(\d+(?:\.\d+)?)\s*kg", s)
+    kg = KG_RE.search(s)
     if kg:
         return float(kg.group(1)) * 1000.0
 
-    # Milliliters (not reliably convertible) -> None
-    # ml = re.search(r"(\d+(?:\.\d+)?)\s*ml", s)
+    # Milliliters (not reliably convertible) -> None; see parse_quantity
     return None
 
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_quantity(weight_text: str) -> Tuple[Optional[float], Optional[str]]:
+    """
+    Total quantity in a base unit: ("g" | "ml" | "pcs").
+      - 500 g, 1.5 kg, 2 x 50 g      -> grams
+      - 200 ml, 1 L, 2 x 1 L         -> millilitres
+      - 6 pcs, 12 pieces, Pack of 4  -> pieces
+      - Pack of 2 (200 g each)       -> 400 g
+    Returns (None, None) if nothing recognisable.
+    """
+    if not weight_text:
+        return None, None
+    s = weight_text.lower()
+    m = QUANTITY_RE.search(s)
+    pack_of = PACK_OF_RE.search(s)
+    if m:
+        unit, factor = _UNITS[m.group(3)]
+        count = int(m.group(1)) if m.group(1) else 1
+        if not m.group(1) and pack_of and unit != "pcs" and "each" in s:
+            count = int(pack_of.group(1))
+        return count * float(m.group(2)) * factor, unit
+    if pack_of:
+        return float(pack_of.group(1)), "pcs"
+    return None, None
+
+
 def price_per_100g(price: Optional[float], grams: Optional[float]) -> Optional[float]:
     if price is None or grams is None or grams <= 0:
         return None
     return round((price / grams) * 100.0, 2)
 
 
+def _parse_column(values: Any, parse) -> Tuple["np.ndarray", list]:
+    """
+    Parse each distinct string once: factorize the column into codes plus
+    unique values, parse the uniques, and return (codes, parsed uniques).
+    """
+    import pandas as pd
+
+    codes, uniques = pd.factorize(pd.Series(values, dtype="object"), use_na_sentinel=True)
+    return codes, [parse(u if isinstance(u, str) else str(u)) for u in uniques]
+
+
+def _take(codes: "np.ndarray", parsed: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    # Code -1 (missing input) maps to NaN
+    out = np.full(len(codes), np.nan)
+    valid = codes >= 0
+    if len(parsed):
+        out[valid] = parsed[codes[valid]]
+    return out
+
+
+def normalize_prices(prices: Iterable[Any]) -> "np.ndarray":
+    """Batch parse_price_to_float: strings or numbers in, float array (NaN if unparseable) out."""
+    import numpy as np
+    import pandas as pd
+
+    series = pd.Series(prices if not isinstance(prices, pd.Series) else prices.to_numpy())
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=float)
+    codes, parsed = _parse_column(series, parse_price_to_float)
+    return _take(codes, np.array([np.nan if v is None else v for v in parsed], dtype=float))
+
+
+def normalize_units(weights: Iterable[Any], prices: Optional[Iterable[Any]] = None) -> "pd.DataFrame":
+    """
+    Vectorized unit/price normalization for a whole column of products.
+
+    `weights` are weight strings ("2 x 200 g", "1 L", "Pack of 6") and
+    `prices` optional price strings or numbers. Each distinct string is parsed
+    once. Returns a DataFrame aligned with the input, with columns:
+      quantity, unit ("g" / "ml" / "pcs"), price, grams,
+      price_per_100g, price_per_100ml, price_per_piece (NaN where not applicable)
+    """
+    import numpy as np
+    import pandas as pd
+
+    index = weights.index if isinstance(weights, pd.Series) else None
+    codes, parsed = _parse_column(weights if not isinstance(weights, pd.Series) else weights.to_numpy(), parse_quantity)
+    quantities = np.array([np.nan if q is None else q for q, _ in parsed], dtype=float)
+    units = np.array([u for _, u in parsed] + [None], dtype=object)
+
+    quantity = _take(codes, quantities)
+    unit = units[codes]  # code -1 picks the trailing None
+    n = len(quantity)
+
+    price = normalize_prices(prices) if prices is not None else np.full(n, np.nan)
+    if len(price) != n:
+        raise ValueError(f"weights and prices differ in length ({n} vs {len(price)})")
+
+    valid = quantity > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unit_price = np.where(valid, price / quantity, np.nan)
+    is_g, is_ml, is_pcs = unit == "g", unit == "ml", unit == "pcs"
+
+    return pd.DataFrame({
+        "quantity": quantity,
+        "unit": unit,
+        "price": price,
+        "grams": np.where(is_g, quantity, np.nan),
+        "price_per_100g": np.round(np.where(is_g, unit_price * 100.0, np.nan), 2),
+        "price_per_100ml": np.round(np.where(is_ml, unit_price * 100.0, np.nan), 2),
+        "price_per_piece": np.round(np.where(is_pcs, unit_price, np.nan), 2),
+    }, index=index)
+
+
 def extract_brand(name: str) -> str:
     if not name:
         return "Unknown"
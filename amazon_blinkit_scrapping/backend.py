@@ -1,11 +1,17 @@
 # backend.py
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import time
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict
-from scraper_logic import scrape_blinkit, analyze_products_with_gemini_and_news
+from typing import Callable, Dict, Optional
+from app_backend.app.responses import CompressionMiddleware, FastJSONResponse, response_stats, select_fields
+from jobs import Job, JobFailed, job_store
+from scraper_logic import scrape_blinkit, scrape_cache_stats, recent_scrapes, coalescing_stats, analyze_products_with_gemini_and_news
 
-app = FastAPI(title="Blinkit Marketing Analyzer")
+app = FastAPI(title="Blinkit Marketing Analyzer", default_response_class=FastJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -15,19 +21,26 @@ app.add_middleware(
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
 )
+# gzip (or brotli, if installed) for reports; streaming responses pass through
+app.add_middleware(CompressionMiddleware)
 
 class AnalyzeRequest(BaseModel):
     category: str
     max_products: int = 30
     pincode: str = "380015"
+    refresh: bool = False  # bypass the scrape result cache
 
-@app.post("/analyze")
-def analyze(req: AnalyzeRequest) -> Dict:
+def _run_analysis(req: AnalyzeRequest, progress: Optional[Callable[..., None]] = None) -> Dict:
     """
     1. Scrape Blinkit for the given category
     2. Run Gemini + NewsAPI analysis
     3. Return JSON report
+    `progress(stage, **info)` is called as each stage finishes (see jobs.py).
     """
+    def report(stage: str, **info) -> None:
+        if progress:
+            progress(stage, **info)
+
     try:
         print(f"\n{'='*60}")
         print(f"🎯 Starting analysis for: {req.category}")
@@ -36,23 +49,26 @@ def analyze(req: AnalyzeRequest) -> Dict:
         print(f"{'='*60}\n")
         
         print(f"⏳ Step 1/2: Scraping Blinkit for '{req.category}' in pincode {req.pincode}...")
-        products = scrape_blinkit(req.category, req.max_products, req.pincode)
+        report("scrape", status="started")
+        products = scrape_blinkit(req.category, req.max_products, req.pincode, refresh=req.refresh)
         print(f"✅ Scraped {len(products)} products from pincode {req.pincode}")
+        report("scrape", status="done", total_products=len(products),
+               partial={"total_products": len(products), "all_products": products})
         
         print(f"\n⏳ Step 2/2: Running AI analysis (Gemini + News + Trends + STP)...")
-        report = analyze_products_with_gemini_and_news(products, req.category)
+        report_data = analyze_products_with_gemini_and_news(products, req.category, progress=progress)
         print(f"✅ Analysis complete")
         print(f"\n📊SUMMARY:")
-        print(f"Summary: {report.get('summary', 'N/A')}")
-        print(f"Products analyzed: {len(report.get('products', []))}")
-        print(f"News articles: {len(report.get('news_insights', []))}")
+        print(f"Summary: {report_data.get('summary', 'N/A')}")
+        print(f"Products analyzed: {len(report_data.get('products', []))}")
+        print(f"News articles: {len(report_data.get('news_insights', []))}")
         
         # Check for rate limit issues
-        if len(report.get('products', [])) == 0:
+        if len(report_data.get('products', [])) == 0:
             print(f"\n⚠️ WARNING: No products were analyzed!")
             print(f"This usually means Gemini API rate limit was hit.")
         
-        if not report.get('stp_analysis'):
+        if not report_data.get('stp_analysis'):
             print(f"\n⚠️ WARNING: STP analysis failed (likely rate limit)")
         
         print(f"{'='*60}\n")
@@ -61,7 +77,7 @@ def analyze(req: AnalyzeRequest) -> Dict:
             "category": req.category,
             "pincode": req.pincode,
             "total_products": len(products),
-            "report": report,
+            "report": report_data,
         }
     except Exception as e:
         error_msg = str(e)
@@ -77,19 +93,123 @@ def analyze(req: AnalyzeRequest) -> Dict:
             print(f"3. Upgrade to paid tier for higher limits")
             print(f"4. Use fewer analysis features temporarily\n")
             
-            raise HTTPException(
+            raise JobFailed(
+                "Gemini API rate limit exceeded. Please wait or use a new API key. See terminal for details.",
                 status_code=429,
-                detail="Gemini API rate limit exceeded. Please wait or use a new API key. See terminal for details."
             )
         
-        raise HTTPException(status_code=500, detail=str(e))
+        raise JobFailed(error_msg, status_code=500)
+
+
+def _project_products(data: Optional[Dict], fields: Optional[str]) -> Optional[Dict]:
+    """Copy of a report (or job partial) with only `fields` kept in its product lists."""
+    if not fields or not isinstance(data, dict):
+        return data
+    data = dict(data)
+    for key in ("all_products", "products"):
+        if isinstance(data.get(key), list):
+            data[key] = select_fields(data[key], fields)
+    return data
+
+
+@app.post("/analyze")
+def analyze(req: AnalyzeRequest, fields: Optional[str] = None) -> FastJSONResponse:
+    """
+    Run the full analysis in this request (see POST /jobs for the non-blocking version).
+    `fields=name,brand,price` keeps only those keys in the report's product lists.
+    """
+    try:
+        result = _run_analysis(req)
+    except JobFailed as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    # Returned as a response object so FastAPI doesn't re-encode the whole report first
+    return FastJSONResponse(dict(result, report=_project_products(result["report"], fields)))
+
+
+@app.post("/jobs", status_code=202)
+def create_job(req: AnalyzeRequest) -> Dict:
+    """
+    Start an analysis in the background and return its id right away.
+    Poll GET /jobs/{job_id} or follow GET /jobs/{job_id}/events (SSE).
+    """
+    job = job_store.submit("analyze", req.model_dump(), lambda progress: _run_analysis(req, progress))
+    print(f"🧾 Job {job.id} queued: {req.category} @ {req.pincode}")
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events",
+    }
+
+
+def _get_job(job_id: str) -> Job:
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str, fields: Optional[str] = None) -> FastJSONResponse:
+    """
+    Status, progress events and partial results (final `result` once succeeded).
+    `fields=` trims product lists as in /analyze, which keeps frequent polls small.
+    """
+    data = _get_job(job_id).to_dict()
+    data["partial"] = _project_products(data["partial"], fields)
+    if data["result"]:
+        data["result"] = dict(data["result"], report=_project_products(data["result"].get("report"), fields))
+    return FastJSONResponse(data)
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request) -> StreamingResponse:
+    """
+    Server-Sent Events: one `progress` event per stage update, then a final
+    `done` (with the result) or `failed` event. Reconnects resume from Last-Event-ID.
+    """
+    job = _get_job(job_id)
+    try:
+        next_seq = int(request.headers.get("last-event-id", -1)) + 1
+    except ValueError:
+        next_seq = 0
+
+    async def stream():
+        nonlocal next_seq
+        last_send = time.time()
+        while True:
+            for event in job.events_since(next_seq):
+                next_seq = event["seq"] + 1
+                last_send = time.time()
+                yield f"id: {event['seq']}\nevent: progress\ndata: {json.dumps(event)}\n\n"
+            if job.done and not job.events_since(next_seq):
+                name = "done" if job.status == "succeeded" else "failed"
+                yield f"event: {name}\ndata: {json.dumps(job.to_dict(include_partial=False), default=str)}\n\n"
+                return
+            if await request.is_disconnected():
+                return
+            if time.time() - last_send > 15:
+                # Comment line keeps proxies from closing an idle stream
+                last_send = time.time()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "jobs": job_store.stats(),
+        "result_cache": scrape_cache_stats(),
+        "recent_scrapes": recent_scrapes(),
+        "coalesced": coalescing_stats(),
+        "responses": response_stats(),
+    }
 
 @app.post("/test-scraper")
-def test_scraper(req: AnalyzeRequest) -> Dict:
+def test_scraper(req: AnalyzeRequest, fields: Optional[str] = None) -> Dict:
     """
     Test endpoint: Only scrape products, no AI analysis.
     Use this to verify pincode and products are correct.
@@ -102,14 +222,14 @@ def test_scraper(req: AnalyzeRequest) -> Dict:
         print(f"🔢 Max products: {req.max_products}")
         print(f"{'='*60}\n")
         
-        products = scrape_blinkit(req.category, req.max_products, req.pincode)
+        products = scrape_blinkit(req.category, req.max_products, req.pincode, refresh=req.refresh)
         
         return {
             "test_mode": True,
             "category": req.category,
             "pincode": req.pincode,
             "total_products": len(products),
-            "products": products[:10],  # Return first 10 for inspection
+            "products": select_fields(products[:10], fields),  # Return first 10 for inspection
             "message": "Scraping complete. Check terminal for detailed logs."
         }
     except Exception as e:
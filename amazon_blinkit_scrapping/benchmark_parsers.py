@@ -0,0 +1,229 @@
+"""
+Parse throughput benchmark on the saved Blinkit pages.
+
+Replays every fixture under html_pages/ (plus blinkit_products.html) through
+the card parser (_parse_products), blinkit_scraper_combined's
+scrape_blinkit_from_html and the weights helpers, and reports per-stage time,
+products/sec and peak memory. The parse_products stage bypasses the shared
+card cache (cache=False) so repeated runs time real parses; the
+parse_products_card_cache stage times the cache path cold, with a fresh cache
+per run. --scale tiles the fixture cards into synthetic pages of N products
+to show how each stage grows with input size.
+
+    python benchmark_parsers.py
+    python benchmark_parsers.py --parsers html.parser selectolax --scale 1000 10000
+    python benchmark_parsers.py --out bench_results/$(date +%F).json
+
+Results are written as JSON (--out) so runs can be compared over time.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from app_backend.app.scraper.blinkit_scraper import _parse_products
+from app_backend.app.scraper.card_cache import CardParseCache
+from app_backend.app.scraper.html_parsers import CARD_SELECTORS, PARSER_BACKENDS, resolve_parser
+from app_backend.app.utils.weights import (
+    normalize_units,
+    parse_price_to_float,
+    parse_quantity,
+    parse_weight_to_grams,
+    price_per_100g,
+)
+from blinkit_scraper_combined import scrape_blinkit_from_html
+
+_CARD_ID_RE = re.compile(r'\bid="([^"]*)"')
+
+
+def find_fixtures():
+    paths = sorted(glob.glob(os.path.join(HERE, 'html_pages', '**', '*.html'), recursive=True))
+    single = os.path.join(HERE, 'blinkit_products.html')
+    if os.path.exists(single):
+        paths.append(single)
+    return paths
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def collect_cards(pages):
+    """Outer HTML of every product card across the fixture pages."""
+    from bs4 import BeautifulSoup
+    cards = []
+    for html in pages:
+        soup = BeautifulSoup(html, resolve_parser('lxml'))
+        cards.extend(str(el) for el in soup.select(CARD_SELECTORS[0]))
+    return cards
+
+
+def tile_cards(cards, count):
+    """Synthetic results page with `count` cards, ids made unique so dedup keeps them all."""
+    parts = ['<html><body><div id="grid">']
+    for i in range(count):
+        card = cards[i % len(cards)]
+        parts.append(_CARD_ID_RE.sub(lambda m: f'id="{m.group(1)}-{i}"', card, count=1))
+    parts.append('</div></body></html>')
+    return ''.join(parts)
+
+
+def _measure(fn, repeat):
+    """Best-of-`repeat` wall time, plus peak traced memory from one extra run."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def _stage(name, parser, fn, repeat):
+    result, seconds, peak = _measure(fn, repeat)
+    products = len(result)
+    return {
+        'stage': name,
+        'parser': parser,
+        'products': products,
+        'seconds': round(seconds, 4),
+        'products_per_sec': round(products / seconds, 1) if seconds > 0 else None,
+        'peak_memory_mb': round(peak / 1024 / 1024, 2),
+    }
+
+
+def _weights_per_row(products):
+    return [
+        price_per_100g(parse_price_to_float(p['price_text']), parse_weight_to_grams(p['weight']))
+        for p in products
+    ]
+
+
+def _clear_weight_caches():
+    # Every memoized parser either stage uses, so both start cold
+    parse_price_to_float.cache_clear()
+    parse_weight_to_grams.cache_clear()
+    parse_quantity.cache_clear()
+
+
+def bench_input(label, html, parsers, repeat):
+    """All stages on one page of HTML."""
+    rows = []
+    products = []
+    for parser in parsers:
+        # Timed runs repeat the same page: a warm shared card cache would time lookups, not parsing
+        row = _stage('parse_products', parser,
+                     lambda: _parse_products(html, parser=parser, cache=False), repeat)
+        rows.append(row)
+        row = _stage('parse_products_card_cache', parser,
+                     lambda: _parse_products(html, parser=parser, cache=CardParseCache()), repeat)
+        rows.append(row)
+        row = _stage('scrape_blinkit_from_html', parser, lambda: scrape_blinkit_from_html(html, parser=parser), repeat)
+        rows.append(row)
+    with contextlib.redirect_stdout(io.StringIO()):
+        products = _parse_products(html, parser=parsers[-1], cache=False)
+
+    weights = [p['weight'] for p in products]
+    prices = [p['price_text'] for p in products]
+
+    def per_row_cold():
+        _clear_weight_caches()
+        return _weights_per_row(products)
+
+    def batch_cold():
+        _clear_weight_caches()
+        return normalize_units(weights, prices)
+
+    rows.append(_stage('weights_per_row', None, per_row_cold, repeat))
+    rows.append(_stage('weights_batch', None, batch_cold, repeat))
+    for row in rows:
+        row['input'] = label
+        row['html_bytes'] = len(html.encode('utf-8'))
+    return rows
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Blinkit HTML parsing on saved pages")
+    parser.add_argument('--parsers', nargs='+', default=list(PARSER_BACKENDS), choices=PARSER_BACKENDS,
+                        help="Parser backends to compare (missing ones are skipped)")
+    parser.add_argument('--scale', nargs='*', type=int, default=[],
+                        help="Also benchmark synthetic pages with this many cards, e.g. 1000 10000")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage (best is reported)")
+    parser.add_argument('--out', default='benchmark_results.json', help="JSON file for the results")
+    args = parser.parse_args()
+
+    parsers = [p for p in args.parsers if resolve_parser(p) == p]
+    fixtures = find_fixtures()
+    if not fixtures:
+        print("No saved pages found under html_pages/ - save a scrape with save_html=True first")
+        return
+    print(f"Fixtures: {len(fixtures)} | Parsers: {', '.join(parsers)}")
+
+    pages = [(os.path.relpath(path, HERE), _read(path)) for path in fixtures]
+    rows = []
+    for label, html in pages:
+        print(f"⏱️  {label}")
+        rows.extend(bench_input(label, html, parsers, args.repeat))
+
+    if args.scale:
+        cards = collect_cards(html for _, html in pages)
+        if not cards:
+            print("⚠️ No product cards in the fixtures, skipping --scale")
+        for count in args.scale if cards else []:
+            print(f"⏱️  synthetic x{count}")
+            rows.extend(bench_input(f"synthetic:{count}", tile_cards(cards, count), parsers, args.repeat))
+
+    print(f"\n{'input':<42} {'stage':<26} {'parser':<12} {'products':>8} {'seconds':>9} {'prod/s':>10} {'peak MB':>8}")
+    for row in rows:
+        print(f"{row['input'][:42]:<42} {row['stage']:<26} {row['parser'] or '-':<12} {row['products']:>8} "
+              f"{row['seconds']:>9.4f} {row['products_per_sec'] or 0:>10.0f} {row['peak_memory_mb']:>8.2f}")
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': rows,
+    }
+    out_dir = os.path.dirname(args.out)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
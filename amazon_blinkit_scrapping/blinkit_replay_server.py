@@ -0,0 +1,84 @@
+"""
+Local stand-in for Blinkit's search API.
+
+Replays search responses recorded by the Selenium scraper (run a scrape with
+BLINKIT_RECORD_DIR=recorded_responses) so the HTTP engine can be exercised
+without touching blinkit.com:
+
+    python blinkit_replay_server.py --dir recorded_responses --port 8765
+    BLINKIT_API_BASE=http://127.0.0.1:8765 python backend.py
+
+Responses live in <dir>/<query>/000.json, 001.json, ...; the request's
+offset/limit picks the page, and pages past the end return no snippets.
+"""
+
+import argparse
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+EMPTY_PAGE = {"response": {"snippets": []}}
+
+
+def make_handler(record_dir):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def _reply(self):
+            # Drain any request body so keep-alive connections stay in sync
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            parsed = urlparse(self.path)
+            params = parse_qs(parsed.query)
+            query = params.get("q", [""])[0].strip().lower().replace(" ", "_")
+            offset = int(params.get("offset", ["0"])[0] or 0)
+            limit = int(params.get("limit", ["24"])[0] or 24)
+
+            if "search" not in parsed.path or not query:
+                self.send_error(404, "Unknown endpoint")
+                return
+
+            query_dir = os.path.join(record_dir, query)
+            pages = sorted(f for f in os.listdir(query_dir) if f.endswith(".json")) if os.path.isdir(query_dir) else []
+            index = offset // max(1, limit)
+            if index < len(pages):
+                with open(os.path.join(query_dir, pages[index]), "rb") as f:
+                    body = f.read()
+            else:
+                body = json.dumps(EMPTY_PAGE).encode("utf-8")
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = _reply
+        do_POST = _reply
+
+        def log_message(self, fmt, *args):
+            print(f"[replay] {self.address_string()} {fmt % args}")
+
+    return ReplayHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Blinkit search API responses")
+    parser.add_argument("--dir", default="recorded_responses", help="Directory with <query>/NNN.json pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.dir))
+    print(f"Replaying responses from {args.dir} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
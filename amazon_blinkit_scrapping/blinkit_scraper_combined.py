@@ -1,11 +1,12 @@
 import time
 import pandas as pd
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import WebDriverException
 
+from app_backend.app.scraper.html_parsers import extract_card_fields
+
 def download_blinkit_page_with_selenium(url):
     """
     Automates opening a Blinkit page, scrolling to the bottom, and returning the HTML.
@@ -59,46 +60,38 @@ def download_blinkit_page_with_selenium(url):
     return page_source
 
 
-def scrape_blinkit_from_html(html_content):
+def scrape_blinkit_from_html(html_content, parser=None):
     """
     Scrapes product information from Blinkit HTML content.
     Returns a pandas DataFrame with product data.
+
+    `parser` selects the HTML backend: "html.parser" (default), "lxml" or
+    "selectolax" (or set BLINKIT_HTML_PARSER).
     """
     print("Parsing the HTML content...")
     
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
     print("Extracting product data...")
     products = []
     
     # --- Find all product cards ---
     try:
         # The product cards are divs with a unique ID and a role of 'button'
-        product_cards = soup.select('div[id][role="button"][tabindex="0"]')
+        cards = extract_card_fields(
+            html_content,
+            parser=parser,
+            selectors=['div[id][role="button"][tabindex="0"]'],
+            fallback=False,
+            fill_missing=False,
+        )
         
-        print(f"Found {len(product_cards)} product cards.")
-
-        for card in product_cards:
-            try:
-                # Updated selectors based on the HTML structure with Tailwind CSS classes
-                name_element = card.select_one("div.tw-text-300.tw-font-semibold.tw-line-clamp-2")
-                weight_element = card.select_one("div.tw-text-200.tw-font-medium.tw-line-clamp-1")
-                # This selector is more specific to get the price and avoid the striked-out price
-                price_element = card.select_one("div.tw-flex.tw-items-center.tw-justify-between > div > div.tw-text-200.tw-font-semibold")
-                
-                name = name_element.text.strip() if name_element else "N/A"
-                weight = weight_element.text.strip() if weight_element else "N/A"
-                price = price_element.text.strip() if price_element else "N/A"
-                
-                products.append({
-                    'name': name,
-                    'weight': weight,
-                    'price': price
-                })
-            except Exception:
-                # This handles cases where a card might be an ad or has a different structure
-                print("Skipping a card with missing information.")
-                continue
+        print(f"Found {len(cards)} product cards.")
+
+        for card in cards:
+            products.append({
+                'name': card['name'] or "N/A",
+                'weight': card['weight'] or "N/A",
+                'price': card['price_text'] or "N/A"
+            })
     
     except Exception as e:
         print(f"An error occurred while extracting product details: {e}")
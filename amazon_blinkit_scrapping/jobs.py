@@ -0,0 +1,144 @@
+"""
+In-process job runner for long analyses (used by backend.py's /jobs API).
+
+A job runs a function on a small worker pool and records per-stage progress
+events plus partial results as they become final, so clients can poll
+GET /jobs/{id} or follow GET /jobs/{id}/events (SSE) instead of holding one
+HTTP request open for minutes. Finished jobs are kept for BLINKIT_JOB_TTL_SECONDS.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class JobFailed(Exception):
+    """Raise from a job function to fail it with a specific HTTP-style status code."""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class Job:
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = "queued"  # queued -> running -> succeeded | failed
+        self.stage: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self.partial: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.error_status: Optional[int] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def add_event(self, stage: str, **info: Any) -> None:
+        partial = info.pop("partial", None)
+        with self._lock:
+            self.stage = stage
+            if partial:
+                self.partial.update(partial)
+            self.events.append({"seq": len(self.events), "stage": stage, "time": round(time.time(), 3), **info})
+
+    def events_since(self, seq: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self.events[seq:]
+
+    def to_dict(self, include_partial: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            data = {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "stage": self.stage,
+                "params": self.params,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+                "events": list(self.events),
+                "error": self.error,
+                "error_status": self.error_status,
+            }
+            if include_partial:
+                data["partial"] = dict(self.partial)
+            data["result"] = self.result
+            return data
+
+
+class JobStore:
+    """Runs jobs on a bounded pool and keeps them until `ttl_seconds` after they finish."""
+
+    def __init__(self, workers: int = 2, ttl_seconds: float = 3600):
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="job")
+
+    def submit(self, kind: str, params: Dict[str, Any], fn: Callable[[Callable[..., None]], Dict[str, Any]]) -> Job:
+        """`fn(progress)` does the work; `progress(stage, **info)` records an event."""
+        self._purge()
+        job = Job(kind, params)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Callable[..., None]], Dict[str, Any]]) -> None:
+        job.status = "running"
+        job.add_event("started")
+        # The final event is recorded before the status flips, so an SSE
+        # client that sees `done` has already been sent every event
+        try:
+            job.result = fn(job.add_event)
+            job.add_event("done")
+            job.finished_at = time.time()
+            job.status = "succeeded"
+        except Exception as e:
+            job.error = str(e)
+            job.error_status = getattr(e, "status_code", 500)
+            job.add_event("failed", error=job.error)
+            job.finished_at = time.time()
+            job.status = "failed"
+            print(f"❌ Job {job.id} failed: {e}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [jid for jid, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+            for jid in expired:
+                del self._jobs[jid]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return counts
+
+
+job_store = JobStore(
+    workers=int(_env_number("BLINKIT_JOB_WORKERS", 2)),
+    ttl_seconds=_env_number("BLINKIT_JOB_TTL_SECONDS", 3600),
+)
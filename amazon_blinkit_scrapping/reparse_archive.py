@@ -0,0 +1,266 @@
+"""
+Re-parse every archived page under html_pages/ into one Parquet dataset.
+
+Finds saved Blinkit search pages (html_pages/blinkit_<pincode>/<query>_<pincode>.html
+and every snapshot in the compressed html_archive/), and Amazon review pages
+(html_pages/<ASIN>/reviews_page_<n>.html), parses them across a process
+pool and appends the rows to a dataset directory:
+
+    python reparse_archive.py
+    python reparse_archive.py --html-dir html_pages --out parsed_dataset --workers 4
+
+Each run writes one part-<timestamp>.parquet file. Every row carries its
+source, source_file, content_hash, pincode, query/asin and parsed_at. A
+manifest keyed by content hash plus pincode/query (or asin/page)
+(_manifest.json) makes runs incremental: pages already parsed are skipped.
+Identical HTML saved for two pincodes is parsed once and its rows written for
+each. --full re-parses everything and replaces the old part files. Read the
+result with pandas.read_parquet("parsed_dataset").
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+MANIFEST_NAME = "_manifest.json"  # leading underscore: skipped by Parquet dataset readers
+_PART_RE = re.compile(r"^part-.*\.parquet$")
+
+# Fixed schema so part files written by different runs read back as one table
+COLUMNS = {
+    "source": "string", "source_file": "string", "content_hash": "string",
+    "pincode": "string", "query": "string", "asin": "string", "page": "Int64",
+    "parsed_at": "string",
+    # Blinkit products
+    "rank": "Int64", "name": "string", "brand": "string", "weight": "string",
+    "price": "float64", "price_text": "string", "grams": "float64", "price_per_100g": "float64",
+    # Amazon reviews
+    "product_title": "string", "reviewer": "string", "rating": "string", "title": "string",
+    "review_body": "string", "review_date": "string",
+}
+_BLINKIT_DIR_RE = re.compile(r"^blinkit_(\d{6})$")
+_ASIN_RE = re.compile(r"^[A-Z0-9]{10}$")
+_REVIEW_PAGE_RE = re.compile(r"reviews_page_(\d+)\.html$")
+
+
+def discover_pages(html_dir):
+    """(path, metadata) for every archived Blinkit/Amazon page, in a stable order."""
+    pages = []
+    if not os.path.isdir(html_dir):
+        return pages
+    for folder in sorted(os.listdir(html_dir)):
+        folder_path = os.path.join(html_dir, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        blinkit = _BLINKIT_DIR_RE.match(folder)
+        for filename in sorted(os.listdir(folder_path)):
+            if not filename.endswith(".html"):
+                continue
+            path = os.path.join(folder_path, filename)
+            stem = filename[:-len(".html")]
+            if blinkit:
+                pincode = blinkit.group(1)
+                query = stem[:-len(pincode) - 1] if stem.endswith(f"_{pincode}") else stem
+                pages.append((path, {"source": "blinkit", "pincode": pincode, "query": query.replace("_", " ")}))
+            elif _ASIN_RE.match(folder):
+                page = _REVIEW_PAGE_RE.search(filename)
+                pages.append((path, {"source": "amazon", "asin": folder, "page": int(page.group(1)) if page else None}))
+    return pages
+
+
+def discover_archive(archive_dir):
+    """(object path, metadata) for each distinct page per pincode/query in the compressed HTML archive."""
+    from app_backend.app.scraper.html_archive import INDEX_NAME
+    pages = []
+    seen = set()
+    try:
+        with open(os.path.join(archive_dir, INDEX_NAME), "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return pages
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        key = (entry["sha256"], entry["pincode"], entry["query"])
+        if key in seen:
+            continue
+        seen.add(key)
+        pages.append((os.path.join(archive_dir, entry["object"]), {
+            "source": "blinkit",
+            "pincode": entry["pincode"],
+            "query": entry["query"],
+            "sha256": entry["sha256"],  # already the content hash, no need to re-read the file
+            "codec": entry["codec"],
+            "source_file": os.path.join(os.path.basename(os.path.normpath(archive_dir)), entry["object"]),
+        }))
+    return pages
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def manifest_key(digest, meta):
+    """Content hash plus where the page belongs: the same HTML under another pincode is another page."""
+    if meta["source"] == "blinkit":
+        return f"{digest}|{meta.get('pincode')}|{meta.get('query')}"
+    return f"{digest}|{meta.get('asin')}|{meta.get('page')}"
+
+
+def parse_page(path, meta):
+    """Worker: parse one page into rows (runs in a child process)."""
+    if meta.get("codec"):
+        from app_backend.app.scraper.html_archive import read_archived_object
+        html = read_archived_object(path, meta["codec"])
+    else:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            html = f.read()
+    if meta["source"] == "blinkit":
+        from app_backend.app.scraper.blinkit_scraper import _parse_products
+        rows = _parse_products(html)
+        for rank, row in enumerate(rows, 1):
+            row["rank"] = rank
+        return rows
+    from bs4 import BeautifulSoup
+    from amazon_scraper import get_reviews
+    rows = get_reviews(BeautifulSoup(html, "html.parser"))
+    for row in rows:
+        row["reviewer"] = row.pop("name")  # "name" is the product name column
+    return rows
+
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def remove_parts(out_dir, keep=None):
+    """Delete the dataset's part files (all but `keep`), e.g. after a --full run replaced them."""
+    removed = 0
+    for filename in os.listdir(out_dir):
+        if _PART_RE.match(filename) and filename != keep:
+            os.remove(os.path.join(out_dir, filename))
+            removed += 1
+    return removed
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-parse archived Blinkit/Amazon pages into a Parquet dataset")
+    parser.add_argument("--html-dir", default=os.path.join(HERE, "html_pages"), help="Archive root (default: html_pages)")
+    parser.add_argument("--archive-dir", default=os.path.join(HERE, "html_archive"), help="Compressed archive written by save_html")
+    parser.add_argument("--out", default=os.path.join(HERE, "parsed_dataset"), help="Dataset directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and re-parse every page")
+    args = parser.parse_args()
+
+    try:
+        import pyarrow  # noqa: F401  (pandas' Parquet engine)
+    except ImportError:
+        print("❌ pyarrow is required to write Parquet: pip install pyarrow")
+        sys.exit(1)
+
+    os.makedirs(args.out, exist_ok=True)
+    full = args.full
+    manifest = {} if full else load_manifest(args.out)
+    if any("|" not in key for key in manifest):
+        # Older manifests were keyed by content hash alone and can't tell pincodes apart
+        print("ℹ️ Manifest from an older version, re-parsing everything (as with --full)")
+        manifest, full = {}, True
+
+    pages = discover_pages(args.html_dir) + discover_archive(args.archive_dir)
+    # The same content saved under several names is parsed once, then
+    # written once per distinct pincode/query (or asin/page) it was saved for
+    groups = {}
+    skipped = 0
+    for path, meta in pages:
+        digest = meta.get("sha256") or content_hash(path)
+        key = manifest_key(digest, meta)
+        if key in manifest:
+            skipped += 1
+            continue
+        group = groups.setdefault(digest, (path, meta, {}))
+        group[2].setdefault(key, (path, meta))
+
+    pending = sum(len(targets) for _, _, targets in groups.values())
+    print(f"📂 {len(pages)} pages found, {skipped} already parsed, {pending} to parse "
+          f"({len(groups)} distinct) with {args.workers} workers")
+    if not groups:
+        if full and remove_parts(args.out):
+            save_manifest(args.out, manifest)
+            print("🧹 Removed the old part files, nothing to parse")
+        return
+
+    started = time.time()
+    parsed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    part_name = f"part-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}.parquet"
+    frames = []
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {executor.submit(parse_page, path, meta): (digest, targets) for digest, (path, meta, targets) in groups.items()}
+        for future in as_completed(futures):
+            digest, targets = futures[future]
+            try:
+                rows = future.result()
+            except Exception as e:
+                failed += 1
+                path, meta = next(iter(targets.values()))
+                print(f"❌ {meta.get('source_file') or os.path.relpath(path, args.html_dir)}: {e}")
+                continue
+            for key, (path, meta) in targets.items():
+                rel = meta.get("source_file") or os.path.relpath(path, args.html_dir)
+                frame = pd.DataFrame(rows)
+                frame.insert(0, "source", meta["source"])
+                frame.insert(1, "source_file", rel)
+                frame.insert(2, "content_hash", digest)
+                for column in ("pincode", "query", "asin", "page"):
+                    frame[column] = meta.get(column)
+                frame["parsed_at"] = parsed_at
+                frames.append(frame)
+                manifest[key] = {"file": rel, "rows": len(rows), "parsed_at": parsed_at, "part": part_name}
+                print(f"✅ {rel}: {len(rows)} rows")
+
+    rows_written = 0
+    if frames:
+        dataset = pd.concat(frames, ignore_index=True, sort=False)
+        dataset = dataset.reindex(columns=list(COLUMNS)).astype(COLUMNS)
+        dataset.to_parquet(os.path.join(args.out, part_name), index=False)
+        rows_written = len(dataset)
+    if full:
+        # Everything was just re-parsed into part_name: older parts would duplicate its rows
+        removed = remove_parts(args.out, keep=part_name)
+        if removed:
+            print(f"🧹 Removed {removed} old part files")
+    save_manifest(args.out, manifest)
+    print(f"💾 {rows_written} rows from {len(frames)} pages written to {os.path.join(args.out, part_name)} "
+          f"in {time.time() - started:.1f}s ({failed} failed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Optional
+import hashlib
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from app_backend.app.single_flight import SingleFlight, single_flight_stats
 
 # Load environment variables
 env_path = Path(__file__).parent / ".env"
@@ -13,7 +16,7 @@ CLOUD_MODE = os.getenv("CLOUD_MODE", "false").lower() == "true"
 if not CLOUD_MODE:
     # Import existing modules only if not in cloud mode
     try:
-        from app_backend.app.scraper.blinkit_scraper import scrape_for_pincode_query
+        from app_backend.app.scraper.result_cache import cached_scrape_pincode, recent_scrape_stats, result_cache_stats
         from app_backend.app.utils.gemini_helper import analyze_top_products, generate_gap_analysis, analyze_news_insights
         from app_backend.app.utils.news_helper import get_trending_news
     except Exception as e:
@@ -24,7 +27,7 @@ else:
     print("Running in CLOUD_MODE - using mock data for scraping")
 
 
-def scrape_blinkit(category: str, max_products: int = 30, pincode: str = "380015") -> List[Dict]:
+def scrape_blinkit(category: str, max_products: int = 30, pincode: str = "380015", refresh: bool = False) -> List[Dict]:
     """
     Scrape Blinkit for products in a given category.
     Returns a list of product dicts with complete information.
@@ -33,6 +36,7 @@ def scrape_blinkit(category: str, max_products: int = 30, pincode: str = "380015
         category: Product category to search (e.g., 'snacks', 'protein bar')
         max_products: Maximum number of products to return
         pincode: Pincode for location-based search (default: 380015)
+        refresh: Scrape again even if this search is in the result cache
     
     Returns:
         List of product dictionaries with:
@@ -68,13 +72,15 @@ def scrape_blinkit(category: str, max_products: int = 30, pincode: str = "380015
         print(f"3. The scraper will continue automatically after 15 seconds")
         print(f"{'='*70}\n")
     
-    # Scrape products
-    products, _ = scrape_for_pincode_query(
+    # Scrape products (reuses a recent identical search unless refresh=True)
+    products = cached_scrape_pincode(
         pincode=pincode,
         query=category,
         save_html=False,
         max_scrolls=25,  # Increased for more accurate product loading
-        headless=(not manual_location_mode)  # Non-headless if manual mode
+        headless=(not manual_location_mode),  # Non-headless if manual mode
+        max_products=max_products,  # Stop scrolling once enough cards are loaded
+        refresh=refresh,
     )
     
     # Check if scraping was successful
@@ -111,7 +117,35 @@ def scrape_blinkit(category: str, max_products: int = 30, pincode: str = "380015
     return enriched_products
 
 
-def analyze_products_with_gemini_and_news(products: List[Dict], category: str) -> Dict:
+def scrape_cache_stats() -> Optional[Dict]:
+    """Scrape result cache counters for /health (None before the first scrape or in cloud mode)."""
+    return None if CLOUD_MODE else result_cache_stats()
+
+
+def recent_scrapes() -> List[Dict]:
+    """Metrics of the last few real scrapes (location attempts, pincode verdict, scroll steps, extract mode, traffic) for /health."""
+    return [] if CLOUD_MODE else recent_scrape_stats()
+
+
+def coalescing_stats() -> Dict[str, Dict]:
+    """How many scrapes/analyses joined an identical one already in flight (for /health)."""
+    return single_flight_stats()
+
+
+# progress(stage, **info): stage is "product_analysis", "gap_analysis" or "news";
+# info["partial"] holds result fields that are already final.
+ProgressCallback = Callable[..., None]
+
+# Identical analyses running at the same time share one chain of Gemini/NewsAPI calls
+_analysis_flight = SingleFlight("analysis")
+
+
+def _analysis_key(products: List[Dict], category: str) -> tuple:
+    digest = hashlib.blake2b(json.dumps(products, sort_keys=True, default=str).encode("utf-8"), digest_size=16)
+    return (" ".join(category.lower().split()), digest.hexdigest())
+
+
+def analyze_products_with_gemini_and_news(products: List[Dict], category: str, progress: Optional[ProgressCallback] = None) -> Dict:
     """
     Analyze products using Gemini AI and fetch related news using NewsAPI.
     
@@ -125,6 +159,7 @@ def analyze_products_with_gemini_and_news(products: List[Dict], category: str) -
     Args:
         products: List of product dictionaries from scrape_blinkit()
         category: Product category for context
+        progress: Optional callback reporting each stage as it finishes
     
     Returns:
         Dictionary containing:
@@ -134,6 +169,16 @@ def analyze_products_with_gemini_and_news(products: List[Dict], category: str) -
         - news_insights: Trending news articles
         - market_trends: Industry trends and insights
     """
+    # A request identical to one in flight waits for that result (and its
+    # remaining progress events) instead of spending Gemini quota again
+    return _analysis_flight.do(
+        _analysis_key(products, category),
+        lambda broadcast: _analyze_products_with_gemini_and_news(products, category, broadcast),
+        listener=progress,
+    )
+
+
+def _analyze_products_with_gemini_and_news(products: List[Dict], category: str, progress: ProgressCallback) -> Dict:
     # Check if required API keys are configured
     gemini_key = os.getenv("GEMINI_API_KEY")
     news_key = os.getenv("NEWSAPI_KEY")
@@ -154,13 +199,20 @@ def analyze_products_with_gemini_and_news(products: List[Dict], category: str) -
     if gemini_key:
         try:
             # Analyze only top 3 products
-            analyzed_products = analyze_top_products(products_to_analyze, top_n=3)
+            def on_product(index: int, total: int, analyzed: Dict[str, Any]) -> None:
+                result["products"].append(analyzed)
+                progress("product_analysis", index=index, total=total, name=analyzed.get("name"),
+                         partial={"products": list(result["products"])})
+
+            analyzed_products = analyze_top_products(products_to_analyze, top_n=3, on_product=on_product)
             result["products"] = analyzed_products
             
             # Generate gap analysis (re-enabled for comprehensive insights)
             print("📊 Generating market gap analysis...")
+            progress("gap_analysis", status="started")
             gap_analysis = generate_gap_analysis(analyzed_products, category)
             result["gap_analysis"] = gap_analysis
+            progress("gap_analysis", status="done", partial={"gap_analysis": gap_analysis})
             
             # Create summary
             result["summary"] = f"Scraped {len(products)} products, analyzed top {len(analyzed_products)} in detail. "
@@ -174,6 +226,7 @@ def analyze_products_with_gemini_and_news(products: List[Dict], category: str) -
     if news_key:
         try:
             # Get trending news (7 days, 10 articles)
+            progress("news", status="started")
             news_data = get_trending_news(category, days_back=7, max_results=10)
             if news_data.get("articles"):
                 result["news_insights"] = news_data["articles"]
@@ -183,6 +236,8 @@ def analyze_products_with_gemini_and_news(products: List[Dict], category: str) -
                 print("🤖 Analyzing news with AI...")
                 ai_news_insights = analyze_news_insights(news_data["articles"], category)
                 result["ai_news_analysis"] = ai_news_insights
+            progress("news", status="done", articles=len(result["news_insights"]),
+                     partial={"news_insights": result["news_insights"], "ai_news_analysis": result["ai_news_analysis"]})
             
             # Market trends removed - insights now in AI news analysis
         except Exception as e:
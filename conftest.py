@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The tests import the backend the way production does: app_backend.app.*,
+# with the scraper directory (backend.py, jobs.py, ...) on the path
+SCRAPER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'amazon_blinkit_scrapping')
+sys.path.insert(0, SCRAPER_DIR)
+
+# Script-style checks that need live servers or API keys
+collect_ignore = ['test_scraper.py', 'test_news.py']
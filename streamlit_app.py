@@ -1,6 +1,7 @@
 import streamlit as st
 import requests
 import json
+import time
 from typing import Dict, Any
 
 st.set_page_config(
@@ -147,6 +148,68 @@ with st.sidebar:
     st.markdown("- 📊 Gap Analysis")
     st.markdown("- 💡 Product Recommendations")
 
+# Job API helpers: the backend runs the analysis in the background (POST /jobs)
+# and we poll its progress instead of holding one request open for minutes.
+STAGE_LABELS = {
+    "started": "Starting...",
+    "scrape": "Scraping Blinkit",
+    "product_analysis": "Analyzing products with Gemini",
+    "gap_analysis": "Running gap analysis",
+    "news": "Fetching market news",
+    "done": "Done",
+}
+
+
+# Product keys the report tabs below render; the backend drops the rest (duplicate aliases, ids, ...)
+REPORT_FIELDS = "name,brand,price,weight,price_per_100g,analysis"
+
+
+class JobResponse:
+    """Looks enough like a requests.Response for the rendering code below."""
+
+    def __init__(self, status_code: int, data: Dict[str, Any]):
+        self.status_code = status_code
+        self._data = data
+        self.text = json.dumps(data)
+
+    def json(self) -> Dict[str, Any]:
+        return self._data
+
+
+def run_analysis_job(api_url: str, payload: Dict[str, Any], timeout: int = 900):
+    """Start an analysis job and poll it, updating a progress bar. Falls back to POST /analyze on old backends."""
+    start = requests.post(f"{api_url}/jobs", json=payload, timeout=30)
+    if start.status_code == 404:
+        return requests.post(f"{api_url}/analyze", json=payload, params={"fields": REPORT_FIELDS}, timeout=timeout)
+    if start.status_code != 202:
+        return start
+
+    job_url = f"{api_url}{start.json()['status_url']}"
+    progress_bar = st.progress(0.0, text=STAGE_LABELS["started"])
+    deadline = time.time() + timeout
+    try:
+        while time.time() < deadline:
+            job = requests.get(job_url, params={"fields": REPORT_FIELDS}, timeout=30).json()
+            events = job.get("events") or [{}]
+            last = events[-1]
+            label = STAGE_LABELS.get(last.get("stage"), last.get("stage") or "Working...")
+            fraction = {"scrape": 0.1, "product_analysis": 0.2, "gap_analysis": 0.7, "news": 0.8}.get(last.get("stage"), 0.05)
+            if last.get("stage") == "product_analysis" and last.get("total"):
+                fraction = 0.2 + 0.5 * last["index"] / last["total"]
+                label = f"{label} ({last['index']}/{last['total']}): {last.get('name', '')}"
+            progress_bar.progress(min(fraction, 1.0), text=label)
+
+            if job["status"] == "succeeded":
+                progress_bar.progress(1.0, text=STAGE_LABELS["done"])
+                return JobResponse(200, job["result"])
+            if job["status"] == "failed":
+                return JobResponse(job.get("error_status") or 500, {"detail": job.get("error")})
+            time.sleep(2)
+    finally:
+        progress_bar.empty()
+    raise requests.exceptions.Timeout(f"Job did not finish within {timeout} seconds")
+
+
 # Main content
 if analyze_button:
     if not category:
@@ -154,15 +217,15 @@ if analyze_button:
     else:
         with st.spinner(f"🔍 Analyzing {max_products} {category} products for pincode {pincode}... This may take 2-3 minutes. Please wait..."):
             try:
-                # Make API request with longer timeout
-                response = requests.post(
-                    f"{api_url}/analyze",
-                    json={
+                # Run as a background job and poll for progress (15 minutes max)
+                response = run_analysis_job(
+                    api_url,
+                    {
                         "category": category,
                         "max_products": max_products,
                         "pincode": pincode
                     },
-                    timeout=900  # 15 minutes timeout
+                    timeout=900
                 )
                 
                 if response.status_code == 200:
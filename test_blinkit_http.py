@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from app_backend.app.scraper import blinkit_http, location_session
+from blinkit_replay_server import make_handler
+
+
+def _item(product_id, name, unit, price):
+    return {"product_id": product_id, "product_name": name, "unit": unit, "price": price}
+
+
+# Recorded search pages for "protein bar": the first one carries a server
+# cursor, the second doesn't, so the third has to be fetched by offset.
+PAGES = [
+    {"response": {
+        "snippets": [{"data": _item(1, "Yoga Bar Protein Bar", "60 g", 100)},
+                     {"data": _item(2, "Yoga Bar Protein Bar", "6 x 60 g", 100)}],
+        "pagination": {"next_url": "/v1/layout/search?q=protein+bar&offset=24&limit=24"},
+    }},
+    {"response": {"snippets": [{"data": _item(2, "Yoga Bar Protein Bar", "6 x 60 g", 100)},
+                               {"data": _item(3, "RiteBite Max Protein Bar", "70 g", 90)}]}},
+    {"response": {"snippets": [{"data": _item(4, "Whole Truth Protein Bar", "52 g", 110)}]}},
+]
+
+
+@pytest.fixture
+def replay(tmp_path, monkeypatch):
+    """Replay server on PAGES, plus a verified location session for pincode 110001."""
+    query_dir = tmp_path / 'recorded' / 'protein_bar'
+    query_dir.mkdir(parents=True)
+    for i, page in enumerate(PAGES):
+        (query_dir / f'{i:03d}.json').write_text(json.dumps(page), encoding='utf-8')
+
+    session_dir = tmp_path / 'sessions'
+    session_dir.mkdir()
+    (session_dir / '110001.json').write_text(json.dumps({
+        "saved_at": time.time(),
+        "cookies": [{"name": "gr_1_lat", "value": "28.63"}, {"name": "gr_1_lon", "value": "77.21"}],
+    }), encoding='utf-8')
+    monkeypatch.setattr(location_session, 'SESSION_DIR', str(session_dir))
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(str(tmp_path / 'recorded')))
+    server.RequestHandlerClass.log_message = lambda *args: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(blinkit_http, 'API_BASE', f'http://127.0.0.1:{server.server_address[1]}')
+
+    def no_browser(**kwargs):
+        raise AssertionError("fell back to Selenium")
+
+    monkeypatch.setattr(blinkit_http, 'scrape_for_pincode_query', no_browser)
+    yield
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_engine_reads_every_replayed_page(replay):
+    stats = {}
+    products, html = blinkit_http.scrape_pincode('110001', 'protein bar', engine='http', stats=stats)
+    assert html is None
+    assert stats['engine'] == 'http'
+    assert stats['http']['pages'] == 4  # three pages, then an empty one ends the search
+    # Pack-size variants with the same name and price are both kept, repeats across pages are not
+    assert [(p['name'], p['weight']) for p in products] == [
+        ("Yoga Bar Protein Bar", "60 g"),
+        ("Yoga Bar Protein Bar", "6 x 60 g"),
+        ("RiteBite Max Protein Bar", "70 g"),
+        ("Whole Truth Protein Bar", "52 g"),
+    ]
+    assert products[0]['price'] == 100.0
+
+
+def test_http_engine_needs_a_verified_location_session(replay):
+    # Pincode 560001 has known coordinates but no session: nothing confirms the store
+    assert blinkit_http.scrape_for_pincode_query_http('560001', 'protein bar') is None
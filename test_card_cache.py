@@ -0,0 +1,90 @@
+import os
+import tempfile
+
+import pytest
+
+from app_backend.app.scraper import card_cache
+from app_backend.app.scraper.blinkit_scraper import _parse_products
+from app_backend.app.scraper.card_cache import MISS, CardParseCache, card_key
+
+CARD = '<div id="1" role="button" tabindex="0"><div>Protein Bar</div></div>'
+PRODUCT = {"name": "Protein Bar", "price": 40.0}
+
+
+def test_entries_from_an_older_card_cache_version_are_not_served():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'cards.sqlite')
+        old_key = card_key(CARD)
+        CardParseCache(db_path=db_path).put(old_key, PRODUCT)
+
+        version = card_cache.CARD_CACHE_VERSION
+        card_cache.CARD_CACHE_VERSION = version + 1
+        try:
+            new_key = card_key(CARD)
+        finally:
+            card_cache.CARD_CACHE_VERSION = version
+        assert new_key != old_key
+        # Restart: the SQLite tier still holds the old parse, under the old key only
+        cache = CardParseCache(db_path=db_path)
+        assert cache.get(new_key) is MISS
+        assert cache.get(old_key) == PRODUCT
+
+
+def _card(i):
+    return (f'<div id="{i}" role="button" tabindex="0"><div>Protein Bar Pack {i}</div>'
+            f'<div>{i * 100} g</div><div>₹{i * 10}</div></div>')
+
+
+class _CountingConnection:
+    """sqlite3 connection wrapper counting commits (explicit or via `with conn:`)."""
+
+    def __init__(self, db):
+        self._db = db
+        self.commits = 0
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def __enter__(self):
+        return self._db.__enter__()
+
+    def __exit__(self, *exc):
+        self.commits += 1
+        return self._db.__exit__(*exc)
+
+    def commit(self):
+        self.commits += 1
+        self._db.commit()
+
+
+def test_a_page_of_new_cards_is_committed_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CardParseCache(db_path=os.path.join(tmp, 'cards.sqlite'))
+        cache._db = _CountingConnection(cache._db)
+        html = '<html><body>' + ''.join(_card(i) for i in range(1, 6)) + '</body></html>'
+        products = _parse_products(html, parser='html.parser', cache=cache)
+        assert len(products) == 5
+        assert cache._db.commits == 1
+        assert cache._db.execute("SELECT COUNT(*) FROM cards").fetchone()[0] == 5
+        # Second pass: all hits, nothing written
+        assert _parse_products(html, parser='html.parser', cache=cache) == products
+        assert cache._db.commits == 1
+
+
+def test_each_parser_has_its_own_entries():
+    pytest.importorskip('lxml')
+    assert card_key(CARD, 'html.parser') != card_key(CARD, 'lxml')
+    cache = CardParseCache()
+    html = '<html><body>' + ''.join(_card(i) for i in range(1, 4)) + '</body></html>'
+    expected = _parse_products(html, parser='html.parser', cache=cache)
+    # An lxml parse is never served cards html.parser stored
+    assert _parse_products(html, parser='lxml', cache=cache) == expected
+    assert cache.stats()['hits'] == 0 and cache.stats()['entries'] == 6
+
+
+def test_cache_false_skips_the_shared_cache(monkeypatch):
+    shared = CardParseCache()
+    monkeypatch.setattr(card_cache, '_cache', shared)
+    html = '<html><body>' + _card(1) + '</body></html>'
+    assert _parse_products(html, parser='html.parser', cache=False) == _parse_products(html, parser='html.parser')
+    assert shared.stats()['misses'] == 1  # only the default call looked anything up
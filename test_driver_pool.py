@@ -0,0 +1,136 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app_backend.app.scraper import driver_pool
+from app_backend.app.scraper.driver_pool import DriverPool, max_browser_workers
+
+
+class FakeDriver:
+    """Just enough of webdriver.Chrome for the pool's health check and reset."""
+
+    def __init__(self, healthy=True, check=None):
+        self.healthy = healthy
+        self.check = check or (lambda: None)
+        self.quit_called = False
+        self.window_handles = ["main"]
+        self.switch_to = self
+
+    def window(self, handle):
+        pass
+
+    def execute_script(self, script):
+        self.check()
+        return 1 if self.healthy else 0
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def get_log(self, kind):
+        return []
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_health_check_runs_outside_the_pool_lock():
+    checking, release = threading.Event(), threading.Event()
+
+    def slow_check():
+        checking.set()
+        release.wait(10)
+
+    first = FakeDriver(check=slow_check)
+    pool = DriverPool(factory=lambda: first, size=2)
+    pool.release(pool.acquire())  # now idle
+
+    acquired = []
+    worker = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=10)))
+    worker.start()
+    assert checking.wait(10)
+    # Health check in progress: the pool still answers, and the driver counts as leased
+    stats = []
+    reader = threading.Thread(target=lambda: stats.append(pool.stats()))
+    reader.start()
+    reader.join(2)
+    release.set()
+    worker.join(10)
+    assert stats and stats[0]["leased"] == 1 and stats[0]["idle"] == 0
+    assert acquired == [first]
+
+
+def test_unhealthy_idle_driver_is_quit_and_replaced():
+    drivers = [FakeDriver(), FakeDriver()]
+    pool = DriverPool(factory=lambda: drivers.pop(0), size=1)
+    stale = pool.acquire()
+    pool.release(stale)
+    stale.healthy = False
+
+    fresh = pool.acquire(timeout=5)
+    assert fresh is not stale and stale.quit_called
+    stats = pool.stats()
+    assert (stats["failed_health_checks"], stats["created"], stats["leased"]) == (1, 2, 1)
+
+
+class _FakeProcess:
+    def __init__(self, rss_mb, children=()):
+        self.rss = rss_mb * 1024 * 1024
+        self._children = list(children)
+
+    def memory_info(self):
+        return SimpleNamespace(rss=self.rss)
+
+    def children(self, recursive=False):
+        return self._children
+
+
+def test_memory_is_the_rss_of_the_whole_chrome_tree(monkeypatch):
+    # chromedriver -> browser -> renderers: the renderers hold most of the memory
+    tree = _FakeProcess(20, [_FakeProcess(300), _FakeProcess(250), _FakeProcess(280)])
+    fake_psutil = SimpleNamespace(Process=lambda pid: tree, Error=Exception)
+    monkeypatch.setattr(driver_pool, "psutil", fake_psutil)
+    driver = SimpleNamespace(service=SimpleNamespace(process=SimpleNamespace(pid=4242)))
+    assert DriverPool._memory_mb(driver) == 850
+
+    # Over BLINKIT_DRIVER_MAX_MB: the driver is recycled when it comes back
+    drivers = [FakeDriver(), FakeDriver()]
+    pool = DriverPool(factory=lambda: drivers.pop(0), size=1, max_memory_mb=800)
+    monkeypatch.setattr(DriverPool, "_memory_mb", staticmethod(lambda d: 850.0))
+    first = pool.acquire()
+    pool.release(first)
+    assert first.quit_called
+    assert pool.acquire(timeout=5) is not first
+
+
+@pytest.mark.parametrize("available_mb, expected", [
+    (8000, 4),   # plenty of memory: the pool size caps it
+    (1200, 3),   # 1200 MB / 350 MB per browser
+    (500, 1),    # one browser's worth
+    (100, 1),    # never below one, the scrape still has to run
+])
+def test_browser_workers_fit_the_memory_budget(monkeypatch, available_mb, expected):
+    monkeypatch.setenv("BLINKIT_POOL_SIZE", "4")
+    monkeypatch.setenv("BLINKIT_BROWSER_MB", "350")
+    monkeypatch.delenv("BLINKIT_SCRAPE_CONCURRENCY", raising=False)
+    monkeypatch.delenv("BLINKIT_DRIVER_POOL", raising=False)
+    monkeypatch.setattr(driver_pool, "_available_memory_mb", lambda: available_mb)
+    assert max_browser_workers(jobs=6) == expected
+
+
+def test_browser_workers_never_exceed_the_jobs_or_the_request(monkeypatch):
+    monkeypatch.setenv("BLINKIT_POOL_SIZE", "4")
+    monkeypatch.delenv("BLINKIT_SCRAPE_CONCURRENCY", raising=False)
+    monkeypatch.delenv("BLINKIT_DRIVER_POOL", raising=False)
+    monkeypatch.setattr(driver_pool, "_available_memory_mb", lambda: 8000)
+    assert max_browser_workers(jobs=2) == 2
+    assert max_browser_workers(jobs=6, requested=3) == 3
+    # Unknown memory (no psutil, no /proc/meminfo): only the pool size applies
+    monkeypatch.setattr(driver_pool, "_available_memory_mb", lambda: None)
+    assert max_browser_workers(jobs=6) == 4
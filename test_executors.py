@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+import pytest
+
+from app_backend.app.executors import BoundedExecutor, ExecutorBusy
+
+
+def test_full_executor_rejects_then_recovers():
+    async def scenario():
+        executor = BoundedExecutor("test", workers=1, max_queue=1)
+        gate = threading.Event()
+        running = executor.submit(gate.wait)
+        queued = executor.submit(lambda: "queued")
+        with pytest.raises(ExecutorBusy):
+            executor.submit(lambda: "rejected")
+        assert executor.stats()["rejected"] == 1
+
+        gate.set()
+        assert await running is True
+        assert await queued == "queued"
+        assert await executor.run(lambda: 42) == 42
+        stats = executor.stats()
+        assert (stats["queued"], stats["running"], stats["completed"]) == (0, 0, 3)
+        executor.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_queued_job_frees_its_slot():
+    async def scenario():
+        executor = BoundedExecutor("test", workers=1, max_queue=1)
+        gate = threading.Event()
+        running = executor.submit(gate.wait)
+        queued = executor.submit(lambda: "never runs")
+        queued.cancel()
+        await asyncio.sleep(0)  # let the cancellation reach the pool's future
+
+        stats = executor.stats()
+        assert (stats["queued"], stats["cancelled"]) == (0, 1)
+        # The slot is usable again instead of a permanent ExecutorBusy
+        replacement = executor.submit(lambda: "ran")
+        gate.set()
+        assert await running is True
+        assert await replacement == "ran"
+        assert executor.stats()["queued"] == 0 and executor.stats()["running"] == 0
+        executor.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_failed_job_is_counted_and_raised():
+    async def scenario():
+        executor = BoundedExecutor("test", workers=1, max_queue=0)
+
+        def boom():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await executor.run(boom)
+        stats = executor.stats()
+        assert (stats["running"], stats["failed"]) == (0, 1)
+        executor.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,65 @@
+import csv
+import io
+
+import pytest
+
+from app_backend.app.utils.export_formats import EXPORT_COLUMNS, get_encoder
+
+# Two pincodes' worth of products, written as two batches like the streaming export
+BATCHES = [
+    [
+        {"pincode": "110001", "rank": 1, "brand": "Yoga", "name": "Yoga Bar Protein Bar", "weight": "60 g",
+         "price": 100.0, "price_text": "₹100", "grams": 60.0, "price_per_100g": 166.67},
+        # Failed parses come through as "" / None and must not break the typed formats
+        {"pincode": "110001", "rank": 2, "brand": "Unknown", "name": "Assorted Pack", "weight": "N/A",
+         "price": 45.5, "price_text": "₹45.50", "grams": "", "price_per_100g": None},
+    ],
+    [
+        {"pincode": "560001", "rank": 1, "brand": "RiteBite", "name": "RiteBite, Max \"Protein\" Bar", "weight": "70 g",
+         "price": 90.0, "price_text": "₹90", "grams": 70.0, "price_per_100g": 128.57},
+    ],
+]
+ROWS = [row for batch in BATCHES for row in batch]
+NAMES = [name for name, _ in EXPORT_COLUMNS]
+
+
+def _encode(fmt, batches=BATCHES):
+    encoder = get_encoder(fmt)
+    assert encoder is not None, f"{fmt} encoder unavailable"
+    return b"".join([encoder.write(batch) for batch in batches] + [encoder.close()])
+
+
+def test_csv_round_trip():
+    rows = list(csv.DictReader(io.StringIO(_encode("csv").decode("utf-8"))))
+    assert list(rows[0]) == NAMES
+    assert [r["name"] for r in rows] == [r["name"] for r in ROWS]
+    assert rows[0]["price_per_100g"] == "166.67" and rows[1]["grams"] == ""
+
+
+def test_empty_csv_still_has_a_header():
+    assert _encode("csv", []).decode("utf-8").strip() == ",".join(NAMES)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_round_trip_keeps_types(fmt):
+    pa = pytest.importorskip("pyarrow")
+    data = _encode(fmt)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(pa.BufferReader(data))
+        assert parquet.num_row_groups == len(BATCHES)  # one row group per pincode batch
+        table = parquet.read()
+    else:
+        table = pa.ipc.open_stream(data).read_all()
+
+    assert table.column_names == NAMES
+    assert str(table.schema.field("rank").type) == "int32"
+    assert str(table.schema.field("price").type) == "double"
+    rows = table.to_pylist()
+    assert [(r["pincode"], r["rank"], r["name"]) for r in rows] == [(r["pincode"], r["rank"], r["name"]) for r in ROWS]
+    assert rows[0]["price_per_100g"] == 166.67
+    assert rows[1]["grams"] is None and rows[1]["price_per_100g"] is None
+
+
+def test_unknown_format_is_rejected():
+    assert get_encoder("xlsx") is None
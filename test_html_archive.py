@@ -0,0 +1,79 @@
+import os
+import threading
+
+from app_backend.app.scraper import html_archive
+from app_backend.app.scraper.html_archive import HtmlArchive
+
+PAGE = '<html><body>' + '<div>Protein Bar ₹40</div>' * 50 + '</body></html>'
+
+
+def test_duplicate_flag_follows_the_object_file(tmp_path):
+    archive = HtmlArchive(root=str(tmp_path))
+    first = archive.put(PAGE, '110001', 'protein bar')
+    assert first['duplicate'] is False
+    assert archive.put(PAGE, '560001', 'protein bar')['duplicate'] is True
+
+    # Object lost (e.g. cleaned up by hand): the next save rewrites it and is not a duplicate
+    os.remove(os.path.join(str(tmp_path), first['object']))
+    again = archive.put(PAGE, '110001', 'protein bar')
+    assert again['duplicate'] is False
+    assert archive.get(again['sha256']) == PAGE
+
+
+def test_concurrent_saves_of_one_page_write_it_once(tmp_path):
+    archive = HtmlArchive(root=str(tmp_path))
+    entries = []
+    threads = [threading.Thread(target=lambda i=i: entries.append(archive.put(PAGE, str(i), 'q'))) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(e['duplicate'] for e in entries) == [False] + [True] * 7
+    assert len(archive.versions(query='q')) == 8
+    assert not [f for _, _, files in os.walk(str(tmp_path)) for f in files if f.endswith('.tmp')]
+
+
+def test_index_stays_readable_while_a_page_is_compressed(tmp_path, monkeypatch):
+    archive = HtmlArchive(root=str(tmp_path))
+    compressing, release = threading.Event(), threading.Event()
+    real_compress = html_archive._compress
+
+    def slow_compress(data):
+        compressing.set()
+        release.wait(10)
+        return real_compress(data)
+
+    monkeypatch.setattr(html_archive, '_compress', slow_compress)
+    writer = threading.Thread(target=archive.put, args=(PAGE, '110001', 'q'))
+    writer.start()
+    assert compressing.wait(10)
+    reader = threading.Thread(target=archive.versions)
+    reader.start()
+    reader.join(2)
+    alive = reader.is_alive()
+    release.set()
+    writer.join(10)
+    reader.join(10)
+    assert not alive, "versions() waited for compression"
+
+
+def test_full_writer_queue_drops_and_counts(tmp_path, monkeypatch):
+    archive = HtmlArchive(root=str(tmp_path), max_queue=1, submit_timeout=0.05)
+    writing, release = threading.Event(), threading.Event()
+    real_put = archive.put
+
+    def slow_put(*args, **kwargs):
+        writing.set()
+        release.wait(10)
+        return real_put(*args, **kwargs)
+
+    monkeypatch.setattr(archive, 'put', slow_put)
+    archive.submit(PAGE, '1', 'q')  # taken by the writer, which then blocks
+    assert writing.wait(10)
+    archive.submit(PAGE, '2', 'q')  # waits in the queue
+    archive.submit(PAGE, '3', 'q')  # no room: dropped
+    assert archive.stats()['dropped'] == 1
+    release.set()
+    archive.flush()
+    stats = archive.stats()
+    assert (stats['archived'], stats['duplicates'], stats['queued']) == (1, 1, 0)
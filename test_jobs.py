@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+
+import pytest
+
+from jobs import JobFailed, JobStore
+
+
+def _wait_done(job, timeout=10):
+    deadline = time.time() + timeout
+    while not (job.done and job.finished_at):
+        assert time.time() < deadline, f"job stuck in {job.status}"
+        time.sleep(0.01)
+
+
+def test_job_lifecycle_with_progress_and_partial_results():
+    store = JobStore(workers=1)
+    gate = threading.Event()
+
+    def work(progress):
+        progress("scraped", products=3, partial={"products": ["a", "b", "c"]})
+        assert gate.wait(10)
+        return {"report": "ok"}
+
+    job = store.submit("analyze", {"category": "snacks"}, work)
+    assert store.get(job.id) is job
+    while job.stage != "scraped":
+        time.sleep(0.01)
+    running = job.to_dict()
+    assert running["status"] == "running"
+    assert running["partial"] == {"products": ["a", "b", "c"]}
+    assert running["result"] is None
+
+    gate.set()
+    _wait_done(job)
+    done = job.to_dict()
+    assert done["status"] == "succeeded" and done["result"] == {"report": "ok"}
+    assert [e["stage"] for e in done["events"]] == ["started", "scraped", "done"]
+    assert [e["seq"] for e in done["events"]] == [0, 1, 2]
+    assert store.stats() == {"succeeded": 1}
+
+
+def test_failed_job_keeps_the_status_code():
+    store = JobStore(workers=1)
+
+    def work(progress):
+        raise JobFailed("No products found", status_code=404)
+
+    job = store.submit("analyze", {}, work)
+    _wait_done(job)
+    assert (job.status, job.error, job.error_status) == ("failed", "No products found", 404)
+    assert job.events[-1]["stage"] == "failed"
+
+
+def test_finished_jobs_expire_after_the_ttl():
+    store = JobStore(workers=1, ttl_seconds=0)
+    job = store.submit("analyze", {}, lambda progress: {})
+    _wait_done(job)
+    time.sleep(0.01)
+    assert store.get(job.id) is None
+    assert store.stats() == {}
+
+
+def _sse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        events.append((fields.get("id"), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_job_events_stream_and_resume(monkeypatch):
+    testclient = pytest.importorskip("starlette.testclient")
+    import backend
+
+    store = JobStore(workers=1)
+    monkeypatch.setattr(backend, "job_store", store)
+
+    def work(progress):
+        progress("scraped", products=2)
+        return {"report": {"top_products": []}}
+
+    job = store.submit("analyze", {"category": "snacks"}, work)
+    _wait_done(job)
+    client = testclient.TestClient(backend.app)
+
+    events = _sse_events(client.get(f"/jobs/{job.id}/events").text)
+    assert [(seq, name) for seq, name, _ in events] == [("0", "progress"), ("1", "progress"), ("2", "progress"), (None, "done")]
+    assert events[1][2]["products"] == 2
+    assert events[-1][2]["result"] == {"report": {"top_products": []}}
+
+    # Reconnect after event 1: only what came later is replayed
+    resumed = _sse_events(client.get(f"/jobs/{job.id}/events", headers={"Last-Event-ID": "1"}).text)
+    assert [(seq, name) for seq, name, _ in resumed] == [("2", "progress"), (None, "done")]
+
+    assert client.get("/jobs/unknown/events").status_code == 404
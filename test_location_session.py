@@ -0,0 +1,76 @@
+import json
+import os
+import time
+
+import pytest
+
+from app_backend.app.scraper import location_session
+from app_backend.app.scraper.location_session import (
+    invalidate_location_session,
+    load_location_session,
+    save_location_session,
+)
+
+COOKIES = [{"name": "gr_1_locality", "value": "1849", "domain": ".blinkit.com", "path": "/"}]
+LOCAL_STORAGE = {"location": '{"coords":{"lat":19.07,"lon":72.87}}', "city": "Mumbai"}
+
+
+class FakeDriver:
+    """A verified Blinkit tab: its cookies and localStorage are what gets saved."""
+
+    def get_cookies(self):
+        return COOKIES
+
+    def execute_script(self, script):
+        return LOCAL_STORAGE
+
+
+@pytest.fixture
+def session_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(location_session, "SESSION_DIR", str(tmp_path / "sessions"))
+    monkeypatch.delenv("BLINKIT_SESSION_TTL_HOURS", raising=False)
+    return tmp_path / "sessions"
+
+
+def test_saved_session_round_trips(session_dir):
+    assert load_location_session("400001") is None
+    assert save_location_session(FakeDriver(), "400001")
+
+    session = load_location_session("400001")
+    assert session["pincode"] == "400001"
+    assert session["cookies"] == COOKIES and session["local_storage"] == LOCAL_STORAGE
+    # Written atomically: no temp file is left behind
+    assert os.listdir(session_dir) == ["400001.json"]
+
+    invalidate_location_session("400001")
+    assert load_location_session("400001") is None
+
+
+def test_pincode_cannot_escape_the_session_dir(session_dir):
+    assert save_location_session(FakeDriver(), "../400001")
+    assert os.listdir(session_dir) == ["___400001.json"]
+    assert load_location_session("../400001")["pincode"] == "../400001"
+
+
+def test_expired_session_is_dropped(session_dir, monkeypatch):
+    monkeypatch.setenv("BLINKIT_SESSION_TTL_HOURS", "1")
+    assert save_location_session(FakeDriver(), "560001")
+    path = session_dir / "560001.json"
+
+    # 30 minutes old: still served
+    session = json.loads(path.read_text())
+    session["saved_at"] = time.time() - 1800
+    path.write_text(json.dumps(session))
+    assert load_location_session("560001") is not None
+
+    # Two hours old: expired and removed from disk
+    session["saved_at"] = time.time() - 7200
+    path.write_text(json.dumps(session))
+    assert load_location_session("560001") is None
+    assert not path.exists()
+
+
+def test_corrupt_session_file_is_ignored(session_dir):
+    session_dir.mkdir()
+    (session_dir / "110001.json").write_text("{not json")
+    assert load_location_session("110001") is None
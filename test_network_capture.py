@@ -0,0 +1,68 @@
+from app_backend.app.scraper.network_capture import extract_products_from_payloads, summarize_traffic
+
+# Two search API pages, shaped like Blinkit's layout responses
+PAGE_1 = {
+    "response": {
+        "snippets": [
+            {"widget_type": "banner", "data": {"title": {"text": "Top picks"}}},
+            {"data": {
+                "identity": {"id": 482828},
+                "name": {"text": "Haldiram's Takatak Chatpata Masala Stick"},
+                "variant": {"text": "100 g"},
+                "normal_price": {"text": "₹19"},
+                # Tracking copy of the same product: must not be read twice
+                "cart_item": {"product_id": 482828, "product_name": "Takatak", "price": 19},
+            }},
+            {"data": {"product_id": "11150", "product_name": "Lay's Classic Salted", "unit": "52 g", "price": 20}},
+        ],
+    },
+}
+PAGE_2 = {
+    "response": {
+        "snippets": [
+            # Seen on page 1 already
+            {"data": {"product_id": "11150", "product_name": "Lay's Classic Salted", "unit": "52 g", "price": 20}},
+            {"data": {"prid": 503310, "display_name": "Bingo Mad Angles", "price": "₹30"}},
+            # No price: not a product
+            {"data": {"product_id": "9", "name": "Out of stock"}},
+        ],
+    },
+}
+
+
+def test_products_are_read_in_grid_order_without_duplicates():
+    products = extract_products_from_payloads([PAGE_1, PAGE_2])
+    assert products == [
+        {"product_id": "482828", "name": "Haldiram's Takatak Chatpata Masala Stick", "weight": "100 g", "price_text": "₹19"},
+        {"product_id": "11150", "name": "Lay's Classic Salted", "weight": "52 g", "price_text": "₹20"},
+        {"product_id": "503310", "name": "Bingo Mad Angles", "weight": "", "price_text": "₹30"},
+    ]
+
+
+def test_payloads_without_products():
+    assert extract_products_from_payloads([]) == []
+    assert extract_products_from_payloads([{"response": {"snippets": []}}, [], "not json", None]) == []
+
+
+def test_traffic_summary():
+    events = [
+        {"method": "Network.requestWillBeSent", "params": {"requestId": "1"}},
+        {"method": "Network.requestWillBeSent", "params": {"requestId": "2"}},
+        {"method": "Network.requestWillBeSent", "params": {"requestId": "3"}},
+        {"method": "Network.requestWillBeSent", "params": {"requestId": "4"}},
+        {"method": "Network.loadingFinished", "params": {"requestId": "1", "encodedDataLength": 15000}},
+        {"method": "Network.loadingFinished", "params": {"requestId": "2", "encodedDataLength": 2500}},
+        {"method": "Network.loadingFailed", "params": {"requestId": "3", "type": "Image", "blockedReason": "inspector"}},
+        {"method": "Network.loadingFailed", "params": {"requestId": "4", "type": "Ping", "blockedReason": "inspector"}},
+        # A failure that was not a block (e.g. aborted) saves nothing
+        {"method": "Network.loadingFailed", "params": {"requestId": "5", "type": "Image", "errorText": "net::ERR_ABORTED"}},
+        {"method": "Page.frameNavigated", "params": {}},
+    ]
+    assert summarize_traffic(events) == {
+        "requests": 4,
+        "transferred_bytes": 17500,
+        "blocked_requests": 2,
+        "blocked_by_type": {"Image": 1, "Ping": 1},
+        "estimated_bytes_saved": 30_000 + 10_000,  # typical image + default
+    }
+    assert summarize_traffic([])["requests"] == 0
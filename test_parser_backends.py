@@ -0,0 +1,138 @@
+import base64
+import glob
+import os
+
+import pytest
+
+from app_backend.app.scraper.blinkit_scraper import _parse_products, iter_products
+from app_backend.app.scraper.card_cache import CardParseCache
+from app_backend.app.scraper.html_stream import iter_file_chunks, iter_page_chunks
+from app_backend.app.scraper.html_parsers import PARSER_BACKENDS, resolve_parser
+from blinkit_scraper_combined import scrape_blinkit_from_html
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SCRAPER_DIR = os.path.join(ROOT, 'amazon_blinkit_scrapping')
+
+# Trimmed Blinkit search pages (real card markup, scripts and images stripped),
+# plus any full pages saved locally under html_pages/ (gitignored)
+FIXTURES = sorted(glob.glob(os.path.join(ROOT, 'fixtures', 'blinkit_*.html')))
+FIXTURES += sorted(glob.glob(os.path.join(SCRAPER_DIR, 'html_pages', 'blinkit_*', 'snacks*.html')))
+
+# Page without Blinkit's card markup, to exercise the "any element with ₹" fallback
+FALLBACK_HTML = """
+<html><body>
+  <div><a href="/prn/chips"><span>Lay's Classic Salted Potato Chips</span><span>52 g</span><span>₹20</span></a></div>
+  <div><div>Haldiram's Aloo Bhujia Namkeen</div><div>2 x 200 g</div><div>₹ 1,099</div></div>
+</body></html>
+"""
+
+
+def _fast_backends():
+    # Only compare against backends that are actually installed here
+    return [b for b in PARSER_BACKENDS if b != 'html.parser' and resolve_parser(b) == b]
+
+
+def _fixtures():
+    if not FIXTURES:
+        pytest.skip("no Blinkit fixture pages found")
+    return FIXTURES
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_parse_products_parity():
+    for path in _fixtures():
+        html = _read(path)
+        # cache=False: every backend really parses the page, none is served another's cards
+        expected = _parse_products(html, parser='html.parser', cache=False)
+        assert expected, f"no products parsed from {path}"
+        for backend in _fast_backends():
+            got = _parse_products(html, parser=backend, cache=False)
+            assert got == expected, f"{backend} differs from html.parser on {path}"
+
+
+def test_parse_products_fallback_parity():
+    expected = _parse_products(FALLBACK_HTML, parser='html.parser', cache=False)
+    assert [p['name'] for p in expected] == ["Lay's Classic Salted Potato Chips", "Haldiram's Aloo Bhujia Namkeen"]
+    for backend in _fast_backends():
+        assert _parse_products(FALLBACK_HTML, parser=backend, cache=False) == expected, f"{backend} fallback differs"
+
+
+def test_cards_are_deduplicated():
+    from app_backend.app.scraper.html_parsers import extract_card_fields
+    for path in _fixtures():
+        html = _read(path)
+        for backend in ['html.parser'] + _fast_backends():
+            ids = [c['id'] for c in extract_card_fields(html, parser=backend) if c['id']]
+            assert len(ids) == len(set(ids)), f"{backend} returned duplicate cards on {path}"
+
+
+def test_streaming_parse_parity():
+    # Small chunks split tags, attributes and text mid-way
+    for path in _fixtures():
+        expected = _parse_products(_read(path), cache=False)
+        for chunk_bytes in (97, 64 * 1024):
+            got = list(iter_products(iter_file_chunks(path, chunk_bytes)))
+            assert got == expected, f"streaming parse ({chunk_bytes}-byte chunks) differs on {path}"
+
+
+def test_streaming_parse_skips_self_closed_elements():
+    # <img/> and <div/> inside cards open nothing; a self-closed card has no fields and is skipped
+    html = '<html><body>' + ''.join(
+        f'<div id="{i}" role="button" tabindex="0"><img src="bar.png"/><div class="spacer"/>'
+        f'<div>Protein Bar Pack {i}</div><div>{i * 100} g</div><div>₹{i * 10}</div></div>'
+        for i in range(1, 4)
+    ) + '<div id="9" role="button" tabindex="0"/></body></html>'
+    expected = _parse_products(html, parser='html.parser', cache=False)
+    assert [p['price'] for p in expected] == [10.0, 20.0, 30.0]
+    assert list(iter_products(html[i:i + 7] for i in range(0, len(html), 7))) == expected
+
+
+class _PageDriver:
+    """Serves the page like html_stream's browser scripts: UTF-8 length, then base64 byte slices."""
+
+    def __init__(self, html):
+        self.data = html.encode('utf-8')
+        self.dropped = False
+
+    def execute_script(self, script, *args):
+        if 'TextEncoder' in script:
+            return len(self.data)
+        if 'btoa' in script:
+            start, size = args
+            return base64.b64encode(self.data[start:start + size]).decode('ascii')
+        self.dropped = True
+
+
+def test_page_chunks_keep_multibyte_characters_whole():
+    # ₹ is 3 bytes and 🍫 4 bytes in UTF-8 (a surrogate pair in JS): every chunk size splits some of them
+    html = '<div>Protein Bar 🍫 ₹40</div>' * 40
+    for size in (1, 2, 5, 97):
+        driver = _PageDriver(html)
+        chunks = list(iter_page_chunks(driver, size))
+        assert ''.join(chunks) == html
+        assert '\ufffd' not in ''.join(chunks)
+        assert driver.dropped
+
+
+def test_card_cache_matches_full_parse():
+    cache = CardParseCache()
+    for path in _fixtures():
+        html = _read(path)
+        expected = _parse_products(html, cache=False)
+        cold = _parse_products(html, cache=cache)
+        warm = _parse_products(html, cache=cache)
+        assert cold == expected and warm == expected, f"cached parse differs on {path}"
+    assert cache.stats()['hit_rate'] >= 0.5
+
+
+def test_scrape_blinkit_from_html_parity():
+    for path in _fixtures():
+        html = _read(path)
+        expected = scrape_blinkit_from_html(html, parser='html.parser')
+        for backend in _fast_backends():
+            got = scrape_blinkit_from_html(html, parser=backend)
+            assert got.equals(expected), f"{backend} differs from html.parser on {path}"
@@ -0,0 +1,60 @@
+import glob
+import sys
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('pyarrow')
+
+import reparse_archive
+
+
+def _page(count):
+    cards = ''.join(
+        f'<div id="{i}" role="button" tabindex="0"><div>Protein Bar Pack {i}</div>'
+        f'<div>{i * 100} g</div><div>₹{i * 10}</div></div>'
+        for i in range(1, count + 1)
+    )
+    return f'<html><body>{cards}</body></html>'
+
+
+def _run(monkeypatch, tmp_path, *extra):
+    monkeypatch.setattr(sys, 'argv', [
+        'reparse_archive.py', '--html-dir', str(tmp_path / 'html_pages'),
+        '--archive-dir', str(tmp_path / 'html_archive'), '--out', str(tmp_path / 'out'), '--workers', '1', *extra,
+    ])
+    reparse_archive.main()
+    return pd.read_parquet(str(tmp_path / 'out')), glob.glob(str(tmp_path / 'out' / 'part-*.parquet'))
+
+
+@pytest.fixture
+def pages(tmp_path):
+    # The same results page saved for two pincodes
+    for pincode in ('110001', '560001'):
+        folder = tmp_path / 'html_pages' / f'blinkit_{pincode}'
+        folder.mkdir(parents=True)
+        (folder / f'protein_bar_{pincode}.html').write_text(_page(3), encoding='utf-8')
+    return tmp_path
+
+
+def test_identical_pages_for_two_pincodes_keep_both(monkeypatch, pages):
+    dataset, parts = _run(monkeypatch, pages)
+    assert len(parts) == 1
+    assert sorted(dataset.groupby('pincode').size().items()) == [('110001', 3), ('560001', 3)]
+
+    # Nothing new: no second part file
+    dataset, parts = _run(monkeypatch, pages)
+    assert len(parts) == 1 and len(dataset) == 6
+
+
+def test_full_run_replaces_old_parts(monkeypatch, pages):
+    _run(monkeypatch, pages)
+    folder = pages / 'html_pages' / 'blinkit_400001'
+    folder.mkdir()
+    (folder / 'protein_bar_400001.html').write_text(_page(2), encoding='utf-8')
+    dataset, parts = _run(monkeypatch, pages)
+    assert len(parts) == 2 and len(dataset) == 8
+
+    dataset, parts = _run(monkeypatch, pages, '--full')
+    assert len(parts) == 1
+    assert len(dataset) == 8
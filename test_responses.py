@@ -0,0 +1,95 @@
+import asyncio
+import gzip
+
+from app_backend.app.responses import CompressionMiddleware, select_fields
+
+SCOPE = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"gzip")]}
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def _run(app):
+    """Messages the client receives through the middleware, plus what had arrived when the app first paused."""
+    sent = []
+    seen_at_pause = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def scenario():
+        await CompressionMiddleware(app(seen_at_pause, sent))(SCOPE, _receive, send)
+
+    asyncio.run(scenario())
+    return sent, seen_at_pause[0] if seen_at_pause else None
+
+
+def test_streaming_response_headers_are_sent_before_the_first_chunk():
+    def app(seen_at_pause, sent):
+        async def asgi(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/x-ndjson")]})
+            # A slow scrape: nothing to send yet, but the client should already have the headers
+            await asyncio.sleep(0)
+            seen_at_pause.append([m["type"] for m in sent])
+            await send({"type": "http.response.body", "body": b'{"type":"pincode"}\n' * 200, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        return asgi
+
+    sent, at_pause = _run(app)
+    assert at_pause == ["http.response.start"]
+    assert all(b"content-encoding" not in dict(m.get("headers", [])) for m in sent)
+    assert sent[1]["body"].startswith(b'{"type":"pincode"}')
+
+
+def test_complete_response_is_compressed():
+    body = b'{"products":[' + b'{"name":"Protein Bar"},' * 200 + b'{}]}'
+
+    def app(seen_at_pause, sent):
+        async def asgi(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+            await send({"type": "http.response.body", "body": body})
+        return asgi
+
+    sent, _ = _run(app)
+    headers = dict(sent[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert gzip.decompress(sent[1]["body"]) == body
+
+
+PRODUCTS = [
+    {"name": "Yoga Bar Protein Bar", "price": 100.0, "brand": "Yoga",
+     "analysis": {"summary": "High protein", "scores": [4, 5]}, "news": [{"title": "Launch"}]},
+    {"name": "RiteBite Max", "price": 90.0, "brand": "RiteBite", "analysis": None},
+]
+
+
+def test_select_fields_keeps_nested_values_whole():
+    rows = select_fields(PRODUCTS, " name, analysis ,missing")
+    assert rows == [
+        {"name": "Yoga Bar Protein Bar", "analysis": {"summary": "High protein", "scores": [4, 5]}},
+        {"name": "RiteBite Max", "analysis": None},
+    ]
+    # Projection copies the rows, never the caller's data
+    assert "price" in PRODUCTS[0] and "news" in PRODUCTS[0]
+
+
+def test_select_fields_without_fields_or_dict_rows():
+    assert select_fields(PRODUCTS, None) is PRODUCTS
+    assert select_fields(PRODUCTS, " , ") is PRODUCTS
+    assert select_fields(["raw", 3, {"name": "x", "price": 1}], "name") == ["raw", 3, {"name": "x"}]
+
+
+def test_report_projection_only_touches_product_lists():
+    from backend import _project_products
+
+    report = {"category": "protein bar", "all_products": PRODUCTS, "products": PRODUCTS[:1],
+              "insights": {"products": "not a list", "top": PRODUCTS[0]}}
+    projected = _project_products(report, "name,price")
+    assert projected["all_products"] == [{"name": "Yoga Bar Protein Bar", "price": 100.0}, {"name": "RiteBite Max", "price": 90.0}]
+    assert projected["products"] == [{"name": "Yoga Bar Protein Bar", "price": 100.0}]
+    assert projected["insights"] is report["insights"] and projected["category"] == "protein bar"
+    assert report["all_products"] is PRODUCTS
+    assert _project_products(report, None) is report
@@ -0,0 +1,88 @@
+import time
+
+from app_backend.app.scraper import result_cache
+from app_backend.app.scraper.result_cache import ScrapeResultCache, cache_key, cached_scrape_pincode, recent_scrape_stats
+
+
+def _products(n):
+    return [{"name": f"p{i}", "price": float(i)} for i in range(n)]
+
+
+def test_keys_are_normalized():
+    assert cache_key("Protein  Bar ", " 110001", 25) == cache_key("protein bar", "110001", 25)
+    assert cache_key("protein bar", "110001", 25) != cache_key("protein bar", "110001", 40)
+
+
+def test_bounded_scrape_never_answers_a_bigger_request():
+    cache = ScrapeResultCache()
+    key = cache_key("snacks", "110001", 25)
+    # Fewer products than the bound: still bounded, the scrape may have stopped early
+    cache.put(key, _products(9), max_products=10)
+    assert cache.get(key, max_products=30) is None
+    assert cache.get(key) is None
+    assert len(cache.get(key, max_products=10)) == 9
+    assert len(cache.get(key, max_products=5)) == 9
+
+    cache.put(key, _products(40), max_products=None)
+    assert len(cache.get(key, max_products=30)) == 40
+    assert len(cache.get(key)) == 40
+
+
+def test_entries_expire_after_ttl():
+    cache = ScrapeResultCache(ttl_seconds=0.05)
+    key = cache_key("snacks", "110001", 25)
+    cache.put(key, _products(3))
+    assert cache.get(key) is not None
+    time.sleep(0.1)
+    assert cache.get(key) is None
+    stats = cache.stats()
+    assert (stats["expired"], stats["entries"]) == (1, 0)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ScrapeResultCache(max_entries=2)
+    a, b, c = (cache_key(q, "110001", 25) for q in ("a", "b", "c"))
+    cache.put(a, _products(1))
+    cache.put(b, _products(1))
+    cache.get(a)  # a is now more recent than b
+    cache.put(c, _products(1))
+    assert cache.get(b) is None
+    assert cache.get(a) is not None and cache.get(c) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_hits_are_copies():
+    cache = ScrapeResultCache()
+    key = cache_key("snacks", "110001", 25)
+    cache.put(key, _products(2))
+    cache.get(key)[0]["rank"] = 1
+    assert "rank" not in cache.get(key)[0]
+
+
+def _fake_scrape(**kwargs):
+    # What blinkit_scraper fills in during a real Selenium scrape
+    stats = kwargs["stats"]
+    stats["engine"] = "selenium"
+    stats["location"] = [{"strategy": "modal", "seconds": 2.4, "attempts": [
+        {"strategy": "input", "ok": False, "seconds": 0.3}, {"strategy": "modal", "ok": True, "seconds": 2.1}]}]
+    stats["pincode_verdict"] = {"verified": True, "source": "page element"}
+    stats["scroll"] = {"steps": 3, "seconds": 2.9, "cards": 44, "cards_per_step": [20, 4, 0], "stop_reason": "settled"}
+    stats["extract_mode"] = "network"
+    stats["traffic"] = {"requests": 40, "transferred_bytes": 512000}
+    return _products(2), None
+
+
+def test_production_scrapes_record_their_stats(monkeypatch, capsys):
+    monkeypatch.setenv("BLINKIT_RESULT_CACHE_TTL", "0")
+    monkeypatch.setattr(result_cache, "scrape_pincode", _fake_scrape)
+    assert len(cached_scrape_pincode("110001", "protein bar")) == 2
+
+    recent = recent_scrape_stats()[-1]
+    assert (recent["pincode"], recent["query"], recent["engine"]) == ("110001", "protein bar", "selenium")
+    assert [a["strategy"] for a in recent["location"][0]["attempts"]] == ["input", "modal"]
+    assert recent["pincode_verdict"]["verified"] and recent["extract_mode"] == "network"
+    assert recent["traffic"]["requests"] == 40
+    assert recent["scroll"]["cards_per_step"] == [20, 4, 0]
+    out = capsys.readouterr().out
+    assert "location=[modal 2.4s], verified=True" in out
+    assert "cards per scroll step=[20, 4, 0] (settled)" in out
@@ -0,0 +1,115 @@
+import asyncio
+import gc
+import threading
+
+import pytest
+
+from app_backend.app import main
+from app_backend.app.executors import BoundedExecutor
+
+
+def _fake_scrapes(monkeypatch, workers=2):
+    """Pincode "A" scrapes instantly, every other one blocks until `gate` is set."""
+    started = []
+    gate = threading.Event()
+
+    def scrape(req, pincode):
+        started.append(pincode)
+        if pincode != "A":
+            assert gate.wait(10), "gate never opened"
+        return [{"name": f"product @ {pincode}"}]
+
+    monkeypatch.setattr(main, "_scrape_pincode", scrape)
+    monkeypatch.setattr(main, "max_browser_workers", lambda n, requested=None: workers)
+    return started, gate
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_closing_the_scrape_early_cancels_pending_pincodes(monkeypatch, ordered):
+    started, gate = _fake_scrapes(monkeypatch)
+    req = main.ScrapeRequest(pincodes=["A", "B", "C", "D"], query="snacks")
+    results = main._iter_scrape(req, ordered=ordered)
+    pincode, products = next(results)
+    assert (pincode, products[0]["rank"]) == ("A", 1)
+
+    # close() waits for the scrapes already running, so open the gate from outside
+    closer = threading.Thread(target=results.close)
+    closer.start()
+    closer.join(0.5)
+    gate.set()
+    closer.join(10)
+    assert not closer.is_alive()
+    # Two browsers: A, B and C may have started, D was still queued and must never run
+    assert "D" not in started
+
+
+def _endless_scrape(monkeypatch):
+    """A scrape with more pincodes than the stream's queue holds; records when it is closed."""
+    closed = threading.Event()
+    executor = BoundedExecutor("test-browser", workers=1, max_queue=0)
+
+    def iter_scrape(req, ordered=True):
+        try:
+            for i in range(100):
+                yield str(i), [{"name": f"product {i}"}]
+        finally:
+            closed.set()
+
+    monkeypatch.setattr(main, "_iter_scrape", iter_scrape)
+    monkeypatch.setattr(main, "browser_executor", executor)
+    return closed, executor
+
+
+async def _producer_exits(executor, closed):
+    for _ in range(60):
+        if executor.stats()["running"] == 0 and closed.is_set():
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+
+def test_closing_the_stream_stops_a_producer_blocked_on_a_full_queue(monkeypatch):
+    closed, executor = _endless_scrape(monkeypatch)
+
+    async def scenario():
+        results = main._stream_scrape(main.ScrapeRequest(pincodes=["110001"], query="snacks"))
+        assert (await results.__anext__())[0] == "0"
+        await asyncio.sleep(0.2)  # producer fills the queue and blocks
+        await results.aclose()
+        assert await _producer_exits(executor, closed)
+        assert executor.stats()["completed"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_a_stream_dropped_unread_stops_its_producer(monkeypatch):
+    closed, executor = _endless_scrape(monkeypatch)
+
+    async def scenario():
+        results = main._stream_scrape(main.ScrapeRequest(pincodes=["110001"], query="snacks"))
+        await asyncio.sleep(0.2)
+        del results
+        gc.collect()
+        assert await _producer_exits(executor, closed)
+
+    asyncio.run(scenario())
+
+
+def test_a_failed_export_aborts_the_response(monkeypatch):
+    async def failing_scrape(req):
+        yield "110001", [{"pincode": "110001", "name": "Protein Bar"}]
+        raise RuntimeError("browser crashed")
+
+    monkeypatch.setattr(main, "_stream_scrape", failing_scrape)
+
+    async def scenario():
+        response = await main.export_csv(main.ScrapeRequest(pincodes=["110001"], query="snacks"))
+        chunks = []
+        # The error reaches the server, which drops the connection instead of ending the CSV cleanly
+        with pytest.raises(RuntimeError, match="browser crashed"):
+            async for chunk in response.body_iterator:
+                chunks.append(chunk)
+        return chunks
+
+    chunks = asyncio.run(scenario())
+    assert b"Protein Bar" in b"".join(chunks)
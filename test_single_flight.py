@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from app_backend.app.single_flight import SingleFlight, single_flight_stats
+
+
+def _wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _callers(flight, key, fn, count, listener_events=None):
+    """Start `count` threads calling flight.do(key, fn); returns (threads, results, errors)."""
+    results, errors = [], []
+
+    def call(i):
+        listener = (lambda *args, **kw: listener_events.append((i, args))) if listener_events is not None else None
+        try:
+            results.append(flight.do(key, fn, listener))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+    return threads, results, errors
+
+
+def test_concurrent_calls_share_one_run_and_its_progress():
+    flight = SingleFlight("test-coalesce")
+    gate = threading.Event()
+    runs = []
+    events = []
+
+    def work(progress):
+        runs.append(1)
+        assert gate.wait(10)
+        progress("scraped", 3)
+        return ["a", "b", "c"]
+
+    threads, results, errors = _callers(flight, ("snacks", "110001"), work, 5, events)
+    for t in threads:
+        t.start()
+    _wait_for(lambda: flight.stats()["waiting"] == 4)
+    gate.set()
+    for t in threads:
+        t.join(10)
+
+    assert runs == [1] and not errors
+    assert results == [["a", "b", "c"]] * 5
+    assert sorted(i for i, _ in events) == [0, 1, 2, 3, 4]  # every caller's listener saw the event
+    stats = flight.stats()
+    assert (stats["leaders"], stats["coalesced"], stats["in_flight"]) == (1, 4, 0)
+    assert single_flight_stats()["test-coalesce"]["coalesced_rate"] == 0.8
+
+
+def test_exception_reaches_every_waiter_and_the_key_is_freed():
+    flight = SingleFlight("test-errors")
+    gate = threading.Event()
+
+    def failing(progress):
+        assert gate.wait(10)
+        raise ValueError("blocked by captcha")
+
+    threads, results, errors = _callers(flight, "key", failing, 3)
+    for t in threads:
+        t.start()
+    _wait_for(lambda: flight.stats()["waiting"] == 2)
+    gate.set()
+    for t in threads:
+        t.join(10)
+
+    assert not results
+    assert [str(e) for e in errors] == ["blocked by captcha"] * 3
+    assert flight.stats()["failed"] == 1
+    # Nothing is remembered: the next call runs again
+    assert flight.do("key", lambda progress: "fresh") == "fresh"
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight("test-keys")
+    assert [flight.do(k, lambda progress, k=k: k * 2) for k in (1, 2)] == [2, 4]
+    assert flight.stats()["coalesced"] == 0
@@ -0,0 +1,74 @@
+import math
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app_backend.app.utils.weights import (
+    normalize_units,
+    parse_price_to_float,
+    parse_quantity,
+    parse_weight_to_grams,
+    price_per_100g,
+)
+
+SCRAPER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'amazon_blinkit_scrapping')
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Multipacks
+    ("2 x 200 g", (400.0, "g")),
+    ("4x100g", (400.0, "g")),
+    ("2 × 50 g", (100.0, "g")),
+    ("Pack of 2 (200 g each)", (400.0, "g")),
+    # kg / ml / l conversions
+    ("1.5 kg", (1500.0, "g")),
+    ("2 x 1 kg", (2000.0, "g")),
+    ("500 gms", (500.0, "g")),
+    ("200 ml", (200.0, "ml")),
+    ("1 L", (1000.0, "ml")),
+    ("1.5 Ltr", (1500.0, "ml")),
+    ("2 x 1 L", (2000.0, "ml")),
+    # Pieces
+    ("6 pcs", (6.0, "pcs")),
+    ("Pack of 4", (4.0, "pcs")),
+    # Unparseable units
+    ("1 dozen", (None, None)),
+    ("assorted", (None, None)),
+    ("", (None, None)),
+])
+def test_parse_quantity(text, expected):
+    assert parse_quantity(text) == expected
+
+
+WEIGHTS = ["500 g", "1 kg", "2 x 50 g", "4x100g", "1.5 kg", "250 grams", "200 ml", "Pack of 6", "assorted", ""]
+PRICES = ["₹100", "₹1,200", "₹45.50", "₹80", "₹300", "₹55", "₹30", "₹10", "₹20", "₹99"]
+
+
+def test_batch_matches_the_per_row_path():
+    frame = normalize_units(WEIGHTS, PRICES)
+    for (weight, price_text), row in zip(zip(WEIGHTS, PRICES), frame.itertuples()):
+        grams = parse_weight_to_grams(weight)
+        price = parse_price_to_float(price_text)
+        assert row.price == price
+        if grams is None:
+            # ml, pieces and unparseable weights: no gram figures either way
+            assert math.isnan(row.grams) and math.isnan(row.price_per_100g)
+        else:
+            assert row.grams == grams
+            assert row.price_per_100g == price_per_100g(price, grams)
+
+
+def test_batch_reads_multipacks_the_per_row_path_misses():
+    # Known, intended differences: "×" and "Pack of N (... each)" count every item
+    frame = normalize_units(["2 × 200 g", "Pack of 2 (200 g each)"], ["₹80", "₹150"])
+    assert [parse_weight_to_grams(w) for w in ("2 × 200 g", "Pack of 2 (200 g each)")] == [200.0, 200.0]
+    assert list(frame["grams"]) == [400.0, 400.0]
+    assert list(frame["price_per_100g"]) == [20.0, 37.5]
+
+
+def test_scraper_import_does_not_load_pandas():
+    code = "import sys, app_backend.app.scraper.blinkit_scraper; print('pandas' in sys.modules, 'numpy' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=SCRAPER_DIR, capture_output=True, text=True, check=True)
+    assert out.stdout.split()[-2:] == ["False", "False"]